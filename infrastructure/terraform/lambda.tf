@@ -103,6 +103,7 @@ resource "aws_lambda_function" "backend" {
       ALLOWED_ORIGINS    = "https://${var.domain_name},https://www.${var.domain_name}"
       LOG_LEVEL          = "INFO"
       AWS_REGION_NAME    = var.aws_region
+      LAMBDA_WARMUP      = var.lambda_warmup
       
       # Flag to use SSM
       USE_SSM_SECRETS    = "true"
@@ -76,3 +76,9 @@ variable "enable_logging" {
   type        = bool
   default     = true
 }
+
+variable "lambda_warmup" {
+  description = "LAMBDA_WARMUP value: warm up app, MongoDB pool and services during Lambda INIT (\"true\", \"false\" or a list of stages)"
+  type        = string
+  default     = "false"
+}
@@ -2,6 +2,12 @@ from flask import Flask, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from utils.config import AppConfig
+from utils.async_runtime import async_to_sync
+from utils.request_db_stats import init_db_instrumentation
+from utils.request_metrics import init_request_metrics
+from utils.tracing import init_tracing
+from utils.profiling import init_profiling
+from utils.security import CORS_OPTIONS, get_allowed_origins, security_headers
 import logging
 import os
 
@@ -43,45 +49,51 @@ def create_app():
         - info.py: Visitor tracking and analytics
         - session.py: Session management
         - geolocation.py: IP geolocation services
+        - metrics.py: Monitoring (Prometheus request metrics, DB commands, pools)
     
     - services/: Business logic layer (service classes)
         - session_service.py: Session management logic
         - ip_service.py: IP geolocation with ipinfo.io
         - visitor_service.py: Visitor tracking logic
+        - async_*_service.py: asyncio versions used by the async views
     
     - models/: Data models
     - utils/: Configuration and utilities
     """
     app = Flask(__name__)
+    # Async views run on one shared event loop (long-lived async DB/HTTP clients)
+    # instead of a throwaway loop per request
+    app.async_to_sync = async_to_sync
     
     # Configuration
     app.config['JWT_SECRET_KEY'] = AppConfig.JWT_SECRET_KEY
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = AppConfig.JWT_ACCESS_TOKEN_EXPIRES
     
     # Security: Restrict CORS to specific origins in production
-    allowed_origins = os.getenv('ALLOWED_ORIGINS', 'http://localhost:5173,http://localhost:3000').split(',')
     CORS(app, resources={
-        r"/api/*": {
-            "origins": allowed_origins,
-            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"],
-            "supports_credentials": True,
-            "max_age": 3600
-        }
+        r"/api/*": dict(CORS_OPTIONS, origins=get_allowed_origins())
     })
     jwt = JWTManager(app)
 
     # Security headers on all responses
     @app.after_request
     def set_security_headers(response):
-        response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['X-Frame-Options'] = 'DENY'
-        response.headers['X-XSS-Protection'] = '0'
-        response.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
-        if request.path.startswith('/api/'):
-            response.headers['Cache-Control'] = 'no-store'
+        response.headers.update(security_headers(request.path))
         return response
 
+    # Per-request MongoDB command metrics + Server-Timing header
+    init_db_instrumentation(app)
+
+    # Per-route request counts, status codes, latency and in-flight requests
+    # (GET /api/metrics; EMF log lines on Lambda)
+    init_request_metrics(app)
+
+    # Service spans in Server-Timing; sampled/slow traces at GET /api/metrics/traces
+    init_tracing(app)
+
+    # Opt-in CPU profiling of signed or sampled requests (GET /api/metrics/profiles)
+    init_profiling(app)
+
     # Register blueprints - organized by feature/domain
     
     # Authentication module
@@ -104,6 +116,10 @@ def create_app():
     from blueprints.geolocation import geo_bp
     app.register_blueprint(geo_bp, url_prefix='/api/geo')
     
+    # Monitoring module
+    from blueprints.metrics import metrics_bp
+    app.register_blueprint(metrics_bp, url_prefix='/api/metrics')
+    
     # Health check endpoint
     @app.route('/api/health')
     def health():
@@ -141,6 +157,10 @@ def create_app():
                 'geo': {
                     'prefix': '/api/geo',
                     'description': 'IP geolocation services'
+                },
+                'metrics': {
+                    'prefix': '/api/metrics',
+                    'description': 'Monitoring metrics (protected)'
                 }
             }
         }, 200
@@ -0,0 +1,6 @@
+"""
+Benchmarks and load tests for the backend.
+
+Not part of the Lambda package (only blueprints/, models/, services/, utils/
+and top-level modules are shipped). Run modules with `python -m benchmarks.<name>`.
+"""
@@ -0,0 +1,123 @@
+"""
+Cold-start budget check for the Lambda entry point
+
+Starts a fresh interpreter per run with `-X importtime`, calls
+lambda_handler.get_app() (imports + create_app(), no request served) and
+records:
+
+- process wall time (interpreter start to app ready) and get_app() wall time
+- the slowest imports by self and cumulative time
+- which heavy modules were loaded before the first request
+
+The heavy dependencies (driver, bcrypt, search and HTTP clients, UA regexes)
+must only load on first use of the routes that need them. The check fails
+(exit 1) when the median get_app() time exceeds --budget-ms or any module in
+--forbid was imported:
+
+    python -m benchmarks.cold_start --runs 5 --budget-ms 400 --output cold.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported by get_app(); loaded lazily by the routes that use them
+DEFAULT_FORBIDDEN = ('pymongo', 'bson', 'bcrypt', 'ddgs', 'ua_parser', 'requests', 'httpx')
+
+_CHILD = r'''
+import json, sys, time
+started = time.perf_counter()
+import lambda_handler
+lambda_handler.get_app()
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({"get_app_ms": elapsed_ms, "modules": sorted(sys.modules)}))
+'''
+
+
+def _parse_importtime(stderr: str) -> list:
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def run_once() -> dict:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _CHILD],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    imports = _parse_importtime(proc.stderr)
+    return {
+        'process_ms': wall_ms,
+        'get_app_ms': result['get_app_ms'],
+        'modules': result['modules'],
+        'imports': imports,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=400.0, help='max median get_app() time')
+    parser.add_argument('--forbid', action='append', help='module that must not be imported (repeatable)')
+    parser.add_argument('--top', type=int, default=15, help='number of slowest imports to report')
+    parser.add_argument('--output', help='write the JSON result to this file')
+    args = parser.parse_args(argv)
+
+    forbidden = tuple(args.forbid or DEFAULT_FORBIDDEN)
+    runs = [run_once() for _ in range(args.runs)]
+
+    last = runs[-1]
+    loaded_roots = {name.split('.')[0] for name in last['modules']}
+    violations = sorted(m for m in forbidden if m in loaded_roots)
+    by_cumulative = sorted(last['imports'], key=lambda row: -row[2])
+    by_self = sorted(last['imports'], key=lambda row: -row[1])
+
+    get_app_ms = statistics.median(r['get_app_ms'] for r in runs)
+    result = {
+        'python': sys.version.split()[0],
+        'runs': args.runs,
+        'get_app_ms': {
+            'median': round(get_app_ms, 1),
+            'min': round(min(r['get_app_ms'] for r in runs), 1),
+            'max': round(max(r['get_app_ms'] for r in runs), 1),
+        },
+        'process_ms_median': round(statistics.median(r['process_ms'] for r in runs), 1),
+        'modules_loaded': len(last['modules']),
+        'top_cumulative_ms': [
+            {'module': name, 'ms': round(cum / 1000, 1)}
+            for name, _, cum, depth in by_cumulative if depth == 0
+        ][:args.top],
+        'top_self_ms': [
+            {'module': name, 'ms': round(self_us / 1000, 1)}
+            for name, self_us, _, _ in by_self[:args.top]
+        ],
+        'budget_ms': args.budget_ms,
+        'forbidden_imported': violations,
+    }
+    result['passed'] = get_app_ms <= args.budget_ms and not violations
+
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    return 0 if result['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+HTTP load test for the I/O-bound endpoints (/api/info, /api/session/*, /api/geo/*)
+
+Drives a running server with a fixed number of concurrent clients for a fixed
+duration and reports throughput and latency. When --server-pid is given, the
+server's CPU time is sampled from /proc so the result is also expressed as
+requests per CPU-second ("per core"), which is what to compare between the
+gevent/sync build and the async build:
+
+    # terminal 1 (the build under test)
+    gunicorn app:app -c nginx/gunicorn.config.py
+
+    # terminal 2
+    python -m benchmarks.load_test --url http://127.0.0.1:5000 \\
+        --server-pid $(pgrep -f 'gunicorn: worker' | head -1) \\
+        --concurrency 64 --duration 30 --output async.json
+
+Run the same command against the previous build and compare the JSON files.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+import httpx
+
+# (weight, method, path, body factory)
+REQUEST_MIX = [
+    (4, 'POST', '/api/session/track-time', lambda sid: {
+        'session_id': sid, 'page': 'home', 'totalTimeMs': random.randint(1000, 60000),
+        'sections': {'hero': {'timeMs': 1200, 'visits': 1}, 'projects': {'timeMs': 5400, 'visits': 2}},
+    }),
+    (3, 'POST', '/api/session/track-page', lambda sid: {'session_id': sid, 'page': 'projects'}),
+    (2, 'POST', '/api/session/validate', lambda sid: {'session_id': sid}),
+    (2, 'POST', '/api/info', lambda sid: {
+        'sessionId': sid, 'page': 'home', 'referrer': 'direct',
+        'fingerprintHash': uuid.uuid4().hex,
+    }),
+    (1, 'GET', '/api/geo/my-ip', None),
+]
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _cpu_seconds(pid: int) -> float:
+    """utime + stime of a process (and its waited-for children) from /proc"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    ticks = sum(int(v) for v in fields[11:15])  # utime stime cutime cstime
+    return ticks / os.sysconf('SC_CLK_TCK')
+
+
+async def _client(base_url: str, deadline: float, latencies: list, statuses: dict, weights: list):
+    sid = f"load-{uuid.uuid4().hex[:12]}"
+    headers = {'X-Forwarded-For': f"203.0.113.{random.randint(1, 254)}"}
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, headers=headers) as client:
+        while time.monotonic() < deadline:
+            _, method, path, body = random.choices(REQUEST_MIX, weights=weights)[0]
+            started = time.perf_counter()
+            try:
+                if method == 'POST':
+                    resp = await client.post(path, json=body(sid))
+                else:
+                    resp = await client.get(path)
+                status = resp.status_code
+            except httpx.HTTPError:
+                status = 'error'
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+
+async def run_load(base_url: str, concurrency: int, duration: float, server_pid: int = None) -> dict:
+    latencies, statuses = [], {}
+    weights = [w for w, *_ in REQUEST_MIX]
+    cpu_before = _cpu_seconds(server_pid) if server_pid else None
+    started = time.monotonic()
+    deadline = started + duration
+    await asyncio.gather(*[
+        _client(base_url, deadline, latencies, statuses, weights) for _ in range(concurrency)
+    ])
+    elapsed = time.monotonic() - started
+    latencies.sort()
+
+    result = {
+        'url': base_url,
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 2),
+        'requests': len(latencies),
+        'statuses': {str(k): v for k, v in statuses.items()},
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'latency_ms': {
+            'p50': round(_percentile(latencies, 50), 2),
+            'p95': round(_percentile(latencies, 95), 2),
+            'p99': round(_percentile(latencies, 99), 2),
+            'max': round(latencies[-1], 2) if latencies else 0.0,
+        },
+    }
+    if server_pid:
+        cpu = _cpu_seconds(server_pid) - cpu_before
+        result['server_cpu_s'] = round(cpu, 2)
+        result['rps_per_core'] = round(len(latencies) / cpu, 1) if cpu else None
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds')
+    parser.add_argument('--server-pid', type=int, help='server worker PID for CPU accounting')
+    parser.add_argument('--output', help='write the JSON result to this file')
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load(args.url, args.concurrency, args.duration, args.server_pid))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
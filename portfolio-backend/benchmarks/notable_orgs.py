@@ -0,0 +1,97 @@
+"""
+Notable-organization matcher benchmark
+
+Times services.linkedin_service.is_notable_org (Aho-Corasick, whole words)
+against the previous linear substring scan over NOTABLE_ORGS on a mix of
+organization names and headline fragments, plus email-derived names (one
+run-together token from the domain, matched with from_email=True), and lists
+the names on which the two disagree (the old scan also matched inside words,
+e.g. "nit" in "United"):
+
+    python -m benchmarks.notable_orgs --iterations 2000
+"""
+import argparse
+import json
+import time
+
+from services.linkedin_service import NOTABLE_ORGS, is_notable_org, match_notable_org
+
+NAMES = [
+    "Google", "Amazon Web Services", "Jane Street Capital", "Meta Platforms",
+    "Metamorphic Labs", "United Health Group", "Acme Widgets LLC", "Palo Alto Networks",
+    "Arizona State University", "Goldman Sachs & Co.", "Tata Consultancy Services",
+    "Infosys", "Stripe", "Community College of Denver", "Pineapple Studio",
+    "Senior Software Engineer at Microsoft", "Intelligent Systems Inc", "Penny Lane Cafe",
+    "Procter & Gamble", "Texas A&M University", "JP Morgan Chase", "Nordstrom",
+    "Cognizant", "Uber Eats", "Brightstar Consulting", "Salesforce.com",
+    "University of Washington Medicine", "Targeted Media Group", "Mercedes-Benz R&D",
+    "Freelance", "Self-employed", "Student", "Research Assistant - Carnegie Mellon",
+]
+# As extract_organization_from_email returns them ("a@jpmorganchase.com")
+EMAIL_NAMES = [
+    "Jpmorganchase", "Walmartlabs", "Amazonaws", "Googlemail", "Microsoftcorp",
+    "Bankofamerica", "Goldmansachs", "Ibmresearch", "Asu", "Mit", "Acmewidgets",
+    "Northwind", "Summitpartners", "Unitedhealthgroup", "Metamorphic", "Geico",
+]
+
+
+def legacy_is_notable_org(org_name):
+    """The previous implementation: substring test against every keyword"""
+    if not org_name:
+        return False
+    name = org_name.strip().lower()
+    if name in NOTABLE_ORGS:
+        return True
+    for notable in NOTABLE_ORGS:
+        if len(notable) >= 3 and notable in name:
+            return True
+    return False
+
+
+def _time(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for name in NAMES:
+            fn(name)
+        for name in EMAIL_NAMES:
+            fn(name, True)
+    return (time.perf_counter() - started) / (iterations * (len(NAMES) + len(EMAIL_NAMES))) * 1e6
+
+
+def _legacy(name, from_email=False):
+    return legacy_is_notable_org(name)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--output', help='write the JSON result to this file')
+    args = parser.parse_args(argv)
+
+    legacy_us = _time(_legacy, args.iterations)
+    matcher_us = _time(is_notable_org, args.iterations)
+    cases = [(name, False) for name in NAMES] + [(name, True) for name in EMAIL_NAMES]
+    result = {
+        'keywords': len(NOTABLE_ORGS),
+        'names': len(cases),
+        'legacy_us_per_name': round(legacy_us, 2),
+        'matcher_us_per_name': round(matcher_us, 2),
+        'speedup': round(legacy_us / matcher_us, 1),
+        'disagreements': [
+            {'name': name, 'from_email': from_email, 'legacy': legacy_is_notable_org(name),
+             'matched': match_notable_org(name, from_email)}
+            for name, from_email in cases
+            if legacy_is_notable_org(name) != is_notable_org(name, from_email)
+        ],
+    }
+
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Rate limiter micro-benchmark
+
+Compares utils.security.RateLimiter (sliding-window counter, LRU-capped) with
+the previous list-of-timestamps limiter (kept below as LegacyRateLimiter) on:
+
+- distinct: one check each from N distinct client keys (scanners, botnets)
+- hot: repeated checks on a few keys with many hits inside the window
+
+and reports ns per check, peak traced memory and keys retained:
+
+    python -m benchmarks.rate_limiter --keys 100000 --hot-checks 200000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from utils.security import RateLimiter
+
+
+class LegacyRateLimiter:
+    """The former implementation: a list of timestamps per key"""
+
+    def __init__(self):
+        self._requests = {}
+        self._check_count = 0
+
+    def is_rate_limited(self, key, max_requests=100, window_seconds=60):
+        current_time = time.time()
+        self._check_count += 1
+        if self._check_count % 100 == 0:
+            self.cleanup()
+        if key not in self._requests:
+            self._requests[key] = []
+        self._requests[key] = [
+            t for t in self._requests[key] if current_time - t < window_seconds
+        ]
+        if len(self._requests[key]) >= max_requests:
+            return True
+        self._requests[key].append(current_time)
+        return False
+
+    def cleanup(self):
+        current_time = time.time()
+        stale = [k for k, v in self._requests.items() if not v or current_time - max(v) > 3600]
+        for key in stale:
+            del self._requests[key]
+
+    def __len__(self):
+        return len(self._requests)
+
+
+def _run(factory, keys, max_requests, window_seconds) -> dict:
+    # Timed and traced in separate passes (tracemalloc slows every allocation)
+    limiter = factory()
+    started = time.perf_counter()
+    limited = 0
+    for key in keys:
+        limited += limiter.is_rate_limited(key, max_requests, window_seconds)
+    elapsed = time.perf_counter() - started
+
+    traced = factory()
+    tracemalloc.start()
+    for key in keys:
+        traced.is_rate_limited(key, max_requests, window_seconds)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'checks': len(keys),
+        'ns_per_check': round(elapsed / len(keys) * 1e9),
+        'limited': limited,
+        'peak_mb': round(peak / 2 ** 20, 2),
+        'keys_retained': len(limiter),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--keys', type=int, default=100000, help='distinct client keys')
+    parser.add_argument('--hot-keys', type=int, default=10)
+    parser.add_argument('--hot-checks', type=int, default=200000)
+    parser.add_argument('--max-requests', type=int, default=1000)
+    parser.add_argument('--window', type=int, default=300)
+    parser.add_argument('--max-keys', type=int, default=50000, help='LRU cap for the new limiter')
+    parser.add_argument('--output', help='write the JSON result to this file')
+    args = parser.parse_args(argv)
+
+    distinct = [f"login:10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(args.keys)]
+    hot = [f"login:192.0.2.{i % args.hot_keys}" for i in range(args.hot_checks)]
+
+    result = {}
+    for name, factory in (('sliding_window', lambda: RateLimiter(max_keys=args.max_keys)),
+                          ('legacy', LegacyRateLimiter)):
+        result[name] = {
+            'distinct': _run(factory, distinct, args.max_requests, args.window),
+            'hot': _run(factory, hot, args.max_requests, args.window),
+        }
+
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+"""
+Reproducible benchmark suite for the backend
+
+Boots create_app() in-process against either a local mongod (--mongo-uri) or
+an in-memory stand-in (--memory, mongomock), seeds a dataset of 10k to 10M
+visitor_info documents plus proportional sessions, registrations and LinkedIn
+profiles (seed.py), and replays a weighted request mix from concurrent
+clients (scenarios.py):
+
+    track_time        POST /api/session/track-time
+    track_visitor     POST /api/info
+    validate_session  POST /api/session/validate
+    register_visitor  POST /api/info/register-visitor (DDGS search stubbed)
+    org_stats         GET  /api/info/org-stats
+
+The JSON report has throughput, p50/p95/p99 latency and DB operations/time
+per request (from each response's Server-Timing header), overall and per
+scenario. Pass an earlier report as --baseline to flag regressions:
+
+    python -m benchmarks.suite --memory --size 10k --requests 2000 --output base.json
+    python -m benchmarks.suite --memory --size 10k --requests 2000 --baseline base.json
+
+Against mongod the dataset is kept between runs (benchmark_meta records its
+size and seed) and only reseeded when those change or with --reseed. Use a
+dedicated database (--db-name, default portfolio_bench): it is dropped on
+reseed.
+"""
@@ -0,0 +1,249 @@
+"""
+Run the benchmark suite (see benchmarks/suite/__init__.py)
+
+    python -m benchmarks.suite --memory --size 10k --requests 2000
+    python -m benchmarks.suite --mongo-uri mongodb://localhost:27017 --size 1m \\
+        --concurrency 16 --duration 60 --output run.json --baseline main.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+SERVER_TIMING_DB_RE = re.compile(r'db;dur=([\d.]+);desc="(\d+) cmds"')
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+class _Samples:
+    """Latencies, statuses and DB usage of one scenario"""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+        self.db_ops = 0
+        self.db_ms = 0.0
+        self.timed = 0  # responses that carried a db Server-Timing entry
+
+    def add(self, latency_ms: float, status: int, server_timing: str):
+        self.latencies.append(latency_ms)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        match = SERVER_TIMING_DB_RE.search(server_timing or '')
+        if match:
+            self.db_ms += float(match.group(1))
+            self.db_ops += int(match.group(2))
+            self.timed += 1
+
+    def summary(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            'requests': count,
+            'rps': round(count / elapsed, 1) if elapsed else 0.0,
+            'statuses': {str(k): v for k, v in sorted(self.statuses.items())},
+            'latency_ms': {
+                'p50': round(_percentile(latencies, 50), 2),
+                'p95': round(_percentile(latencies, 95), 2),
+                'p99': round(_percentile(latencies, 99), 2),
+                'max': round(latencies[-1], 2) if latencies else 0.0,
+            },
+            'db_ops_per_request': round(self.db_ops / self.timed, 2) if self.timed else None,
+            'db_ms_per_request': round(self.db_ms / self.timed, 3) if self.timed else None,
+        }
+
+
+def replay(app, ctx, mix: dict, concurrency: int, requests: int = None, duration: float = None):
+    """Drive the app with `concurrency` in-process clients; returns (samples per scenario, seconds)"""
+    from benchmarks.suite.scenarios import SCENARIOS
+
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = {name: _Samples() for name in names}
+    lock = threading.Lock()
+    remaining = [requests]
+    deadline = time.monotonic() + duration if duration else None
+
+    def take() -> bool:
+        if deadline is not None:
+            return time.monotonic() < deadline
+        with lock:
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def client():
+        test_client = app.test_client()
+        rng = random.Random()
+        while take():
+            name = rng.choices(names, weights=weights)[0]
+            method, path, body = SCENARIOS[name](ctx)
+            headers = {'X-Forwarded-For': ctx.ip(), 'User-Agent': 'benchmarks.suite'}
+            started = time.perf_counter()
+            response = test_client.open(path, method=method, json=body, headers=headers)
+            latency_ms = (time.perf_counter() - started) * 1000
+            with lock:
+                samples[name].add(latency_ms, response.status_code,
+                                  ', '.join(response.headers.getlist('Server-Timing')))
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.monotonic() - started
+
+
+def compare(result: dict, baseline: dict, max_regression_pct: float) -> list:
+    """Scenarios whose p95 latency or throughput regressed past the threshold"""
+    regressions = []
+    for name, current in result['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before or not before['requests'] or not current['requests']:
+            continue
+        p95_change = (current['latency_ms']['p95'] / before['latency_ms']['p95'] - 1) * 100 \
+            if before['latency_ms']['p95'] else 0.0
+        rps_change = (current['rps'] / before['rps'] - 1) * 100 if before['rps'] else 0.0
+        print(f"{name:18} p95 {before['latency_ms']['p95']:>9.2f} -> {current['latency_ms']['p95']:>9.2f} ms "
+              f"({p95_change:+.1f}%)   rps {before['rps']:>8.1f} -> {current['rps']:>8.1f} ({rps_change:+.1f}%)",
+              file=sys.stderr)
+        if p95_change > max_regression_pct or -rps_change > max_regression_pct:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--memory', action='store_true', help='in-memory stand-in (mongomock), the default')
+    target.add_argument('--mongo-uri', help='local mongod to seed and run against')
+    parser.add_argument('--db-name', default='portfolio_bench', help='database used with --mongo-uri')
+    parser.add_argument('--size', default='10k', help='visitor_info documents: 10k .. 10m')
+    parser.add_argument('--ip-pool', type=int, default=5000, help='distinct client addresses')
+    parser.add_argument('--reseed', action='store_true', help='drop and reseed an existing --mongo-uri dataset')
+    parser.add_argument('--mix', help='scenario weights, e.g. track_time=40,org_stats=5')
+    parser.add_argument('--concurrency', type=int, default=8)
+    run = parser.add_mutually_exclusive_group()
+    run.add_argument('--requests', type=int, help='total requests (default 2000)')
+    run.add_argument('--duration', type=float, help='seconds to run instead of a request count')
+    parser.add_argument('--search-latency-ms', type=float, default=300, help='stubbed DDGS search delay')
+    parser.add_argument('--search-hit-rate', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=7, help='dataset and request RNG seed')
+    parser.add_argument('--output', help='write the JSON result to this file')
+    parser.add_argument('--baseline', help='earlier result JSON to compare against')
+    parser.add_argument('--max-regression', type=float, default=20.0,
+                        help='exit 1 if p95 or rps of a scenario regresses by more than this %%')
+    parser.add_argument('--verbose', action='store_true', help='keep the app INFO logs')
+    args = parser.parse_args(argv)
+
+    # DBConfig reads these on import, so set them before importing the app
+    if args.mongo_uri:
+        os.environ['MONGO_URI'] = args.mongo_uri
+        os.environ.pop('MONGODB_URI', None)
+        os.environ['DB_NAME'] = args.db_name
+
+    from app import create_app
+    from benchmarks.suite import memory_db
+    from benchmarks.suite.scenarios import ScenarioContext, install_search_stub, parse_mix
+    from benchmarks.suite.seed import parse_size, seed
+    from utils.db_connect import DBConnect
+    from utils.indexes import reconcile_indexes
+
+    if not args.verbose:
+        # Seeding progress only; the app logs every request at INFO
+        logging.getLogger().setLevel(logging.WARNING)
+        logging.getLogger('benchmarks').setLevel(logging.INFO)
+    size = parse_size(args.size)
+    mix = parse_mix(args.mix)
+
+    if args.mongo_uri:
+        db = DBConnect().get_db()
+        meta = db.benchmark_meta.find_one({'_id': 'dataset'})
+        if args.reseed or not meta or meta.get('size') != size or meta.get('seed') != args.seed:
+            for name in db.list_collection_names():
+                db.drop_collection(name)
+            seeded = seed(db, size, args.ip_pool, args.seed)
+            db.benchmark_meta.replace_one(
+                {'_id': 'dataset'}, {'size': size, 'seed': args.seed, **seeded}, upsert=True
+            )
+        else:
+            seeded = {k: v for k, v in meta.items() if k in ('documents', 'seed_s')}
+        reconcile_indexes(db)
+    else:
+        if size > 1_000_000:
+            logging.warning("In-memory datasets over 1M documents need a lot of RAM; prefer --mongo-uri")
+        db = memory_db.install()
+        seeded = seed(db, size, args.ip_pool, args.seed)
+
+    install_search_stub(args.search_latency_ms, args.search_hit_rate, args.seed)
+    app = create_app()
+
+    ctx = ScenarioContext(size, min(args.ip_pool, 131072), random.Random(args.seed))
+    requests = args.requests or (None if args.duration else 2000)
+    samples, elapsed = replay(app, ctx, mix, args.concurrency, requests, args.duration)
+
+    total = _Samples()
+    for sample in samples.values():
+        total.latencies += sample.latencies
+        for status, n in sample.statuses.items():
+            total.statuses[status] = total.statuses.get(status, 0) + n
+        total.db_ops += sample.db_ops
+        total.db_ms += sample.db_ms
+        total.timed += sample.timed
+
+    result = {
+        'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'backend': 'mongod' if args.mongo_uri else 'memory',
+        'size': size,
+        'dataset': seeded,
+        'mix': mix,
+        'concurrency': args.concurrency,
+        'search_stub': {'latency_ms': args.search_latency_ms, 'hit_rate': args.search_hit_rate},
+        'duration_s': round(elapsed, 2),
+        'overall': total.summary(elapsed),
+        'scenarios': {name: sample.summary(elapsed) for name, sample in samples.items()},
+    }
+
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.max_regression)
+        if regressions:
+            print(f"Regressed past {args.max_regression}%: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+In-memory MongoDB stand-in for the benchmark suite
+
+install() puts mongomock-backed clients in DBConnect's per-role client slots,
+so the app, services and seeding all share one in-memory database without a
+mongod. The async roles get an awaitable wrapper over the same data.
+
+Every collection call is reported through request_db_stats.record_command(),
+as the pymongo CommandListener does against a real server, so the
+Server-Timing header and /api/metrics/db count DB operations in both modes.
+Latencies are those of mongomock (pure Python), so compare memory runs with
+memory runs only.
+"""
+import os
+import threading
+import time
+
+from utils.db_connect import ANALYTICS, ASYNC, ASYNC_ANALYTICS, PRIMARY, DBConnect
+from utils.request_db_stats import current_request_stats, record_command
+
+# Collection methods reported as commands (name -> server command name)
+_COMMANDS = {
+    'find': 'find', 'find_one': 'find', 'insert_one': 'insert', 'insert_many': 'insert',
+    'update_one': 'update', 'update_many': 'update', 'replace_one': 'update',
+    'delete_one': 'delete', 'delete_many': 'delete', 'count_documents': 'aggregate',
+    'aggregate': 'aggregate', 'find_one_and_update': 'findAndModify', 'bulk_write': 'update',
+    'distinct': 'distinct',
+}
+
+# mongomock is not thread-safe; the app serves requests from several threads
+_lock = threading.RLock()
+
+
+def _docs(result) -> int:
+    if isinstance(result, list):
+        return len(result)
+    return 1 if isinstance(result, dict) else 0
+
+
+class _Collection:
+    """mongomock collection whose calls are recorded like driver commands"""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        command = _COMMANDS.get(name)
+        if command is None:
+            return attr
+        key = f"{command} {self._collection.name}"
+
+        def call(*args, **kwargs):
+            kwargs.pop('allowDiskUse', None)
+            kwargs.pop('session', None)
+            started = time.perf_counter()
+            try:
+                with _lock:
+                    result = attr(*args, **kwargs)
+                    if name in ('find', 'aggregate'):
+                        result = list(result) if name == 'aggregate' else _LockedCursor(result)
+            except Exception:
+                record_command(key, (time.perf_counter() - started) * 1000, 0, True,
+                               current_request_stats())
+                raise
+            # find() returns mongomock's lazy cursor: documents are not counted
+            record_command(key, (time.perf_counter() - started) * 1000, _docs(result), False,
+                           current_request_stats())
+            return result
+        return call
+
+
+class _LockedCursor:
+    """mongomock cursor whose iteration holds the store lock"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        attr = getattr(self._cursor, name)
+        if name in ('sort', 'limit', 'skip', 'batch_size', 'hint'):
+            def chain(*args, **kwargs):
+                attr(*args, **kwargs)
+                return self
+            return chain
+        return attr
+
+    def __iter__(self):
+        with _lock:
+            return iter(list(self._cursor))
+
+
+class _AsyncCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    async def to_list(self, length=None):
+        docs = list(self._docs)
+        return docs if length is None else docs[:length]
+
+    def __aiter__(self):
+        self._iter = iter(self._docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _AsyncCollection:
+    """Awaitable facade over _Collection, shaped like AsyncCollection"""
+
+    def __init__(self, collection: _Collection):
+        self._collection = collection
+
+    def find(self, *args, **kwargs):
+        return _AsyncCursor(self._collection.find(*args, **kwargs))
+
+    async def aggregate(self, *args, **kwargs):
+        return _AsyncCursor(self._collection.aggregate(*args, **kwargs))
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+
+class _Database:
+    def __init__(self, db, async_: bool):
+        self._db = db
+        self._async = async_
+
+    def __getitem__(self, name):
+        collection = _Collection(self._db[name])
+        return _AsyncCollection(collection) if self._async else collection
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self[name]
+
+    def command(self, *args, **kwargs):
+        result = {'ok': 1.0}
+        if not self._async:
+            return result
+
+        async def done():
+            return result
+        return done()
+
+
+class _Client:
+    def __init__(self, client, async_: bool):
+        self._client = client
+        self._async = async_
+
+    def __getitem__(self, name):
+        return _Database(self._client[name], self._async)
+
+
+def install():
+    """Serve every DBConnect role from one shared in-memory database"""
+    try:
+        import mongomock
+    except ImportError:
+        raise SystemExit("The in-memory mode needs mongomock: pip install mongomock")
+
+    client = mongomock.MongoClient()
+    pid = os.getpid()
+    for role, async_ in ((PRIMARY, False), (ANALYTICS, False), (ASYNC, True), (ASYNC_ANALYTICS, True)):
+        DBConnect._clients[role] = _Client(client, async_)
+        DBConnect._client_pids[role] = pid
+    return DBConnect().get_db()
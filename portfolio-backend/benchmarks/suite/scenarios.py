@@ -0,0 +1,128 @@
+"""
+Request scenarios replayed by the benchmark suite
+
+Each scenario builds one request (method, path, JSON body) from the seeded
+dataset: tracking beacons and session checks mostly hit existing sessions,
+registrations use fresh names so every one runs a LinkedIn lookup, which
+install_search_stub() answers locally after a configurable delay.
+"""
+import itertools
+import random
+import re
+import time
+import uuid
+
+from benchmarks.suite.seed import PAGES, REFERRERS, client_ip
+
+# Default mix (relative weights), roughly the production proportions
+DEFAULT_MIX = {
+    'track_time': 40,
+    'track_visitor': 20,
+    'validate_session': 25,
+    'register_visitor': 5,
+    'org_stats': 10,
+}
+
+
+class ScenarioContext:
+    """Dataset facts the scenarios draw from"""
+
+    def __init__(self, sessions: int, ip_pool: int, rng: random.Random):
+        self.sessions = sessions
+        self.ip_pool = ip_pool
+        self.rng = rng
+        self.registrations = itertools.count(1)
+
+    def session_id(self, new_fraction: float = 0.1) -> str:
+        if self.rng.random() < new_fraction:
+            return f"bench-{uuid.uuid4().hex[:16]}"
+        return f"seed-{self.rng.randrange(self.sessions):08x}"
+
+    def ip(self) -> str:
+        return client_ip(self.rng.randrange(self.ip_pool))
+
+
+def track_time(ctx: ScenarioContext):
+    return 'POST', '/api/session/track-time', {
+        'session_id': ctx.session_id(), 'page': ctx.rng.choice(PAGES),
+        'totalTimeMs': ctx.rng.randint(1000, 120000),
+        'sections': {'hero': {'timeMs': 1200, 'visits': 1}, 'projects': {'timeMs': 5400, 'visits': 2}},
+    }
+
+
+def track_visitor(ctx: ScenarioContext):
+    return 'POST', '/api/info', {
+        'sessionId': ctx.session_id(new_fraction=0.5), 'page': ctx.rng.choice(PAGES),
+        'referrer': ctx.rng.choice(REFERRERS), 'fingerprintHash': uuid.uuid4().hex,
+        'screen': {'width': 1440, 'height': 900}, 'language': 'en-US',
+    }
+
+
+def validate_session(ctx: ScenarioContext):
+    return 'POST', '/api/session/validate', {'session_id': ctx.session_id()}
+
+
+def register_visitor(ctx: ScenarioContext):
+    n = next(ctx.registrations)
+    first = f"Bench{n}"
+    return 'POST', '/api/info/register-visitor', {
+        'firstName': first, 'lastName': 'Runner',
+        'email': f"bench{n}@{ctx.rng.choice(['gmail.com', 'asu.edu', 'microsoft.com'])}",
+        'sessionId': ctx.session_id(new_fraction=1.0),
+    }
+
+
+def org_stats(ctx: ScenarioContext):
+    return 'GET', '/api/info/org-stats', None
+
+
+SCENARIOS = {
+    'track_time': track_time,
+    'track_visitor': track_visitor,
+    'validate_session': validate_session,
+    'register_visitor': register_visitor,
+    'org_stats': org_stats,
+}
+
+
+def parse_mix(value: str) -> dict:
+    """'track_time=40,org_stats=5' -> weights (unlisted scenarios are off)"""
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def install_search_stub(latency_ms: float, hit_rate: float, rng_seed: int = 11):
+    """
+    Answer DDGS searches locally: wait latency_ms, then return a profile that
+    matches the queried name with probability hit_rate (else no results).
+    """
+    import services.linkedin_service as linkedin_service
+
+    rng = random.Random(rng_seed)
+
+    def search(query, backend='auto'):
+        time.sleep(latency_ms / 1000)
+        name = re.search(r'"([^"]+)"', query)
+        if not name or rng.random() >= hit_rate:
+            return []
+        name = name.group(1)
+        slug = '-'.join(name.lower().split())
+        headline = f"{name} - Software Engineer at Microsoft"
+        return [{
+            'found': True,
+            'url': f"https://www.linkedin.com/in/{slug}",
+            'headline': headline,
+            'organization_from_headline': linkedin_service.extract_organization_from_headline(headline),
+            'source': f"ddgs_{backend}",
+        }]
+
+    linkedin_service._ddgs_search = search
+    linkedin_service.SERPER_API_KEY = ''
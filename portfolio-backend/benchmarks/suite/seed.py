@@ -0,0 +1,170 @@
+"""
+Dataset seeding for the benchmark suite
+
+seed() fills a database with `size` visitor_info documents and proportional
+sessions, registered_visitors, linkedin_profiles and ip_cache entries,
+generated with the app's own document builders so shapes and indexes match
+production. Generation is deterministic for a given --seed.
+
+Client addresses come from 198.18.0.0/15 (RFC 2544 benchmarking range); every
+address the replay uses has an ip_cache entry, so no ipinfo.io call is made.
+"""
+import hashlib
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+
+from services.ip_service import parse_ipinfo_response
+from services.linkedin_service import NOTABLE_ORGS, organization_fields
+from services.session_service import new_session_doc
+from services.visitor_service import build_visitor_doc
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 5000
+
+CITIES = [
+    ('Phoenix', 'Arizona', 'US', '33.4484,-112.0740', 'America/Phoenix'),
+    ('Tempe', 'Arizona', 'US', '33.4255,-111.9400', 'America/Phoenix'),
+    ('Seattle', 'Washington', 'US', '47.6062,-122.3321', 'America/Los_Angeles'),
+    ('New York City', 'New York', 'US', '40.7128,-74.0060', 'America/New_York'),
+    ('Hyderabad', 'Telangana', 'IN', '17.3850,78.4867', 'Asia/Kolkata'),
+    ('Bengaluru', 'Karnataka', 'IN', '12.9716,77.5946', 'Asia/Kolkata'),
+    ('London', 'England', 'GB', '51.5074,-0.1278', 'Europe/London'),
+    ('Berlin', 'Land Berlin', 'DE', '52.5200,13.4050', 'Europe/Berlin'),
+    ('Toronto', 'Ontario', 'CA', '43.6532,-79.3832', 'America/Toronto'),
+    ('Singapore', 'Singapore', 'SG', '1.3521,103.8198', 'Asia/Singapore'),
+]
+USER_AGENTS = [
+    {'browser': 'Chrome', 'browser_version': '126.0', 'os': 'Windows', 'os_version': '10', 'device': 'Other'},
+    {'browser': 'Safari', 'browser_version': '17.5', 'os': 'Mac OS X', 'os_version': '10.15', 'device': 'Mac'},
+    {'browser': 'Mobile Safari', 'browser_version': '17.5', 'os': 'iOS', 'os_version': '17.5', 'device': 'iPhone'},
+    {'browser': 'Firefox', 'browser_version': '127.0', 'os': 'Ubuntu', 'os_version': '', 'device': 'Other'},
+    {'browser': 'Chrome Mobile', 'browser_version': '126.0', 'os': 'Android', 'os_version': '14', 'device': 'Pixel 8'},
+]
+PAGES = ['home', 'projects', 'experience', 'skills', 'contact']
+REFERRERS = ['direct', 'https://www.linkedin.com/', 'https://www.google.com/', 'https://github.com/']
+FIRST_NAMES = ['Aarav', 'Maya', 'Liam', 'Priya', 'Noah', 'Sofia', 'Ethan', 'Ananya', 'Lucas', 'Zoe']
+LAST_NAMES = ['Sharma', 'Nguyen', 'Smith', 'Reddy', 'Garcia', 'Kim', 'Patel', 'Brown', 'Chen', 'Lopez']
+EMAIL_DOMAINS = ['gmail.com', 'asu.edu', 'outlook.com', 'microsoft.com', 'amazon.com',
+                 'acme-widgets.io', 'mit.edu', 'northwind.co', 'google.com', 'yahoo.com']
+
+
+def parse_size(value: str) -> int:
+    """'10k', '1m', '10M', '250000' -> document count"""
+    value = value.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip('km')) * multiplier)
+
+
+def client_ip(i: int) -> str:
+    return f"198.{18 + (i >> 16) % 2}.{(i >> 8) & 255}.{i & 255}"
+
+
+def ip_info_for(i: int) -> dict:
+    city, region, country, loc, tz = CITIES[i % len(CITIES)]
+    return parse_ipinfo_response(client_ip(i), 200, {
+        'city': city, 'region': region, 'country': country, 'loc': loc, 'timezone': tz,
+        'org': 'AS64496 Example Networks',
+    })
+
+
+def _insert(collection, docs: list):
+    if docs:
+        collection.insert_many(docs, ordered=False)
+
+
+def _fill(collection, count: int, make):
+    batch = []
+    for i in range(count):
+        batch.append(make(i))
+        if len(batch) >= BATCH_SIZE:
+            _insert(collection, batch)
+            batch = []
+    _insert(collection, batch)
+
+
+def seed(db, size: int, ip_pool: int, rng_seed: int = 7) -> dict:
+    """
+    Seed the benchmark collections.
+
+    Returns:
+        Document count per collection and the seeding time
+    """
+    rng = random.Random(rng_seed)
+    started = time.monotonic()
+    now = datetime.utcnow()
+    ip_infos = [ip_info_for(i) for i in range(min(ip_pool, 131072))]
+    organizations = sorted(NOTABLE_ORGS)[:40] + ['Acme Widgets', 'Northwind', 'Initech', None]
+
+    def when():
+        return now - timedelta(seconds=rng.randrange(90 * 86400))
+
+    def visitor(i):
+        n = rng.randrange(len(ip_infos))
+        doc = build_visitor_doc(
+            f"seed-{i:08x}", client_ip(n), None, ip_infos[n], 'seed', rng.choice(USER_AGENTS),
+            rng.choice(PAGES), rng.choice(REFERRERS),
+            {'screen': {'width': 1920, 'height': 1080}, 'language': 'en-US'},
+            hashlib.sha1(f"fp-{i}".encode()).hexdigest(),
+        )
+        doc['timestamp'] = doc['last_activity'] = when()
+        doc['visit_count'] = 1 + int(rng.expovariate(1.0))
+        return doc
+
+    def session(i):
+        doc = new_session_doc(f"seed-{i:08x}", client_ip(rng.randrange(len(ip_infos))), 'seed')
+        doc['created_at'] = doc['last_activity'] = when()
+        doc['page_views'] = 1 + int(rng.expovariate(0.5))
+        doc['pages_visited'] = rng.sample(PAGES, rng.randint(1, 3))
+        doc['is_tracked'] = True
+        return doc
+
+    def person(i):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        email = f"{first.lower()}.{last.lower()}{i}@{rng.choice(EMAIL_DOMAINS)}"
+        return first, last, email, rng.choice(organizations)
+
+    def registration(i):
+        first, last, email, organization = person(i)
+        geo = ip_infos[rng.randrange(len(ip_infos))]
+        return {
+            'first_name': first, 'middle_name': '', 'last_name': last,
+            'full_name': f"{first} {last}", 'email': email, 'organization': organization,
+            **organization_fields(email, organization),
+            'ip_address': geo['ip'], 'ip_info': geo,
+            'linkedin': {'found': rng.random() < 0.4, 'url': None, 'headline': '', 'source': 'seed'},
+            'registered_at': when(), 'session_id': f"seed-{i:08x}",
+            'fingerprint_hash': hashlib.sha1(f"fp-{i}".encode()).hexdigest(),
+            'geo': {'city': geo['city'], 'region': geo['region'],
+                    'country': geo['country_name'], 'timezone': geo['timezone']},
+        }
+
+    def profile(i):
+        first, last, email, organization = person(i)
+        found = rng.random() < 0.4
+        return {
+            'first_name': first, 'middle_name': '', 'last_name': last, 'email': email,
+            'found': found, 'url': f"https://www.linkedin.com/in/seed-{i}" if found else None,
+            'headline': f"Engineer at {organization}" if found and organization else '',
+            'source': 'seed', 'match_score': 80 if found else None,
+            'organization': organization,
+            'notable_org': organization if found and organization in NOTABLE_ORGS else None,
+            'created_at': when(), 'updated_at': now,
+        }
+
+    counts = {
+        'ip_cache': len(ip_infos),
+        'visitor_info': size,
+        'sessions': size,
+        'registered_visitors': max(1, size // 20),
+        'linkedin_profiles': max(1, size // 25),
+    }
+    _fill(db.ip_cache, counts['ip_cache'], lambda i: {**ip_infos[i], 'cached_at': now})
+    for name, make in (('visitor_info', visitor), ('sessions', session),
+                       ('registered_visitors', registration), ('linkedin_profiles', profile)):
+        logger.info(f"Seeding {counts[name]} {name} documents")
+        _fill(db[name], counts[name], make)
+
+    return {'documents': counts, 'seed_s': round(time.monotonic() - started, 2)}
@@ -28,6 +28,9 @@ This package contains Flask blueprints organized in a microservice-like pattern:
     POST /api/geo/lookup
     GET  /api/geo/my-ip
     GET  /api/geo/stats (protected)
+
+- metrics.py: In-process monitoring
+    GET  /api/metrics/db (protected)
 """
 
 from .auth import auth_bp
@@ -35,5 +38,6 @@ from .contact import contact_bp
 from .info import info_bp
 from .session import session_bp
 from .geolocation import geo_bp
+from .metrics import metrics_bp
 
-__all__ = ['auth_bp', 'contact_bp', 'info_bp', 'session_bp', 'geo_bp']
+__all__ = ['auth_bp', 'contact_bp', 'info_bp', 'session_bp', 'geo_bp', 'metrics_bp']
@@ -2,14 +2,39 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from utils.db_connect import DBConnect
-from utils.security import InputSanitizer, get_rate_limiter, get_client_ip
+from utils.security import get_rate_limiter, get_client_ip
+from utils.validation import Field, Schema, ValidationError
+from utils.password_hasher import PasswordHasherBusy
 from models.user import User
+from services.user_cache import get_user_cache
 from datetime import datetime
 import logging
 
 auth_bp = Blueprint('auth', __name__)
 logger = logging.getLogger(__name__)
 
+
+REGISTER_SCHEMA = Schema(
+    Field('username', 'username', check_injection=True, min_length=3,
+          message='Username must be at least 3 characters (alphanumeric only)'),
+    Field('password', 'password'),
+    Field('email', 'email'),
+)
+
+LOGIN_SCHEMA = Schema(
+    Field('username', 'username', check_injection=True, required=True,
+          message='Username and password required'),
+    Field('password', 'password', required=True, message='Username and password required'),
+)
+
+
+def _hasher_busy_response():
+    """All bcrypt slots are taken: shed load instead of queueing CPU work"""
+    response = jsonify({'error': 'Server busy. Please try again shortly.'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Register a new user with secure password handling"""
@@ -26,22 +51,14 @@ def register():
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        # Sanitize inputs
-        username = InputSanitizer.sanitize_username(data.get('username', ''))
-        password = data.get('password', '').strip()  # Don't sanitize password to preserve special chars
-        email = InputSanitizer.sanitize_email(data.get('email', ''))
-        
-        # Check for NoSQL injection attempts
-        if InputSanitizer.check_nosql_injection(data.get('username', '')):
-            logger.warning(f"NoSQL injection attempt in username from {client_ip}")
-            return jsonify({'error': 'Invalid input'}), 400
-        
-        # Validation
-        if not username or len(username) < 3:
-            return jsonify({'error': 'Username must be at least 3 characters (alphanumeric only)'}), 400
-        
-        if len(username) > 50:
-            return jsonify({'error': 'Username too long'}), 400
+        # Sanitize and validate inputs (password is kept as typed)
+        try:
+            values = REGISTER_SCHEMA.validate(data)
+        except ValidationError as e:
+            if e.injection:
+                logger.warning(f"NoSQL injection attempt in {e.field} from {client_ip}")
+            return jsonify({'error': e.message}), 400
+        username, password, email = values['username'], values['password'], values['email']
         
         # Password strength validation
         is_valid, error_msg = User.validate_password(password)
@@ -71,6 +88,7 @@ def register():
         }
         
         result = users_collection.insert_one(new_user)
+        get_user_cache().invalidate(username)  # drop a cached "unknown user"
         
         if result.inserted_id:
             logger.info(f"New user registered: {username}")
@@ -81,6 +99,9 @@ def register():
         else:
             return jsonify({'error': 'Failed to register user'}), 500
             
+    except PasswordHasherBusy:
+        logger.warning("Password hasher busy, rejecting registration")
+        return _hasher_busy_response()
     except Exception as e:
         logger.error(f"Registration error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -102,20 +123,18 @@ def login():
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        username = InputSanitizer.sanitize_username(data.get('username', ''))
-        password = data.get('password', '').strip()
+        try:
+            values = LOGIN_SCHEMA.validate(data)
+        except ValidationError as e:
+            if e.injection:
+                logger.warning(f"NoSQL injection attempt in login from {client_ip}")
+                return jsonify({'error': 'Invalid credentials'}), 401
+            return jsonify({'error': e.message}), 400
+        username, password = values['username'], values['password']
         
-        # Check for injection attempts
-        if InputSanitizer.check_nosql_injection(data.get('username', '')):
-            logger.warning(f"NoSQL injection attempt in login from {client_ip}")
-            return jsonify({'error': 'Invalid credentials'}), 401
-        
-        if not username or not password:
-            return jsonify({'error': 'Username and password required'}), 400
-        
-        # Get user from database
-        db = DBConnect().get_db()
-        user = db.users.find_one({'username': username})
+        # Get user (cached, including "no such user")
+        user_cache = get_user_cache()
+        user = user_cache.get(username)
         
         # Generic error message to prevent username enumeration
         if not user:
@@ -135,6 +154,7 @@ def login():
                     pass  # If timestamp is corrupted, skip lockout check
         
         # Verify password
+        db = DBConnect().get_db()
         if not User.verify_password(password, user['password_hash']):
             # Increment failed login attempts
             db.users.update_one(
@@ -144,20 +164,24 @@ def login():
                     '$set': {'last_failed_login': datetime.utcnow()}
                 }
             )
+            user_cache.invalidate(username)
             logger.warning(f"Failed login attempt for user: {username} from {client_ip}")
             return jsonify({'error': 'Invalid credentials'}), 401
         
         # Reset login attempts on successful login
-        db.users.update_one(
-            {'_id': user['_id']},
-            {
-                '$set': {
-                    'login_attempts': 0,
-                    'last_login': datetime.utcnow(),
-                    'last_login_ip': client_ip
-                }
-            }
-        )
+        updates = {
+            'login_attempts': 0,
+            'last_login': datetime.utcnow(),
+            'last_login_ip': client_ip
+        }
+        # Upgrade hashes made with a lower cost factor while we have the password
+        if User.needs_rehash(user['password_hash']):
+            try:
+                updates['password_hash'] = User.hash_password(password)
+            except PasswordHasherBusy:
+                pass  # upgrade on a later login
+        db.users.update_one({'_id': user['_id']}, {'$set': updates})
+        user_cache.invalidate(username)
         
         # Create access token
         access_token = create_access_token(identity=user['username'])
@@ -168,6 +192,9 @@ def login():
             'username': user['username']
         }), 200
         
+    except PasswordHasherBusy:
+        logger.warning("Password hasher busy, rejecting login")
+        return _hasher_busy_response()
     except Exception as e:
         logger.error(f"Login error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -179,8 +206,7 @@ def get_profile():
     try:
         current_username = get_jwt_identity()
         
-        db = DBConnect().get_db()
-        user = db.users.find_one({'username': current_username})
+        user = get_user_cache().get(current_username)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
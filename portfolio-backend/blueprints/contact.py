@@ -3,12 +3,23 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from utils.db_connect import DBConnect
 from utils.security import InputSanitizer, get_rate_limiter
+from utils.validation import Field, Schema, ValidationError
 from datetime import datetime
 import logging
 
 contact_bp = Blueprint('contact', __name__)
 logger = logging.getLogger(__name__)
 
+CONTACT_SCHEMA = Schema(
+    Field('name', 'html', max_length=100, min_length=2, check_injection=True,
+          message='Name must be at least 2 characters'),
+    Field('email', 'email', required=True, message='Valid email is required'),
+    Field('subject', 'html', max_length=200, min_length=3, check_injection=True,
+          message='Subject must be at least 3 characters'),
+    Field('message', 'html', max_length=5000, min_length=10, check_injection=True,
+          message='Message must be at least 10 characters'),
+)
+
 @contact_bp.route('', methods=['POST'])
 def submit_contact():
     """Submit contact form message with input validation and rate limiting"""
@@ -26,31 +37,16 @@ def submit_contact():
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        # Sanitize all inputs
-        name = InputSanitizer.sanitize_html(data.get('name', ''), max_length=100)
-        email = InputSanitizer.sanitize_email(data.get('email', ''))
-        subject = InputSanitizer.sanitize_html(data.get('subject', ''), max_length=200)
-        message = InputSanitizer.sanitize_html(data.get('message', ''), max_length=5000)
-        
-        # Check for NoSQL injection in all fields
-        raw_fields = [data.get('name', ''), data.get('subject', ''), data.get('message', '')]
-        for field in raw_fields:
-            if InputSanitizer.check_nosql_injection(str(field)):
+        # Sanitize and validate all inputs
+        try:
+            values = CONTACT_SCHEMA.validate(data)
+        except ValidationError as e:
+            if e.injection:
                 logger.warning(f"NoSQL injection attempt in contact form from {client_ip}")
                 return jsonify({'error': 'Invalid input detected'}), 400
-        
-        # Validation
-        if not name or len(name) < 2:
-            return jsonify({'error': 'Name must be at least 2 characters'}), 400
-        
-        if not email:
-            return jsonify({'error': 'Valid email is required'}), 400
-        
-        if not subject or len(subject) < 3:
-            return jsonify({'error': 'Subject must be at least 3 characters'}), 400
-        
-        if not message or len(message) < 10:
-            return jsonify({'error': 'Message must be at least 10 characters'}), 400
+            return jsonify({'error': e.message}), 400
+        name, email = values['name'], values['email']
+        subject, message = values['subject'], values['message']
         
         # Additional spam detection - check for suspicious patterns
         spam_patterns = ['http://', 'https://', '[url=', '<a href']
@@ -1,7 +1,7 @@
-"""IP Geolocation blueprint"""
+"""IP Geolocation blueprint (async views, see utils/async_runtime.py)"""
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
-from services.ip_service import get_ip_service
+from services.async_ip_service import get_async_ip_service
 import logging
 
 geo_bp = Blueprint('geolocation', __name__)
@@ -9,7 +9,7 @@ logger = logging.getLogger(__name__)
 
 
 @geo_bp.route('/lookup', methods=['POST'])
-def lookup_ip():
+async def lookup_ip():
     """
     Look up geolocation info for an IP address.
     Can be used by frontend to get location info.
@@ -27,8 +27,8 @@ def lookup_ip():
             else:
                 ip_address = request.remote_addr
         
-        ip_service = get_ip_service()
-        ip_info = ip_service.get_ip_info(ip_address)
+        ip_service = get_async_ip_service()
+        ip_info = await ip_service.get_ip_info(ip_address)
         
         # Remove internal fields for response
         response_info = {
@@ -51,7 +51,7 @@ def lookup_ip():
 
 
 @geo_bp.route('/my-ip', methods=['GET'])
-def get_my_ip():
+async def get_my_ip():
     """
     Get the visitor's IP address as detected by the server.
     Useful for frontend to know what IP the backend sees.
@@ -62,8 +62,8 @@ def get_my_ip():
         else:
             ip_address = request.remote_addr
         
-        ip_service = get_ip_service()
-        ip_info = ip_service.get_ip_info(ip_address)
+        ip_service = get_async_ip_service()
+        ip_info = await ip_service.get_ip_info(ip_address)
         
         return jsonify({
             'ip': ip_address,
@@ -82,11 +82,11 @@ def get_my_ip():
 
 @geo_bp.route('/stats', methods=['GET'])
 @jwt_required()
-def get_ip_stats():
+async def get_ip_stats():
     """Get IP geolocation statistics (protected endpoint)"""
     try:
-        ip_service = get_ip_service()
-        stats = ip_service.get_ip_stats()
+        ip_service = get_async_ip_service()
+        stats = await ip_service.get_ip_stats()
         
         return jsonify(stats), 200
         
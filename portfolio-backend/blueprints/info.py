@@ -3,19 +3,20 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from datetime import datetime
 import logging
-from ua_parser import user_agent_parser
 
-from services.visitor_service import get_visitor_service
+from services.visitor_service import get_visitor_service, parse_user_agent
+from services.async_visitor_service import get_async_visitor_service
 from services.ip_service import get_ip_service
 from services.linkedin_service import (
     search_linkedin_profile,
     extract_organization_from_email,
     validate_linkedin_url,
     get_notable_org_name,
-    is_notable_org,
+    organization_fields,
 )
 from utils.db_connect import DBConnect
-from utils.security import InputSanitizer, get_rate_limiter, get_client_ip
+from utils.security import get_rate_limiter, get_client_ip
+from utils.validation import Field, Schema, ValidationError
 
 info_bp = Blueprint('info', __name__)
 logger = logging.getLogger(__name__)
@@ -34,11 +35,22 @@ COUNTRY_CODE_TO_NAME = {
 }
 
 
+REGISTER_VISITOR_SCHEMA = Schema(
+    Field('first_name', 'html', source='firstName', max_length=50, required=True,
+          check_injection=True, message='First and last name are required'),
+    Field('middle_name', 'html', source='middleName', max_length=50),
+    Field('last_name', 'html', source='lastName', max_length=50, required=True,
+          check_injection=True, message='First and last name are required'),
+    Field('email', 'email'),
+    Field('linkedin_url', 'html', source='linkedinUrl', max_length=200),
+)
+
+
 @info_bp.route('', methods=['POST'])
-def store_visitor_info():
+async def store_visitor_info():
     """
     Store visitor information with session-based deduplication.
-    Uses the new service layer for tracking.
+    Async view: tracking runs on the async service layer.
     """
     try:
         data = request.get_json(force=True) or {}
@@ -58,8 +70,8 @@ def store_visitor_info():
         referrer = data.get('referrer', 'direct')
         fingerprint_hash = data.get('fingerprintHash') or data.get('fingerprint_hash') or None
 
-        visitor_service = get_visitor_service()
-        result = visitor_service.track_visitor(
+        visitor_service = get_async_visitor_service()
+        result = await visitor_service.track_visitor(
             session_id=session_id,
             ip_address=ip_address,
             client_ip=client_ip,
@@ -114,33 +126,28 @@ def register_visitor():
         db = DBConnect().get_db()
         data = request.get_json(force=True) or {}
         
-        # Sanitize all inputs
-        first_name = InputSanitizer.sanitize_html(data.get('firstName', ''), max_length=50)
-        middle_name = InputSanitizer.sanitize_html(data.get('middleName', ''), max_length=50)
-        last_name = InputSanitizer.sanitize_html(data.get('lastName', ''), max_length=50)
-        email = InputSanitizer.sanitize_email(data.get('email', ''))
-        
-        # Check for injection attempts
-        raw_values = [data.get('firstName', ''), data.get('lastName', '')]
-        for value in raw_values:
-            if InputSanitizer.check_nosql_injection(str(value)):
+        # Sanitize and validate all inputs
+        try:
+            values = REGISTER_VISITOR_SCHEMA.validate(data)
+        except ValidationError as e:
+            if e.injection:
                 logger.warning(f"NoSQL injection attempt in visitor registration from {client_ip}")
                 return jsonify({'error': 'Invalid input'}), 400
-        
-        if not first_name or not last_name:
-            return jsonify({'error': 'First and last name are required'}), 400
+            return jsonify({'error': e.message}), 400
+        first_name, middle_name, last_name = values['first_name'], values['middle_name'], values['last_name']
+        email = values['email'] or None
 
         ip_address = get_client_ip(request)
         ip_service = get_ip_service()
         ip_info = ip_service.get_ip_info(ip_address)
         
         user_agent_string = request.headers.get('User-Agent', 'unknown')
-        ua_parsed = user_agent_parser.Parse(user_agent_string)
+        ua_data = parse_user_agent(user_agent_string)
         
         organization = extract_organization_from_email(email)
 
         # Accept user-provided LinkedIn URL (most reliable source)
-        raw_linkedin_url = InputSanitizer.sanitize_html(data.get('linkedinUrl', ''), max_length=200)
+        raw_linkedin_url = values['linkedin_url']
         linkedin_url = validate_linkedin_url(raw_linkedin_url) if raw_linkedin_url else None
 
         linkedin_info = search_linkedin_profile(
@@ -212,6 +219,7 @@ def register_visitor():
                         "full_name": f"{first_name} {middle_name} {last_name}".strip().replace('  ', ' '),
                         "email": email,
                         "organization": organization,
+                        **organization_fields(email, organization),
                         "ip_info": ip_info,
                         "linkedin": linkedin_response,
                         "updated_at": datetime.utcnow(),
@@ -242,11 +250,12 @@ def register_visitor():
             'full_name': f"{first_name} {middle_name} {last_name}".strip().replace('  ', ' '),
             'email': email,
             'organization': organization,
+            **organization_fields(email, organization),
             'ip_address': ip_address,
             'ip_info': ip_info,  # Store full geolocation data
-            'browser': ua_parsed.get('user_agent', {}).get('family'),
-            'os': ua_parsed.get('os', {}).get('family'),
-            'device': ua_parsed.get('device', {}).get('family'),
+            'browser': ua_data.get('browser'),
+            'os': ua_data.get('os'),
+            'device': ua_data.get('device'),
             'linkedin': linkedin_response,
             'registered_at': datetime.utcnow(),
             'fingerprint': data.get('fingerprint', {}),
@@ -306,76 +315,27 @@ def get_organization_stats():
         visitor_service = get_visitor_service()
         total_visitors = visitor_service.get_unique_visitor_count()
 
-        db = DBConnect().get_db()
+        # Analytics client: secondary reads, separate pool from ingestion
+        db_connect = DBConnect()
+        db = db_connect.get_analytics_db()
+        agg_options = db_connect.analytics_aggregate_options()
         collection = db.registered_visitors
 
-        # Derive org from email when organization is missing (e.g. @asu.edu -> Asu) so all ASU users count together
-        _email_domain = {"$toLower": {"$arrayElemAt": [{"$split": [{"$ifNull": ["$email", ""]}, "@"]}, 1]}}
-        _has_org = {"$and": [
-            {"$ne": ["$organization", None]},
-            {"$gt": [{"$strLenCP": {"$ifNull": ["$organization", ""]}}, 0]}
-        ]}
-        # Prefer email domain for known .edu so "Arizona State University" and "Asu" both become "asu"
-        _edu_org_key_branches = [
-            {"case": {"$eq": ["$_email_domain", "asu.edu"]}, "then": "asu"},
-            {"case": {"$eq": ["$_email_domain", "mit.edu"]}, "then": "mit"},
-            {"case": {"$eq": ["$_email_domain", "stanford.edu"]}, "then": "stanford"},
-            {"case": {"$eq": ["$_email_domain", "harvard.edu"]}, "then": "harvard"},
-            {"case": {"$eq": ["$_email_domain", "berkeley.edu"]}, "then": "berkeley"},
-            {"case": {"$eq": ["$_email_domain", "yale.edu"]}, "then": "yale"},
-            {"case": {"$eq": ["$_email_domain", "princeton.edu"]}, "then": "princeton"},
-            {"case": {"$eq": ["$_email_domain", "caltech.edu"]}, "then": "caltech"},
-            {"case": {"$eq": ["$_email_domain", "cmu.edu"]}, "then": "cmu"},
-            {"case": {"$eq": ["$_email_domain", "cornell.edu"]}, "then": "cornell"},
-        ]
-        _edu_display_branches = [
-            {"case": {"$eq": ["$_email_domain", "asu.edu"]}, "then": "Asu"},
-            {"case": {"$eq": ["$_email_domain", "mit.edu"]}, "then": "MIT"},
-            {"case": {"$eq": ["$_email_domain", "stanford.edu"]}, "then": "Stanford"},
-            {"case": {"$eq": ["$_email_domain", "harvard.edu"]}, "then": "Harvard"},
-            {"case": {"$eq": ["$_email_domain", "berkeley.edu"]}, "then": "Berkeley"},
-            {"case": {"$eq": ["$_email_domain", "yale.edu"]}, "then": "Yale"},
-            {"case": {"$eq": ["$_email_domain", "princeton.edu"]}, "then": "Princeton"},
-            {"case": {"$eq": ["$_email_domain", "caltech.edu"]}, "then": "Caltech"},
-            {"case": {"$eq": ["$_email_domain", "cmu.edu"]}, "then": "CMU"},
-            {"case": {"$eq": ["$_email_domain", "cornell.edu"]}, "then": "Cornell"},
-        ]
+        # org_key / org_display / notable are written at registration
+        # (organization_fields; jobs/backfill_org_keys.py for older documents),
+        # so this is an indexed match + $group on {notable, org_key}
         pipeline = [
-            {"$match": {"email": {"$exists": True, "$regex": "@", "$ne": ""}}},
-            {"$addFields": {"_email_domain": _email_domain}},
-            {"$addFields": {
-                "_org_from_edu": {"$switch": {"branches": _edu_org_key_branches, "default": None}},
-                "_display_from_edu": {"$switch": {"branches": _edu_display_branches, "default": None}}
-            }},
-            {"$addFields": {
-                "org_key": {"$cond": [
-                    {"$ne": ["$_org_from_edu", None]},
-                    "$_org_from_edu",
-                    {"$cond": [_has_org, {"$toLower": {"$ifNull": ["$organization", ""]}}, None]}
-                ]},
-                "_display_name": {"$cond": [
-                    {"$ne": ["$_display_from_edu", None]},
-                    "$_display_from_edu",
-                    {"$cond": [_has_org, "$organization", None]}
-                ]}
-            }},
-            {"$match": {"org_key": {"$nin": [None, "", "gmaio"]}}},
+            {"$match": {"notable": True}},
             {"$group": {
                 "_id": "$org_key",
                 "count": {"$sum": 1},
-                "display_name": {"$first": {"$ifNull": ["$_display_name", "$organization"]}},
+                "display_name": {"$first": "$org_display"},
                 "latest_visit": {"$max": "$registered_at"}
             }},
             {"$sort": {"count": -1}},
-            {"$limit": 50}  # Fetch more, then filter to notable only
+            {"$limit": 10}
         ]
-        org_stats_raw = list(collection.aggregate(pipeline))
-
-        # Only keep notable organizations (top MNCs, universities — no small companies)
-        org_stats = [
-            s for s in org_stats_raw
-            if is_notable_org(s.get("display_name") or s.get("_id", ""))
-        ][:10]
+        org_stats = list(collection.aggregate(pipeline, **agg_options))
         
         # Total registered visitors
         total_registered = collection.count_documents({})
@@ -397,7 +357,7 @@ def get_organization_stats():
             {"$sort": {"count": -1}},
             {"$limit": 15},
         ]
-        notable_raw = list(linkedin_coll.aggregate(notable_pipeline))
+        notable_raw = list(linkedin_coll.aggregate(notable_pipeline, **agg_options))
         notable_linkedin = [
             {"name": r["display_name"], "count": r["count"]}
             for r in notable_raw
@@ -441,7 +401,7 @@ def get_organization_stats():
             {"$match": {"_id.country": {"$ne": ""}}},
             {"$sort": {"count": -1}}
         ]
-        map_locations_raw = list(collection.aggregate(map_locations_pipeline))
+        map_locations_raw = list(collection.aggregate(map_locations_pipeline, **agg_options))
 
         # visitor_info: count unique by fingerprint_hash per (country, city); legacy docs (no hash) count as 1 each
         visitor_info_coll = db.visitor_info
@@ -466,8 +426,9 @@ def get_organization_stats():
                     1,
                     0
                 ]}},
-                "lat": {"$first": "$ip_info.latitude"},
-                "lng": {"$first": "$ip_info.longitude"}
+                # v2 keeps coordinates in geo, v1 only in the embedded ip_info
+                "lat": {"$first": {"$ifNull": ["$geo.latitude", "$ip_info.latitude"]}},
+                "lng": {"$first": {"$ifNull": ["$geo.longitude", "$ip_info.longitude"]}}
             }},
             {"$project": {
                 "_id": 1,
@@ -488,7 +449,7 @@ def get_organization_stats():
             {"$match": {"_id.country": {"$ne": ""}}},
             {"$sort": {"count": -1}}
         ]
-        visitor_map_raw = list(visitor_info_coll.aggregate(visitor_map_pipeline))
+        visitor_map_raw = list(visitor_info_coll.aggregate(visitor_map_pipeline, **agg_options))
 
         # Merge: key by (country, city), sum counts, keep any non-null lat/lng
         merged = {}
@@ -0,0 +1,156 @@
+"""Metrics blueprint - in-process monitoring snapshots (admin only, see ADMIN_USERNAMES)"""
+from flask import Blueprint, Response, jsonify, request
+from utils.request_db_stats import get_command_metrics
+from utils.request_metrics import render_prometheus
+from utils.security import admin_required
+from utils.tracing import get_traces
+from utils.profiling import collapsed_stacks, get_profiles, sign_profile_token
+import logging
+import os
+
+metrics_bp = Blueprint('metrics', __name__)
+logger = logging.getLogger(__name__)
+
+
+@metrics_bp.route('', methods=['GET'])
+@admin_required
+def get_request_metrics():
+    """
+    Request metrics for this worker process in the Prometheus text format
+    (admin endpoint): http_requests_total by route and status,
+    http_request_duration_seconds histograms, http_requests_in_flight.
+    """
+    try:
+        return Response(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    except Exception as e:
+        logger.error(f"Error rendering request metrics: {e}")
+        return jsonify({'error': 'Failed to get request metrics'}), 500
+
+
+@metrics_bp.route('/db', methods=['GET'])
+@admin_required
+def get_db_metrics():
+    """
+    MongoDB metrics for this worker process (admin endpoint).
+
+    routes: per-route request count, DB time and commands per request, with
+            a breakdown by command/collection (per_request > 1 on a route
+            usually means a query in a loop)
+    pools:  connection pool metrics per client role
+    """
+    # Pool metrics live next to the pymongo listeners; importing them here
+    # keeps the driver out of app start-up
+    from utils.db_monitoring import get_pool_metrics
+
+    try:
+        return jsonify({
+            'pid': os.getpid(),
+            'routes': get_command_metrics(),
+            'pools': get_pool_metrics(),
+        }), 200
+    except Exception as e:
+        logger.error(f"Error getting DB metrics: {e}")
+        return jsonify({'error': 'Failed to get DB metrics'}), 500
+
+
+@metrics_bp.route('/search-backends', methods=['GET'])
+@admin_required
+def get_search_backend_metrics():
+    """
+    DDGS search backend scheduler state for this worker process (admin endpoint).
+
+    Per backend: breaker state (closed/open/half_open), calls, decayed
+    success rate, average latency and, for open breakers, seconds until the
+    next probe.
+    """
+    from services.search_scheduler import get_search_scheduler
+
+    try:
+        return jsonify(get_search_scheduler().snapshot()), 200
+    except Exception as e:
+        logger.error(f"Error getting search backend metrics: {e}")
+        return jsonify({'error': 'Failed to get search backend metrics'}), 500
+
+
+@metrics_bp.route('/traces', methods=['GET'])
+@admin_required
+def get_request_traces():
+    """
+    Sampled request traces held by this worker process (admin endpoint),
+    newest first.
+
+    Query params:
+        limit:  max traces returned (default 50)
+        route:  only routes containing this text, e.g. "/api/info"
+        min_ms: only requests at least this slow
+
+    Each trace lists its spans with start offset, duration, nesting depth and
+    the index of the parent span.
+    """
+    try:
+        limit = max(1, min(int(request.args.get('limit', 50)), 500))
+        min_ms = float(request.args.get('min_ms', 0))
+    except ValueError:
+        return jsonify({'error': 'limit and min_ms must be numbers'}), 400
+    try:
+        return jsonify(get_traces(limit, request.args.get('route'), min_ms)), 200
+    except Exception as e:
+        logger.error(f"Error getting traces: {e}")
+        return jsonify({'error': 'Failed to get traces'}), 500
+
+
+@metrics_bp.route('/profiles', methods=['GET'])
+@admin_required
+def get_request_profiles():
+    """
+    CPU profiles of signed or sampled requests held by this worker process
+    (admin endpoint), newest first: route, trigger, status, duration and
+    sample count of each.
+    """
+    try:
+        return jsonify(get_profiles()), 200
+    except Exception as e:
+        logger.error(f"Error getting profiles: {e}")
+        return jsonify({'error': 'Failed to get profiles'}), 500
+
+
+@metrics_bp.route('/profiles/collapsed', methods=['GET'])
+@admin_required
+def download_profiles():
+    """
+    Buffered profiles as collapsed stacks for flamegraph.pl / speedscope
+    (admin endpoint). Stacks are rooted at the route; ?id= selects one
+    profile, ?route= the profiles of routes containing this text.
+    """
+    try:
+        text = collapsed_stacks(request.args.get('route'), request.args.get('id'))
+    except Exception as e:
+        logger.error(f"Error exporting profiles: {e}")
+        return jsonify({'error': 'Failed to export profiles'}), 500
+    if text is None:
+        return jsonify({'error': 'No matching profiles'}), 404
+    return Response(text, content_type='text/plain; charset=utf-8', headers={
+        'Content-Disposition': 'attachment; filename="profiles.collapsed"',
+    })
+
+
+@metrics_bp.route('/profiles/token', methods=['POST'])
+@admin_required
+def create_profile_token():
+    """
+    Mint a signed X-Profile-Token header value (admin endpoint). Every
+    request sent with it is profiled until it expires.
+
+    Request body (optional):
+        ttl_seconds: validity, at most one hour (default 600)
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        ttl_seconds = int(data.get('ttl_seconds', 600))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'ttl_seconds must be a number'}), 400
+    try:
+        return jsonify(sign_profile_token(ttl_seconds)), 200
+    except Exception as e:
+        logger.error(f"Error signing profile token: {e}")
+        return jsonify({'error': 'Failed to create profile token'}), 500
@@ -1,7 +1,7 @@
-"""Session management blueprint"""
+"""Session management blueprint (async views, see utils/async_runtime.py)"""
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
-from services.session_service import get_session_service
+from services.async_session_service import get_async_session_service
 import logging
 
 session_bp = Blueprint('session', __name__)
@@ -9,7 +9,7 @@ logger = logging.getLogger(__name__)
 
 
 @session_bp.route('/validate', methods=['POST'])
-def validate_session():
+async def validate_session():
     """
     Validate a session ID and return session info.
     Creates a new session if the provided ID doesn't exist.
@@ -32,8 +32,8 @@ def validate_session():
         
         user_agent = request.headers.get('User-Agent', 'unknown')
         
-        session_service = get_session_service()
-        session = session_service.create_or_get_session(session_id, ip_address, user_agent)
+        session_service = get_async_session_service()
+        session = await session_service.create_or_get_session(session_id, ip_address, user_agent)
         
         return jsonify({
             'valid': True,
@@ -49,7 +49,7 @@ def validate_session():
 
 
 @session_bp.route('/track-page', methods=['POST'])
-def track_page_view():
+async def track_page_view():
     """
     Track a page view for an existing session.
     This doesn't create a new visitor entry, just updates session stats.
@@ -62,8 +62,8 @@ def track_page_view():
         if not session_id:
             return jsonify({'error': 'Session ID required'}), 400
         
-        session_service = get_session_service()
-        session_service.add_page_visit(session_id, page)
+        session_service = get_async_session_service()
+        await session_service.add_page_visit(session_id, page)
         
         return jsonify({
             'success': True,
@@ -76,7 +76,7 @@ def track_page_view():
 
 
 @session_bp.route('/track-time', methods=['POST'])
-def track_section_time():
+async def track_section_time():
     """
     Track time spent in each section of the portfolio.
     Stores section engagement data for analytics.
@@ -94,8 +94,8 @@ def track_section_time():
         sections = data.get('sections', {})
         timestamp = data.get('timestamp')
         
-        session_service = get_session_service()
-        session_service.store_section_times(
+        session_service = get_async_session_service()
+        await session_service.store_section_times(
             session_id=session_id,
             page=page,
             total_time_ms=total_time_ms,
@@ -115,11 +115,11 @@ def track_section_time():
 
 @session_bp.route('/stats', methods=['GET'])
 @jwt_required()
-def get_session_stats():
+async def get_session_stats():
     """Get session statistics (protected endpoint)"""
     try:
-        session_service = get_session_service()
-        stats = session_service.get_session_stats()
+        session_service = get_async_session_service()
+        stats = await session_service.get_session_stats()
         
         return jsonify(stats), 200
         
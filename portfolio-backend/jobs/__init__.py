@@ -0,0 +1,10 @@
+"""
+Jobs package - one-off and scheduled maintenance commands.
+
+Run from portfolio-backend/ with `python -m jobs.<name> --help`.
+
+- reconcile_indexes.py: create missing MongoDB indexes from utils/indexes.py
+- migrate_visitor_schema.py: rewrite visitor_info documents to the compact schema
+- backfill_org_keys.py: set org_key/org_display/notable on older registrations
+- reenrich_linkedin.py: re-run LinkedIn lookups for existing registrations (resumable)
+"""
@@ -0,0 +1,98 @@
+"""
+Backfill org_key / org_display / notable on registered_visitors.
+
+register_visitor writes these fields (services.linkedin_service.
+organization_fields) and /api/info/org-stats groups on them; documents
+registered before that only show up in the stats once this has run.
+
+Runs online: documents without a `notable` field are walked in _id order in
+batches and updated with a $set guarded by the same condition, so re-running
+is safe and registrations written in the meantime are left alone.
+
+    python -m jobs.backfill_org_keys --dry-run
+    python -m jobs.backfill_org_keys --batch-size 1000
+    python -m jobs.backfill_org_keys --all        # recompute every document
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from services.linkedin_service import organization_fields
+from utils.db_connect import DBConnect
+
+logger = logging.getLogger(__name__)
+
+
+def backfill(collection, batch_size: int = 1000, resume_after=None, recompute: bool = False,
+             dry_run: bool = False) -> dict:
+    """
+    Set organization_fields() on registered_visitors in batches.
+
+    Returns:
+        Summary with scanned/notable/modified counts and the last _id processed
+    """
+    stats = {'scanned': 0, 'notable': 0, 'modified': 0, 'errors': 0, 'last_id': None}
+    guard = {} if recompute else {'notable': {'$exists': False}}
+    query = dict(guard)
+    if resume_after is not None:
+        query['_id'] = {'$gt': resume_after}
+    started = time.monotonic()
+
+    while True:
+        batch = list(
+            collection.find(query, {'email': 1, 'organization': 1}).sort('_id', 1).limit(batch_size)
+        )
+        if not batch:
+            break
+
+        requests = []
+        for doc in batch:
+            fields = organization_fields(doc.get('email'), doc.get('organization'))
+            stats['notable'] += fields['notable']
+            requests.append(UpdateOne({'_id': doc['_id'], **guard}, {'$set': fields}))
+
+        if not dry_run:
+            try:
+                stats['modified'] += collection.bulk_write(requests, ordered=False).modified_count
+            except Exception as e:
+                logger.error(f"Batch ending at {batch[-1]['_id']} failed: {e}")
+                stats['errors'] += 1
+        stats['scanned'] += len(batch)
+        stats['last_id'] = batch[-1]['_id']
+        query['_id'] = {'$gt': stats['last_id']}
+
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"{stats['scanned']} scanned, {stats['notable']} notable "
+            f"({stats['scanned'] / elapsed:.0f} docs/s), last _id {stats['last_id']}"
+        )
+
+    stats['elapsed_s'] = round(time.monotonic() - started, 2)
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Backfill org_key/org_display/notable on registered_visitors")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--resume-after', help='ObjectId to continue after')
+    parser.add_argument('--all', action='store_true', dest='recompute',
+                        help='recompute documents that already have the fields')
+    parser.add_argument('--dry-run', action='store_true', help='count without writing')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s:%(message)s')
+
+    resume_after = ObjectId(args.resume_after) if args.resume_after else None
+    collection = DBConnect().get_db().registered_visitors
+    stats = backfill(collection, args.batch_size, resume_after, args.recompute, args.dry_run)
+    print(json.dumps(stats, indent=2, default=str))
+    return 1 if stats['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Rewrite visitor_info documents to the compact schema (models/visitor_schema.py).
+
+Runs online against the live collection: documents are walked in _id order in
+small batches and each one is rewritten with a $set/$unset update guarded by
+its schema_version, so tracking writes made in the meantime (visit_count,
+last_activity, page) are preserved and re-running the job is safe.
+
+    python -m jobs.migrate_visitor_schema --dry-run          # size estimate only
+    python -m jobs.migrate_visitor_schema --batch-size 500 --pause-ms 50
+    python -m jobs.migrate_visitor_schema --resume-after <last _id printed>
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+from bson import ObjectId, encode
+from pymongo import UpdateOne
+
+from models.visitor_schema import SCHEMA_VERSION, migration_update
+from utils.db_connect import DBConnect
+
+logger = logging.getLogger(__name__)
+
+
+def _apply_update(doc: dict, update: dict) -> dict:
+    """Local copy of doc with the update applied (for size accounting)"""
+    migrated = {k: v for k, v in doc.items() if k not in update.get('$unset', {})}
+    migrated.update(update['$set'])
+    return migrated
+
+
+def migrate(collection, batch_size: int = 500, pause_ms: int = 0, limit: int = None,
+            resume_after=None, dry_run: bool = False) -> dict:
+    """
+    Migrate visitor_info documents to SCHEMA_VERSION in batches.
+
+    Returns:
+        Summary with scanned/migrated counts, BSON bytes before/after and the
+        last _id processed (pass it as resume_after to continue)
+    """
+    stats = {
+        'scanned': 0, 'migrated': 0, 'modified': 0, 'errors': 0,
+        'bytes_before': 0, 'bytes_after': 0, 'last_id': None,
+    }
+    query = {'schema_version': {'$ne': SCHEMA_VERSION}}
+    if resume_after is not None:
+        query['_id'] = {'$gt': resume_after}
+    started = time.monotonic()
+
+    while True:
+        remaining = batch_size if limit is None else min(batch_size, limit - stats['scanned'])
+        if remaining <= 0:
+            break
+        batch = list(collection.find(query).sort('_id', 1).limit(remaining))
+        if not batch:
+            break
+
+        requests = []
+        for doc in batch:
+            update = migration_update(doc)
+            if update is None:
+                continue
+            stats['bytes_before'] += len(encode(doc))
+            stats['bytes_after'] += len(encode(_apply_update(doc, update)))
+            requests.append(UpdateOne(
+                {'_id': doc['_id'], 'schema_version': {'$ne': SCHEMA_VERSION}},
+                update
+            ))
+
+        if requests and not dry_run:
+            try:
+                result = collection.bulk_write(requests, ordered=False)
+                stats['modified'] += result.modified_count
+            except Exception as e:
+                logger.error(f"Batch ending at {batch[-1]['_id']} failed: {e}")
+                stats['errors'] += 1
+        stats['migrated'] += len(requests)
+        stats['scanned'] += len(batch)
+        stats['last_id'] = batch[-1]['_id']
+        query['_id'] = {'$gt': stats['last_id']}
+
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"{stats['scanned']} scanned, {stats['migrated']} migrated "
+            f"({stats['scanned'] / elapsed:.0f} docs/s), last _id {stats['last_id']}"
+        )
+        if pause_ms:
+            time.sleep(pause_ms / 1000)
+
+    if stats['bytes_before']:
+        stats['size_ratio'] = round(stats['bytes_after'] / stats['bytes_before'], 3)
+    stats['elapsed_s'] = round(time.monotonic() - started, 2)
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Migrate visitor_info to the compact schema")
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--pause-ms', type=int, default=0, help='sleep between batches to limit load')
+    parser.add_argument('--limit', type=int, help='stop after this many documents')
+    parser.add_argument('--resume-after', help='ObjectId to continue after')
+    parser.add_argument('--dry-run', action='store_true', help='compute the size change without writing')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s:%(message)s')
+
+    resume_after = ObjectId(args.resume_after) if args.resume_after else None
+    collection = DBConnect().get_db().visitor_info
+    stats = migrate(collection, args.batch_size, args.pause_ms, args.limit, resume_after, args.dry_run)
+    print(json.dumps(stats, indent=2, default=str))
+    return 1 if stats['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
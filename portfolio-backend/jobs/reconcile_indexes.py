@@ -0,0 +1,42 @@
+"""
+Reconcile MongoDB indexes with the declarative manifest (utils/indexes.py).
+
+Run once per deploy (or whenever the manifest changes) instead of creating
+indexes on application start-up:
+
+    python -m jobs.reconcile_indexes --dry-run     # show what would change
+    python -m jobs.reconcile_indexes               # create missing indexes
+
+Exits non-zero if any index could not be created or conflicts with an
+existing index that has the same keys but different options.
+"""
+import argparse
+import json
+import logging
+import sys
+
+from utils.db_connect import DBConnect
+from utils.indexes import reconcile_indexes, INDEX_MANIFEST
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Create missing MongoDB indexes from the manifest")
+    parser.add_argument('--dry-run', action='store_true', help='report differences without creating anything')
+    parser.add_argument('--collection', action='append', choices=sorted(INDEX_MANIFEST),
+                        help='limit to a collection (repeatable)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s:%(message)s')
+
+    db = DBConnect().get_db()
+    report = reconcile_indexes(db, apply=not args.dry_run, collections=args.collection)
+    print(json.dumps(report, indent=2, default=str))
+
+    failed = any(entry['errors'] or entry['conflicts'] for entry in report.values())
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
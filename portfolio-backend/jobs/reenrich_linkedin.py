@@ -0,0 +1,255 @@
+"""
+Re-run LinkedIn enrichment for existing registrations.
+
+Walks linkedin_profiles in _id order and searches again for every person
+(bypassing linkedin_lookup_cache), e.g. after _score_result changes or a
+search backend recovers. Results go back with bulk_write: the profile by
+_id, and the linkedin/organization fields of the matching registered_visitors
+(by email, or by name when there is no email).
+
+Lookups run on --concurrency threads under a global --rate budget (lookups
+per minute, token bucket), since each one can make several outbound search
+calls. Progress is checkpointed in job_checkpoints after every batch, so an
+interrupted run continues where it stopped. The checkpoint never moves past a
+profile whose lookup failed (those _ids are listed in the summary), and a
+failed write stops the run before its batch is checkpointed, so a resumed run
+retries them:
+
+    python -m jobs.reenrich_linkedin --only-not-found --rate 20
+    python -m jobs.reenrich_linkedin --restart --concurrency 2 --limit 100
+
+Profiles the visitor linked themselves (source user_provided) are skipped. A
+found profile is not replaced by a not-found result unless --allow-downgrade
+is given, so an outage during the run cannot erase data.
+"""
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from pymongo import UpdateMany, UpdateOne
+
+from services.linkedin_service import (
+    extract_organization_from_email,
+    get_notable_org_name,
+    organization_fields,
+    search_linkedin_profile,
+)
+from utils.db_connect import DBConnect
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_ID = 'reenrich_linkedin'
+
+
+class TokenBucket:
+    """Blocking token bucket shared by the worker threads"""
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.rate = rate_per_second
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def _enrich(profile: dict, location: dict | None, bucket: TokenBucket) -> dict | None:
+    bucket.acquire()
+    try:
+        return search_linkedin_profile(
+            profile.get('first_name', ''), profile.get('last_name', ''), profile.get('email'),
+            middle_name=profile.get('middle_name', ''),
+            location=location,
+            use_cache=False,
+        )
+    except Exception as e:
+        logger.error(f"Lookup for profile {profile['_id']} failed: {e}")
+        return None
+
+
+def _locations(visitors, profiles: list) -> dict:
+    """email -> location of the latest registration, one query per batch"""
+    emails = [p['email'] for p in profiles if p.get('email')]
+    if not emails:
+        return {}
+    locations = {}
+    for visitor in visitors.find({'email': {'$in': emails}}, {'email': 1, 'geo': 1}).sort('_id', 1):
+        geo = visitor.get('geo') or {}
+        locations[visitor['email']] = {
+            'city': geo.get('city') or '',
+            'region': geo.get('region') or '',
+            'country': geo.get('country') or '',
+        }
+    return locations
+
+
+def _updates(profile: dict, result: dict, now: datetime):
+    """(linkedin_profiles update, registered_visitors update) for one result"""
+    email = profile.get('email')
+    organization = extract_organization_from_email(email) or result.get('organization_from_headline')
+    linkedin_response = {
+        'found': result.get('found', False),
+        'url': result.get('url'),
+        'headline': result.get('headline', ''),
+        'source': result.get('source', ''),
+    }
+    profile_update = UpdateOne({'_id': profile['_id']}, {'$set': {
+        **linkedin_response,
+        'match_score': result.get('match_score'),
+        'organization': organization,
+        'notable_org': get_notable_org_name(result.get('headline'), organization),
+        'updated_at': now,
+        'reenriched_at': now,
+    }})
+    visitor_filter = {'email': email} if email else {
+        'first_name': profile.get('first_name'), 'last_name': profile.get('last_name'),
+    }
+    visitor_update = UpdateMany(visitor_filter, {'$set': {
+        'linkedin': linkedin_response,
+        'organization': organization,
+        **organization_fields(email, organization),
+        'updated_at': now,
+    }})
+    return profile_update, visitor_update
+
+
+def reenrich(db, batch_size: int = 50, concurrency: int = 4, rate_per_minute: float = 30,
+             limit: int = None, only_not_found: bool = False, allow_downgrade: bool = False,
+             restart: bool = False, dry_run: bool = False) -> dict:
+    """
+    Re-enrich linkedin_profiles in batches, resuming from the checkpoint.
+
+    Returns:
+        Summary with processed/found/updated counts, the last _id processed,
+        the _ids whose lookup failed and the _id a resumed run starts after
+    """
+    checkpoints = db.job_checkpoints
+    checkpoint = None if restart else checkpoints.find_one({'_id': CHECKPOINT_ID})
+
+    query = {'source': {'$ne': 'user_provided'}}
+    if only_not_found:
+        query['found'] = False
+    stats = {'processed': 0, 'found': 0, 'newly_found': 0, 'kept': 0, 'updated': 0,
+             'errors': 0, 'last_id': None, 'failed_ids': [], 'resume_after': None}
+    if checkpoint and checkpoint.get('last_id') is not None:
+        stats['last_id'] = stats['resume_after'] = checkpoint['last_id']
+        query['_id'] = {'$gt': stats['last_id']}
+        logger.info(f"Resuming after {stats['last_id']}")
+
+    remaining = db.linkedin_profiles.count_documents(query)
+    total = remaining if limit is None else min(remaining, limit)
+    bucket = TokenBucket(rate_per_minute / 60, burst=concurrency)
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while stats['processed'] < total:
+            batch = list(
+                db.linkedin_profiles.find(query).sort('_id', 1)
+                .limit(min(batch_size, total - stats['processed']))
+            )
+            if not batch:
+                break
+            locations = _locations(db.registered_visitors, batch)
+            results = executor.map(
+                lambda p: _enrich(p, locations.get(p.get('email')), bucket), batch
+            )
+
+            now = datetime.utcnow()
+            profile_updates, visitor_updates = [], []
+            resume_after = stats['resume_after']
+            for profile, result in zip(batch, results):
+                if result is None:
+                    stats['errors'] += 1
+                    stats['failed_ids'].append(profile['_id'])
+                    continue
+                if not stats['failed_ids']:
+                    # The checkpoint stays before the first failed lookup
+                    resume_after = profile['_id']
+                if result.get('found'):
+                    stats['found'] += 1
+                    stats['newly_found'] += not profile.get('found')
+                elif profile.get('found') and not allow_downgrade:
+                    stats['kept'] += 1
+                    continue
+                profile_update, visitor_update = _updates(profile, result, now)
+                profile_updates.append(profile_update)
+                visitor_updates.append(visitor_update)
+
+            if profile_updates and not dry_run:
+                try:
+                    stats['updated'] += db.linkedin_profiles.bulk_write(
+                        profile_updates, ordered=False).modified_count
+                    db.registered_visitors.bulk_write(visitor_updates, ordered=False)
+                except Exception as e:
+                    # Stop with the checkpoint before this batch, so a resumed run retries it
+                    logger.error(f"Batch ending at {batch[-1]['_id']} failed, stopping: {e}")
+                    stats['errors'] += 1
+                    break
+
+            stats['processed'] += len(batch)
+            stats['last_id'] = batch[-1]['_id']
+            query['_id'] = {'$gt': stats['last_id']}
+            if resume_after != stats['resume_after'] and not dry_run:
+                checkpoints.update_one(
+                    {'_id': CHECKPOINT_ID},
+                    {'$set': {'last_id': resume_after, 'updated_at': now}},
+                    upsert=True
+                )
+            stats['resume_after'] = resume_after
+
+            elapsed = time.monotonic() - started
+            rate = stats['processed'] / elapsed
+            eta = (total - stats['processed']) / rate if rate else 0
+            logger.info(
+                f"{stats['processed']}/{total} processed ({rate * 60:.1f}/min), "
+                f"{stats['found']} found, ETA {eta / 60:.1f} min, last _id {stats['last_id']}"
+            )
+
+    if stats['processed'] >= remaining and not stats['failed_ids'] and not dry_run:
+        # Finished: the next run starts from the beginning again
+        checkpoints.delete_one({'_id': CHECKPOINT_ID})
+    stats['elapsed_s'] = round(time.monotonic() - started, 2)
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Re-run LinkedIn enrichment for existing registrations")
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=4, help='lookups in flight')
+    parser.add_argument('--rate', type=float, default=30, help='lookups per minute, across all threads')
+    parser.add_argument('--limit', type=int, help='stop after this many profiles')
+    parser.add_argument('--only-not-found', action='store_true', help='only profiles not found before')
+    parser.add_argument('--allow-downgrade', action='store_true',
+                        help='let a not-found result replace a found profile')
+    parser.add_argument('--restart', action='store_true', help='ignore the checkpoint and start over')
+    parser.add_argument('--dry-run', action='store_true', help='search but write nothing')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s:%(message)s')
+
+    stats = reenrich(
+        DBConnect().get_db(), args.batch_size, args.concurrency, args.rate, args.limit,
+        args.only_not_found, args.allow_downgrade, args.restart, args.dry_run
+    )
+    print(json.dumps(stats, indent=2, default=str))
+    return 1 if stats['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Lambda fast path for telemetry beacons
+
+The hot tracking routes do one small MongoDB write. Going through apig-wsgi
+and Flask (WSGI environ, request context, before/after hooks) costs more than
+that write, so lambda_handler.handler offers each API Gateway v2 event to
+dispatch() first. A matching route is served here straight from the event,
+with the same async services, security headers, CORS headers, DB and request
+metrics, traces and Server-Timing header as the Flask view. Everything else - and anything
+unusual about a hot request (no JSON body, non-object JSON) - returns None and
+falls through to Flask, so error responses stay Flask's.
+
+LAMBDA_FAST_ROUTES selects the routes: unset or "all" for every route below,
+"none" to disable, or a comma-separated list of paths.
+
+Flask does not need to be imported (or the app created) to serve these.
+"""
+import base64
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from utils.request_db_stats import begin_request, end_request, server_timing_value
+from utils.request_metrics import request_finished, request_started
+from utils.tracing import begin_trace, end_trace
+from utils.tracing import server_timing_value as trace_timing_value
+from utils.security import cors_headers, security_headers
+
+logger = logging.getLogger(__name__)
+
+
+class FastRequest:
+    """The parts of an API Gateway HTTP API (v2.0) event the fast handlers use"""
+    __slots__ = ('method', 'path', 'headers', 'source_ip', 'body')
+
+    def __init__(self, event: Dict[str, Any]):
+        http = event.get('requestContext', {}).get('http', {})
+        self.method = http.get('method', 'GET').upper()
+        self.path = event.get('rawPath') or http.get('path', '/')
+        # v2 header names are lowercase; repeated headers are comma-joined
+        self.headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+        self.source_ip = http.get('sourceIp', '')
+        body = event.get('body') or ''
+        if body and event.get('isBase64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        self.body = body
+
+    @property
+    def client_ip(self) -> str:
+        """Same rule as utils.security.get_client_ip (leftmost X-Forwarded-For)"""
+        raw = (self.headers.get('x-forwarded-for') or self.source_ip or '').strip()
+        return raw.split(',')[0].strip() if raw else ''
+
+    def json(self) -> Optional[dict]:
+        """Body as a JSON object regardless of Content-Type (sendBeacon sends text/plain)"""
+        if not self.body:
+            return None
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+
+# ---------------------------------------------------------------------------
+# Handlers: return (status, body) like the Flask views, or None to fall through
+# ---------------------------------------------------------------------------
+
+def _track_time(req: FastRequest, data: dict) -> Tuple[int, dict]:
+    """POST /api/session/track-time (see blueprints/session.py)"""
+    from utils.async_runtime import run_coroutine
+    from services.async_session_service import get_async_session_service
+
+    session_id = data.get('session_id', '')
+    if not session_id:
+        return 400, {'error': 'Session ID required'}
+    try:
+        run_coroutine(get_async_session_service().store_section_times(
+            session_id=session_id,
+            page=data.get('page', 'home'),
+            total_time_ms=data.get('totalTimeMs', 0),
+            sections=data.get('sections', {}),
+            timestamp=data.get('timestamp')
+        ))
+        return 200, {'success': True, 'message': 'Section time tracked'}
+    except Exception as e:
+        logger.error(f"Error tracking section time: {e}")
+        return 500, {'error': 'Failed to track section time'}
+
+
+def _track_page(req: FastRequest, data: dict) -> Tuple[int, dict]:
+    """POST /api/session/track-page (see blueprints/session.py)"""
+    from utils.async_runtime import run_coroutine
+    from services.async_session_service import get_async_session_service
+
+    session_id = data.get('session_id', '')
+    if not session_id:
+        return 400, {'error': 'Session ID required'}
+    try:
+        run_coroutine(get_async_session_service().add_page_visit(
+            session_id, data.get('page', 'unknown')
+        ))
+        return 200, {'success': True, 'message': 'Page view tracked'}
+    except Exception as e:
+        logger.error(f"Error tracking page view: {e}")
+        return 500, {'error': 'Failed to track page view'}
+
+
+def _store_visitor_info(req: FastRequest, data: dict) -> Tuple[int, dict]:
+    """POST /api/info (see blueprints/info.py store_visitor_info)"""
+    from utils.async_runtime import run_coroutine
+    from services.async_visitor_service import get_async_visitor_service
+
+    session_id = data.get('sessionId', data.get('session_id', '')) or str(uuid.uuid4())
+    try:
+        result = run_coroutine(get_async_visitor_service().track_visitor(
+            session_id=session_id,
+            ip_address=req.client_ip,
+            client_ip=data.get('clientIp', data.get('client_ip')),
+            user_agent=req.headers.get('user-agent', data.get('user_agent', 'unknown')),
+            page=data.get('page', 'unknown'),
+            referrer=data.get('referrer', 'direct'),
+            raw_data=data,
+            fingerprint_hash=data.get('fingerprintHash') or data.get('fingerprint_hash') or None
+        ))
+    except Exception as e:
+        logger.error(f"Error storing visitor info: {e}")
+        return 500, {'error': 'Database error'}
+
+    if result.get('status') == 'existing':
+        logger.info(f"Returning visitor session: {session_id}")
+        return 200, {
+            'message': 'Session already tracked',
+            'status': 'existing',
+            'session_id': session_id,
+            'ip': result.get('ip')
+        }
+    if result.get('status') == 'created':
+        logger.info(f"New visitor tracked: {session_id}")
+        return 200, {
+            'message': 'Visitor info stored',
+            'status': 'new',
+            'session_id': session_id,
+            'ip': result.get('ip'),
+            'location': result.get('location')
+        }
+    return 500, {'message': 'Tracking failed', 'error': result.get('message')}
+
+
+# path -> (method, handler); the route label matches Flask's url_rule for metrics
+FAST_ROUTES: Dict[str, Tuple[str, Callable[[FastRequest, dict], Tuple[int, dict]]]] = {
+    '/api/session/track-time': ('POST', _track_time),
+    '/api/session/track-page': ('POST', _track_page),
+    '/api/info': ('POST', _store_visitor_info),
+}
+
+
+def _enabled_routes() -> Dict[str, Tuple[str, Callable]]:
+    value = os.getenv('LAMBDA_FAST_ROUTES', 'all').strip()
+    if value.lower() in ('', 'all', 'true'):
+        return dict(FAST_ROUTES)
+    if value.lower() in ('none', 'false', '0'):
+        return {}
+    wanted = {path.strip() for path in value.split(',')}
+    unknown = wanted - set(FAST_ROUTES) - {''}
+    if unknown:
+        logger.warning(f"LAMBDA_FAST_ROUTES: no fast handler for {', '.join(sorted(unknown))}")
+    return {path: route for path, route in FAST_ROUTES.items() if path in wanted}
+
+
+_routes = _enabled_routes()
+
+
+def _response(req: FastRequest, status: int, body: Optional[dict],
+              extra_headers: Dict[str, str] = None) -> Dict[str, Any]:
+    headers = security_headers(req.path)
+    headers.update(cors_headers(
+        req.headers.get('origin'),
+        preflight=req.method == 'OPTIONS',
+        request_headers=req.headers.get('access-control-request-headers', '')
+    ))
+    if extra_headers:
+        headers.update(extra_headers)
+    if body is None:
+        return {'statusCode': status, 'headers': headers, 'body': ''}
+    headers['Content-Type'] = 'application/json'
+    return {
+        'statusCode': status,
+        'headers': headers,
+        # Same encoding as Flask's jsonify (compact, sorted keys)
+        'body': json.dumps(body, separators=(',', ':'), sort_keys=True) + '\n',
+    }
+
+
+def dispatch(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Serve the event if it targets an enabled fast route.
+
+    Returns:
+        API Gateway response dict, or None to hand the event to Flask
+    """
+    if event.get('version') != '2.0':
+        return None
+    req = FastRequest(event)
+    route = _routes.get(req.path)
+    if route is None:
+        return None
+    method, handler = route
+
+    if req.method == 'OPTIONS' and req.headers.get('access-control-request-method'):
+        return _response(req, 200, None)
+    if req.method != method:
+        return None
+    data = req.json()
+    if data is None:
+        return None
+
+    metrics_key = (req.path.split('/')[2], req.path, method)
+    request_started(metrics_key)
+    started = time.perf_counter()
+    token = begin_request(f"{method} {req.path}")
+    trace_token = begin_trace(f"{method} {req.path}")
+    status = 500
+    try:
+        status, body = handler(req, data)
+    finally:
+        stats = end_request(token)
+        trace = end_trace(trace_token, status) if trace_token is not None else None
+        request_finished(metrics_key, status, time.perf_counter() - started)
+    # API Gateway takes one value per header name, so the entries are comma-joined
+    timing = ', '.join(filter(None, (server_timing_value(stats), trace_timing_value(trace))))
+    return _response(req, status, body, {'Server-Timing': timing} if timing else None)
@@ -7,6 +7,9 @@ HTTP API v2.0 payloads to WSGI requests that Flask understands.
 
 Architecture:
     API Gateway (HTTP API) -> Lambda -> apig-wsgi -> Flask App -> MongoDB Atlas
+
+Telemetry beacons (track-time, track-page, POST /api/info) skip apig-wsgi and
+Flask via lambda_fast_path.dispatch().
 """
 
 import logging
@@ -19,6 +22,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+from lambda_fast_path import dispatch as fast_path_dispatch
+
 # Lazy initialization to reduce cold start time
 _app = None
 _handler = None
@@ -47,6 +52,19 @@ def get_handler():
     return _handler
 
 
+def warmup():
+    """
+    Opt-in INIT-phase warmup (LAMBDA_WARMUP=true or a list of stages).
+    Runs at import, so the cost lands in the Lambda INIT phase instead of
+    the first request. See utils/warmup.py for the stages.
+    """
+    from utils.warmup import parse_stages, run_warmup
+    stages = parse_stages(os.getenv('LAMBDA_WARMUP'))
+    if stages:
+        return run_warmup(get_handler, stages)
+    return None
+
+
 def handler(event, context):
     """
     AWS Lambda handler function.
@@ -70,6 +88,10 @@ def handler(event, context):
                 f"{event.get('rawPath')}"
             )
 
+        response = fast_path_dispatch(event)
+        if response is not None:
+            return response
+
         return get_handler()(event, context)
 
     except Exception as e:
@@ -84,6 +106,11 @@ def handler(event, context):
         }
 
 
+# Module import happens during Lambda INIT
+if os.getenv('LAMBDA_WARMUP'):
+    warmup()
+
+
 # For local testing with SAM CLI or direct invocation
 if __name__ == "__main__":
     # Test event for health check
@@ -3,6 +3,7 @@ Models package - Data models for the application.
 
 - User: authentication model with password hashing (user.py)
 - Visitor dataclasses: GeoLocation, BrowserInfo, SessionData, VisitorInfo, RegisteredVisitor (visitor.py)
+- Compact visitor_info schema helpers: term dictionaries, raw_data allowlist (visitor_schema.py)
 """
 from .user import User
 from .visitor import (
@@ -1,6 +1,5 @@
 """User model for authentication with secure password hashing"""
 from datetime import datetime
-import bcrypt
 import re
 
 class User:
@@ -38,22 +37,25 @@ class User:
     
     @staticmethod
     def hash_password(password: str) -> str:
-        """Hash password using bcrypt (industry standard, secure)"""
-        # Generate salt and hash - bcrypt automatically handles salt
-        password_bytes = password.encode('utf-8')
-        salt = bcrypt.gensalt(rounds=12)  # 12 rounds is secure and performant
-        hashed = bcrypt.hashpw(password_bytes, salt)
-        return hashed.decode('utf-8')
+        """
+        Hash password using bcrypt (industry standard, secure).
+        Runs on the password hasher pool with the calibrated cost factor;
+        raises PasswordHasherBusy when the pool is saturated.
+        """
+        from utils.password_hasher import get_password_hasher
+        return get_password_hasher().hash(password)
     
     @staticmethod
     def verify_password(password: str, password_hash: str) -> bool:
-        """Verify password against bcrypt hash"""
-        try:
-            password_bytes = password.encode('utf-8')
-            hash_bytes = password_hash.encode('utf-8')
-            return bcrypt.checkpw(password_bytes, hash_bytes)
-        except Exception:
-            return False
+        """Verify password against bcrypt hash (raises PasswordHasherBusy when saturated)"""
+        from utils.password_hasher import get_password_hasher
+        return get_password_hasher().verify(password, password_hash)
+    
+    @staticmethod
+    def needs_rehash(password_hash: str) -> bool:
+        """True when the hash is weaker than the current cost factor"""
+        from utils.password_hasher import get_password_hasher
+        return get_password_hasher().needs_rehash(password_hash)
     
     @staticmethod
     def sanitize_input(value: str, max_length: int = 255) -> str:
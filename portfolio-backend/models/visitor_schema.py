@@ -0,0 +1,182 @@
+"""
+Compact visitor_info schema (schema_version 2)
+
+Version 1 documents embedded the full ip_info dict, a duplicated geo subset,
+the raw user-agent string and the whole client request body. Version 2 keeps
+only what the tracking and stats paths read:
+
+- ip_info is not embedded; geo keeps city, region, ISO country code,
+  timezone, coordinates, postal code and network org. ip_cache entries
+  expire (TTL index on cached_at), so every field of the lookup that
+  cannot be derived again stays on the document. Country names are
+  derived from the code on read
+- browser / os / device are dictionary-encoded as small integers from the
+  append-only term tables below (unknown values are stored as strings)
+- raw_data is trimmed to RAW_DATA_ALLOWLIST; user_agent_raw is dropped
+
+Both versions coexist until jobs/migrate_visitor_schema.py has run, so every
+reader goes through decode_term() / expand_visitor_doc().
+"""
+from typing import Any, Dict, Optional, Tuple
+
+SCHEMA_VERSION = 2
+
+# Term tables: code = position + 1. Append only - never reorder or remove,
+# stored documents refer to these positions.
+BROWSER_TERMS: Tuple[str, ...] = (
+    'Chrome', 'Firefox', 'Safari', 'Edge', 'Mobile Safari', 'Chrome Mobile',
+    'Chrome Mobile iOS', 'Samsung Internet', 'Opera', 'Firefox Mobile',
+    'Chrome Mobile WebView', 'Mobile Safari UI/WKWebView', 'Firefox iOS',
+    'Edge Mobile', 'Facebook', 'Instagram', 'LinkedIn', 'HeadlessChrome', 'Other',
+)
+OS_TERMS: Tuple[str, ...] = (
+    'Windows', 'Mac OS X', 'iOS', 'Android', 'Linux', 'Ubuntu', 'Chrome OS',
+    'Fedora', 'iPadOS', 'Other',
+)
+DEVICE_TERMS: Tuple[str, ...] = (
+    'Other', 'iPhone', 'iPad', 'Mac', 'K', 'Generic Smartphone',
+    'Generic Tablet', 'Spider',
+)
+
+_BROWSER_CODES = {term: i + 1 for i, term in enumerate(BROWSER_TERMS)}
+_OS_CODES = {term: i + 1 for i, term in enumerate(OS_TERMS)}
+_DEVICE_CODES = {term: i + 1 for i, term in enumerate(DEVICE_TERMS)}
+
+# Client fingerprint fields kept from the request body: top-level key ->
+# allowed sub-keys (None = keep the scalar value itself)
+RAW_DATA_ALLOWLIST: Dict[str, Optional[Tuple[str, ...]]] = {
+    'screen': ('width', 'height', 'colorDepth'),
+    'window': ('innerWidth', 'innerHeight'),
+    'browser': ('language', 'platform', 'hardwareConcurrency', 'deviceMemory', 'maxTouchPoints'),
+    'network': ('effectiveType',),
+    'timezoneOffset': None,
+    'mediaDevices': None,
+}
+_MAX_RAW_STRING = 64
+
+# v1 fields dropped by the migration
+REMOVED_FIELDS = ('ip_info', 'user_agent_raw')
+
+
+def encode_term(codes: Dict[str, int], value: Optional[str]):
+    """Dictionary code for a known term, the string itself otherwise"""
+    if value is None:
+        return None
+    return codes.get(value, value)
+
+
+def decode_term(terms: Tuple[str, ...], value) -> Optional[str]:
+    """Inverse of encode_term; also accepts v1 plain strings"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        if 1 <= value <= len(terms):
+            return terms[value - 1]
+        return str(value)
+    return value
+
+
+def encode_user_agent(ua_data: Dict[str, Any]) -> Dict[str, Any]:
+    """browser / os / device fields for a v2 document"""
+    return {
+        "browser": encode_term(_BROWSER_CODES, ua_data.get("browser")),
+        "os": encode_term(_OS_CODES, ua_data.get("os")),
+        "device": encode_term(_DEVICE_CODES, ua_data.get("device")),
+    }
+
+
+def _scalar(value):
+    if isinstance(value, str):
+        return value[:_MAX_RAW_STRING]
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return None
+
+
+def trim_raw_data(raw_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Keep only RAW_DATA_ALLOWLIST fields (scalars, strings truncated)"""
+    trimmed = {}
+    for key, sub_keys in RAW_DATA_ALLOWLIST.items():
+        value = (raw_data or {}).get(key)
+        if sub_keys is None:
+            value = _scalar(value)
+            if value is not None:
+                trimmed[key] = value
+        elif isinstance(value, dict):
+            kept = {k: _scalar(value.get(k)) for k in sub_keys}
+            kept = {k: v for k, v in kept.items() if v is not None}
+            if kept:
+                trimmed[key] = kept
+    return trimmed
+
+
+def compact_geo(ip_info: Dict[str, Any]) -> Dict[str, Any]:
+    """geo subset stored on a v2 document"""
+    geo = {
+        "city": ip_info.get("city"),
+        "region": ip_info.get("region"),
+        "country": ip_info.get("country"),
+        "timezone": ip_info.get("timezone"),
+    }
+    if ip_info.get("latitude") is not None and ip_info.get("longitude") is not None:
+        geo["latitude"] = ip_info["latitude"]
+        geo["longitude"] = ip_info["longitude"]
+    # Not derivable from anything else once the ip_cache entry has expired
+    for key in ("postal", "org"):
+        if ip_info.get(key) not in (None, "", "Unknown"):
+            geo[key] = ip_info[key]
+    return geo
+
+
+def migration_update(doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    $set/$unset update that turns a v1 document into v2, or None if it is
+    already current. Only rewrites schema-owned fields, so visit_count,
+    last_activity and page updates made concurrently are not lost.
+    """
+    if doc.get("schema_version") == SCHEMA_VERSION:
+        return None
+
+    ip_info = dict(doc.get("ip_info") or {})
+    old_geo = doc.get("geo") or {}
+    for key in ("city", "region", "country", "timezone", "postal", "org"):
+        if ip_info.get(key) is None and old_geo.get(key) is not None:
+            ip_info[key] = old_geo[key]
+
+    update_set = {
+        "schema_version": SCHEMA_VERSION,
+        "geo": compact_geo(ip_info),
+        "raw_data": trim_raw_data(doc.get("raw_data")),
+        **encode_user_agent({
+            "browser": doc.get("browser"),
+            "os": doc.get("os"),
+            "device": doc.get("device"),
+        }),
+    }
+    unset = {field: "" for field in REMOVED_FIELDS if field in doc}
+    if doc.get("client_reported_ip") in (None, "", doc.get("ip_address")):
+        if "client_reported_ip" in doc:
+            unset["client_reported_ip"] = ""
+
+    update = {"$set": update_set}
+    if unset:
+        update["$unset"] = unset
+    return update
+
+
+def expand_visitor_doc(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Present a visitor_info document (either version) in the readable shape:
+    decoded browser/os/device and geo.country_name filled from the code.
+    """
+    if not doc or doc.get("schema_version") != SCHEMA_VERSION:
+        return doc
+    from services.ip_service import country_name_for
+
+    expanded = dict(doc)
+    expanded["browser"] = decode_term(BROWSER_TERMS, doc.get("browser"))
+    expanded["os"] = decode_term(OS_TERMS, doc.get("os"))
+    expanded["device"] = decode_term(DEVICE_TERMS, doc.get("device"))
+    geo = dict(doc.get("geo") or {})
+    if geo.get("country"):
+        geo["country_name"] = country_name_for(geo["country"])
+    expanded["geo"] = geo
+    return expanded
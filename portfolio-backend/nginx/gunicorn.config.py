@@ -6,7 +6,20 @@ bind = '127.0.0.1:5000'
 
 # workers = (2 * multiprocessing.cpu_count()) + 1
 workers = 1
-worker_class = 'gevent'
+# Async views do their I/O on a shared asyncio loop (utils/async_runtime.py);
+# request threads only wait on it, so plain threads replace gevent patching.
+worker_class = 'gthread'
+threads = 32
 
 timeout = 120
-accesslog = '-'
\ No newline at end of file
+accesslog = '-'
+
+
+def post_worker_init(worker):
+    # Calibrate bcrypt and start the hashing pool before the worker takes
+    # requests, so the first login does not pay for it
+    try:
+        from utils.password_hasher import get_password_hasher
+        get_password_hasher().warm()
+    except Exception as e:
+        worker.log.warning(f"Password hasher warmup failed: {e}")
@@ -3,14 +3,37 @@ Services package - Business logic layer.
 
 Exports:
 - get_visitor_service, get_session_service, get_ip_service
+- get_async_visitor_service, get_async_session_service, get_async_ip_service
+- get_user_cache
 - linkedin_service: search_linkedin_profile, extract_organization_from_email
+
+The getters are resolved lazily (PEP 562 __getattr__): importing the package
+does not import every service module, and each service is only constructed
+on the first call to its getter.
 """
-from services.visitor_service import get_visitor_service
-from services.session_service import get_session_service
-from services.ip_service import get_ip_service
-
-__all__ = [
-    "get_visitor_service",
-    "get_session_service",
-    "get_ip_service",
-]
+import importlib
+
+_GETTERS = {
+    "get_visitor_service": "services.visitor_service",
+    "get_session_service": "services.session_service",
+    "get_ip_service": "services.ip_service",
+    "get_async_visitor_service": "services.async_visitor_service",
+    "get_async_session_service": "services.async_session_service",
+    "get_async_ip_service": "services.async_ip_service",
+    "get_user_cache": "services.user_cache",
+}
+
+__all__ = list(_GETTERS)
+
+
+def __getattr__(name):
+    module = _GETTERS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
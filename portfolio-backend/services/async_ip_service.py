@@ -0,0 +1,159 @@
+"""
+Async IP Geolocation Service - asyncio counterpart of IPService
+
+Same lookups, cache and response shapes as services/ip_service.py, but built
+on the async MongoDB driver and httpx so many lookups can be in flight on the
+shared event loop (utils/async_runtime.py) without blocking worker threads.
+"""
+import logging
+from datetime import datetime
+from typing import Optional, Dict, Any
+from utils.db_connect import DBConnect
+from utils.tracing import traced
+from utils.config import IPInfoConfig
+from services.ip_service import (
+    IPService,
+    LOCAL_IPS,
+    IP_COUNTRY_PIPELINE,
+    IP_CITY_PIPELINE,
+    local_ip_info,
+    ip_lookup_error,
+    parse_ipinfo_response,
+    format_ip_stats,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncIPService:
+    """Async service for IP geolocation lookups and caching"""
+
+    IPINFO_API_URL = IPService.IPINFO_API_URL
+
+    def __init__(self):
+        self.db = DBConnect().get_async_db()
+        self.cache_collection = self.db.ip_cache
+        self._http = None
+
+    @property
+    def api_token(self) -> str:
+        """ipinfo.io token from the current config snapshot (picks up refreshes)"""
+        return IPInfoConfig.IPINFO_TOKEN
+
+    def _get_http_client(self):
+        """Shared httpx.AsyncClient (connection pooling across lookups)"""
+        if self._http is None:
+            import httpx  # deferred: only loaded once a lookup misses the cache
+            self._http = httpx.AsyncClient(timeout=5)
+        return self._http
+
+    @traced('ip.lookup')
+    async def get_ip_info(self, ip_address: str, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Get geolocation information for an IP address.
+
+        Args:
+            ip_address: The IP address to lookup
+            use_cache: Whether to use cached data if available
+
+        Returns:
+            Dictionary containing IP geolocation data
+        """
+        if not ip_address or ip_address in LOCAL_IPS:
+            return local_ip_info(ip_address)
+
+        # Use only the leftmost (original client) IP when multiple are present
+        ip_address = (ip_address or "").split(",")[0].strip()
+
+        if use_cache:
+            cached = await self._get_from_cache(ip_address)
+            if cached:
+                logger.debug(f"IP info cache hit for {ip_address}")
+                return cached
+
+        ip_info = await self._fetch_from_ipinfo(ip_address)
+
+        if ip_info and not ip_info.get('error'):
+            await self._save_to_cache(ip_address, ip_info)
+
+        return ip_info
+
+    @traced('ip.cache_read')
+    async def _get_from_cache(self, ip_address: str) -> Optional[Dict[str, Any]]:
+        """Get IP info from cache if available and not expired"""
+        try:
+            cached = await self.cache_collection.find_one({"ip": ip_address})
+            if cached:
+                cached.pop('_id', None)
+                return cached
+            return None
+        except Exception as e:
+            logger.error(f"Error reading from IP cache: {e}")
+            return None
+
+    @traced('ip.ipinfo')
+    async def _fetch_from_ipinfo(self, ip_address: str) -> Dict[str, Any]:
+        """Fetch IP info from ipinfo.io API"""
+        import httpx
+
+        try:
+            url = self.IPINFO_API_URL.format(ip=ip_address)
+
+            headers = {}
+            if self.api_token:
+                headers['Authorization'] = f'Bearer {self.api_token}'
+
+            response = await self._get_http_client().get(url, headers=headers)
+            data = response.json() if response.status_code == 200 else None
+            return parse_ipinfo_response(ip_address, response.status_code, data)
+
+        except httpx.TimeoutException:
+            logger.error(f"Timeout fetching IP info for {ip_address}")
+            return ip_lookup_error(ip_address, "Timeout")
+        except Exception as e:
+            logger.error(f"Error fetching IP info: {e}")
+            return ip_lookup_error(ip_address, str(e))
+
+    @traced('ip.cache_write')
+    async def _save_to_cache(self, ip_address: str, ip_info: Dict[str, Any]):
+        """Save IP info to cache"""
+        try:
+            cache_doc = {
+                **ip_info,
+                "ip": ip_address,
+                "cached_at": datetime.utcnow()
+            }
+            await self.cache_collection.update_one(
+                {"ip": ip_address},
+                {"$set": cache_doc},
+                upsert=True
+            )
+            logger.debug(f"IP info cached for {ip_address}")
+        except Exception as e:
+            logger.error(f"Error saving IP info to cache: {e}")
+
+    @traced('ip.stats')
+    async def get_ip_stats(self) -> Dict[str, Any]:
+        """Get statistics about IP lookups (analytics client)"""
+        try:
+            db_connect = DBConnect()
+            cache_collection = db_connect.get_async_analytics_db().ip_cache
+            agg_options = db_connect.analytics_aggregate_options()
+            total_cached = await cache_collection.count_documents({})
+            top_countries = await (await cache_collection.aggregate(IP_COUNTRY_PIPELINE, **agg_options)).to_list(None)
+            top_cities = await (await cache_collection.aggregate(IP_CITY_PIPELINE, **agg_options)).to_list(None)
+            return format_ip_stats(total_cached, top_countries, top_cities)
+        except Exception as e:
+            logger.error(f"Error getting IP stats: {e}")
+            return {}
+
+
+# Singleton instance
+_async_ip_service = None
+
+def get_async_ip_service() -> AsyncIPService:
+    """Get singleton instance of AsyncIPService"""
+    global _async_ip_service
+    if _async_ip_service is None:
+        _async_ip_service = AsyncIPService()
+    return _async_ip_service
@@ -0,0 +1,174 @@
+"""
+Async Session Service - asyncio counterpart of SessionService
+
+Same session semantics as services/session_service.py (expiry window,
+is_tracked dedup flag, section analytics upserts) on the async MongoDB driver.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any
+from utils.db_connect import DBConnect
+from utils.tracing import traced
+from services.session_service import (
+    SessionService,
+    is_session_current,
+    new_session_doc,
+    section_times_update,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSessionService:
+    """Async service for managing visitor sessions"""
+
+    SESSION_EXPIRY_HOURS = SessionService.SESSION_EXPIRY_HOURS
+
+    def __init__(self):
+        self.db = DBConnect().get_async_db()
+        self.collection = self.db.sessions
+
+    @traced('session.validate')
+    async def validate_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return the session document if the session exists and has not expired"""
+        if not session_id:
+            return None
+
+        try:
+            session = await self.collection.find_one({"session_id": session_id})
+            if session and is_session_current(session, self.SESSION_EXPIRY_HOURS):
+                return session
+            return None
+        except Exception as e:
+            logger.error(f"Error validating session: {e}")
+            return None
+
+    @traced('session.get_or_create')
+    async def create_or_get_session(self, session_id: str, ip_address: str,
+                                    user_agent: str = None) -> Dict[str, Any]:
+        """Create a new session or return existing one"""
+        try:
+            existing = await self.validate_session(session_id)
+            if existing:
+                await self.collection.update_one(
+                    {"session_id": session_id},
+                    {
+                        "$set": {"last_activity": datetime.utcnow()},
+                        "$inc": {"page_views": 1}
+                    }
+                )
+                return {**existing, "is_new": False}
+
+            session_doc = new_session_doc(session_id, ip_address, user_agent)
+
+            await self.collection.insert_one(session_doc)
+            logger.info(f"New session created: {session_id}")
+            return {**session_doc, "is_new": True}
+
+        except Exception as e:
+            logger.error(f"Error creating/getting session: {e}")
+            # Return a temporary session on error
+            return {
+                "session_id": session_id,
+                "is_new": True,
+                "error": str(e)
+            }
+
+    @traced('session.should_track')
+    async def should_track_visitor(self, session_id: str) -> bool:
+        """True only for first-time tracking of this session"""
+        try:
+            session = await self.collection.find_one({"session_id": session_id})
+            if session and session.get("is_tracked"):
+                return False
+            return True
+        except Exception as e:
+            logger.error(f"Error checking session tracking status: {e}")
+            return True  # Default to tracking on error
+
+    @traced('session.mark_tracked')
+    async def mark_session_tracked(self, session_id: str, visitor_id: str = None):
+        """Mark a session as having been tracked in visitor_info"""
+        try:
+            await self.collection.update_one(
+                {"session_id": session_id},
+                {
+                    "$set": {
+                        "is_tracked": True,
+                        "tracked_at": datetime.utcnow(),
+                        "visitor_id": visitor_id
+                    }
+                }
+            )
+            logger.info(f"Session {session_id} marked as tracked")
+        except Exception as e:
+            logger.error(f"Error marking session as tracked: {e}")
+
+    @traced('session.page_visit')
+    async def add_page_visit(self, session_id: str, page: str):
+        """Add a page to the session's visited pages list"""
+        try:
+            await self.collection.update_one(
+                {"session_id": session_id},
+                {
+                    "$addToSet": {"pages_visited": page},
+                    "$set": {"last_activity": datetime.utcnow()},
+                    "$inc": {"page_views": 1}
+                }
+            )
+        except Exception as e:
+            logger.error(f"Error adding page visit: {e}")
+
+    @traced('session.section_times')
+    async def store_section_times(self, session_id: str, page: str,
+                                  total_time_ms: int, sections: dict,
+                                  timestamp: str = None):
+        """Upsert section engagement time data for a session + page"""
+        try:
+            update_doc = section_times_update(
+                session_id, page, total_time_ms, sections, timestamp
+            )
+            await self.db.section_analytics.update_one(
+                {"session_id": session_id, "page": page},
+                update_doc,
+                upsert=True
+            )
+            await self.collection.update_one(
+                {"session_id": session_id},
+                {"$set": {"last_activity": datetime.utcnow(),
+                          "total_time_ms": total_time_ms}}
+            )
+            logger.debug(f"Section times stored for session {session_id}")
+        except Exception as e:
+            logger.error(f"Error storing section times: {e}")
+
+    @traced('session.stats')
+    async def get_session_stats(self) -> Dict[str, Any]:
+        """Get overall session statistics (analytics client)"""
+        try:
+            collection = DBConnect().get_async_analytics_db().sessions
+            total_sessions = await collection.count_documents({})
+            active_sessions = await collection.count_documents({
+                "last_activity": {"$gte": datetime.utcnow() - timedelta(hours=1)}
+            })
+            tracked_sessions = await collection.count_documents({"is_tracked": True})
+
+            return {
+                "total_sessions": total_sessions,
+                "active_sessions_1h": active_sessions,
+                "tracked_sessions": tracked_sessions
+            }
+        except Exception as e:
+            logger.error(f"Error getting session stats: {e}")
+            return {}
+
+
+# Singleton instance
+_async_session_service = None
+
+def get_async_session_service() -> AsyncSessionService:
+    """Get singleton instance of AsyncSessionService"""
+    global _async_session_service
+    if _async_session_service is None:
+        _async_session_service = AsyncSessionService()
+    return _async_session_service
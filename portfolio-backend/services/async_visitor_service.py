@@ -0,0 +1,149 @@
+"""
+Async Visitor Service - asyncio counterpart of VisitorService.track_visitor
+
+Same session + fingerprint deduplication as services/visitor_service.py, on the
+async MongoDB driver, using the async session and IP services. User-agent
+parsing is regex-heavy CPU work, so it runs in a worker thread instead of on
+the event loop.
+"""
+import asyncio
+import logging
+from typing import Dict, Any
+from utils.db_connect import DBConnect, pymongo_errors
+from utils.tracing import traced
+from services.async_session_service import get_async_session_service
+from services.async_ip_service import get_async_ip_service
+from services.visitor_service import (
+    effective_ip,
+    parse_user_agent,
+    build_visitor_doc,
+    returning_visitor_update,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncVisitorService:
+    """Async service for visitor tracking"""
+
+    def __init__(self):
+        self.db = DBConnect().get_async_db()
+        self.collection = self.db.visitor_info
+        self.session_service = get_async_session_service()
+        self.ip_service = get_async_ip_service()
+
+    @traced('visitor.track')
+    async def track_visitor(self, session_id: str, ip_address: str,
+                            client_ip: str = None, user_agent: str = None,
+                            page: str = 'unknown', referrer: str = 'direct',
+                            raw_data: dict = None, fingerprint_hash: str = None) -> Dict[str, Any]:
+        """
+        Track a visitor with session-based and fingerprint-based deduplication.
+        See VisitorService.track_visitor for the argument and result contract.
+        """
+        try:
+            visitor_ip = effective_ip(ip_address, client_ip)
+
+            await self.session_service.create_or_get_session(
+                session_id, visitor_ip, user_agent
+            )
+            await self.session_service.add_page_visit(session_id, page)
+
+            # Fingerprint-based dedup: same browser across sessions = one visitor
+            if fingerprint_hash:
+                existing = await self.collection.find_one({"fingerprint_hash": fingerprint_hash})
+                if existing:
+                    await self.collection.update_one(
+                        {"fingerprint_hash": fingerprint_hash},
+                        returning_visitor_update(page)
+                    )
+                    logger.info(f"Returning visitor by fingerprint: {fingerprint_hash[:12]}...")
+                    return {
+                        "status": "existing",
+                        "message": "Visitor already tracked (same browser)",
+                        "session_id": session_id,
+                        "ip": visitor_ip
+                    }
+
+            # Session-based dedup: same tab/session = one visitor entry per session
+            if not await self.session_service.should_track_visitor(session_id):
+                logger.info(f"Session {session_id} already tracked, skipping duplicate entry")
+                return {
+                    "status": "existing",
+                    "message": "Session already tracked",
+                    "session_id": session_id,
+                    "ip": visitor_ip
+                }
+
+            # IP lookup (network) and UA parsing (CPU, off-loop) in parallel
+            ip_info, ua_data = await asyncio.gather(
+                self.ip_service.get_ip_info(visitor_ip),
+                asyncio.to_thread(parse_user_agent, user_agent) if user_agent else _empty_ua(),
+            )
+
+            visitor_doc = build_visitor_doc(
+                session_id, visitor_ip, client_ip, ip_info, user_agent, ua_data,
+                page, referrer, raw_data, fingerprint_hash
+            )
+
+            try:
+                result = await self.collection.insert_one(visitor_doc)
+            except pymongo_errors().DuplicateKeyError:
+                # Race: another request with same fingerprint_hash inserted first
+                await self.collection.update_one(
+                    {"fingerprint_hash": fingerprint_hash},
+                    returning_visitor_update(page)
+                )
+                return {
+                    "status": "existing",
+                    "message": "Visitor already tracked (same browser)",
+                    "session_id": session_id,
+                    "ip": visitor_ip
+                }
+
+            if result.inserted_id:
+                await self.session_service.mark_session_tracked(
+                    session_id,
+                    str(result.inserted_id)
+                )
+                logger.info(
+                    f"New visitor tracked: {session_id} from "
+                    f"{ip_info.get('city', 'Unknown')}, {ip_info.get('country', 'Unknown')}"
+                )
+                return {
+                    "status": "created",
+                    "message": "Visitor tracked successfully",
+                    "session_id": session_id,
+                    "ip": visitor_ip,
+                    "location": {
+                        "city": ip_info.get("city"),
+                        "country": ip_info.get("country_name")
+                    }
+                }
+
+            return {
+                "status": "error",
+                "message": "Failed to insert visitor document"
+            }
+
+        except Exception as e:
+            logger.error(f"Error tracking visitor: {e}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
+
+async def _empty_ua() -> Dict[str, str]:
+    return {}
+
+
+# Singleton instance
+_async_visitor_service = None
+
+def get_async_visitor_service() -> AsyncVisitorService:
+    """Get singleton instance of AsyncVisitorService"""
+    global _async_visitor_service
+    if _async_visitor_service is None:
+        _async_visitor_service = AsyncVisitorService()
+    return _async_visitor_service
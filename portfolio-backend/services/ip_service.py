@@ -9,13 +9,134 @@ This service handles:
 import logging
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-import requests
 from utils.db_connect import DBConnect
+from utils.tracing import traced
 from utils.config import IPInfoConfig
 
 logger = logging.getLogger(__name__)
 
 
+# Local/loopback addresses never sent to ipinfo.io
+LOCAL_IPS = ('127.0.0.1', 'localhost', '::1')
+
+COUNTRY_NAMES = {
+    'US': 'United States', 'GB': 'United Kingdom', 'CA': 'Canada',
+    'AU': 'Australia', 'DE': 'Germany', 'FR': 'France', 'IN': 'India',
+    'JP': 'Japan', 'CN': 'China', 'BR': 'Brazil', 'MX': 'Mexico',
+    'NL': 'Netherlands', 'SE': 'Sweden', 'NO': 'Norway', 'DK': 'Denmark',
+    'FI': 'Finland', 'IE': 'Ireland', 'NZ': 'New Zealand', 'SG': 'Singapore',
+    'HK': 'Hong Kong', 'KR': 'South Korea', 'IT': 'Italy', 'ES': 'Spain',
+    'CH': 'Switzerland', 'AT': 'Austria', 'BE': 'Belgium', 'PL': 'Poland',
+    'PT': 'Portugal', 'RU': 'Russia', 'ZA': 'South Africa', 'AE': 'UAE',
+    'IL': 'Israel', 'TH': 'Thailand', 'MY': 'Malaysia', 'PH': 'Philippines',
+    'ID': 'Indonesia', 'VN': 'Vietnam', 'TR': 'Turkey', 'EG': 'Egypt',
+    'AR': 'Argentina', 'CL': 'Chile', 'CO': 'Colombia', 'PE': 'Peru',
+}
+
+
+# ---------------------------------------------------------------------------
+# Pure helpers shared by IPService and AsyncIPService
+# ---------------------------------------------------------------------------
+
+def country_name_for(country_code: str) -> str:
+    """Convert country code to full country name"""
+    return COUNTRY_NAMES.get(country_code, country_code)
+
+
+def local_ip_info(ip_address: str) -> Dict[str, Any]:
+    """Info returned for local/development IP addresses"""
+    return {
+        "ip": ip_address,
+        "is_local": True,
+        "city": "Local Development",
+        "region": "Development",
+        "country": "XX",
+        "country_name": "Local",
+        "org": "Development Environment",
+        "timezone": "UTC",
+        "cached_at": datetime.utcnow().isoformat()
+    }
+
+
+def ip_lookup_error(ip_address: str, error: str) -> Dict[str, Any]:
+    """Placeholder result for a failed lookup (never cached)"""
+    return {
+        "ip": ip_address,
+        "error": error,
+        "city": "Unknown",
+        "country": "Unknown"
+    }
+
+
+def parse_ipinfo_response(ip_address: str, status_code: int,
+                          data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Turn an ipinfo.io response (status + JSON body) into our ip_info shape"""
+    if status_code == 200:
+        data = data or {}
+        # Location is taken from API's city/region/country (origin), not from lat/long.
+        # We never derive city/country from coordinates, so display stays consistent with ipinfo.io.
+        country_code = (data.get('country') or '').strip().upper() or 'Unknown'
+        country_name = country_name_for(country_code) if country_code != 'Unknown' else 'Unknown'
+        city = (data.get('city') or 'Unknown').strip() or 'Unknown'
+        region = (data.get('region') or 'Unknown').strip() or 'Unknown'
+
+        ip_info = {
+            "ip": ip_address,
+            "city": city,
+            "region": region,
+            "country": country_code,
+            "country_name": country_name,
+            "postal": (data.get('postal') or '').strip(),
+            "timezone": (data.get('timezone') or 'UTC').strip() or 'UTC',
+            "org": (data.get('org') or 'Unknown').strip() or 'Unknown',
+            "loc": (data.get('loc') or '').strip(),
+            "fetched_at": datetime.utcnow().isoformat(),
+            "source": "ipinfo.io"
+        }
+
+        # Store lat/long only for mapping; never used to derive city/country
+        if ip_info['loc']:
+            try:
+                lat, lon = ip_info['loc'].split(',')
+                ip_info['latitude'] = float(lat.strip())
+                ip_info['longitude'] = float(lon.strip())
+            except (ValueError, AttributeError):
+                pass
+
+        logger.info(f"IP info fetched for {ip_address}: {ip_info['city']}, {ip_info['country_name']}")
+        return ip_info
+
+    if status_code == 429:
+        logger.warning(f"ipinfo.io rate limit exceeded for IP {ip_address}")
+        return ip_lookup_error(ip_address, "Rate limit exceeded")
+
+    logger.error(f"ipinfo.io API error: {status_code}")
+    return ip_lookup_error(ip_address, f"API error: {status_code}")
+
+
+# Aggregations behind get_ip_stats()
+IP_COUNTRY_PIPELINE = [
+    {"$group": {"_id": "$country_name", "count": {"$sum": 1}}},
+    {"$sort": {"count": -1}},
+    {"$limit": 10}
+]
+IP_CITY_PIPELINE = [
+    {"$match": {"city": {"$ne": "Unknown"}}},
+    {"$group": {"_id": "$city", "count": {"$sum": 1}}},
+    {"$sort": {"count": -1}},
+    {"$limit": 10}
+]
+
+
+def format_ip_stats(total_cached: int, top_countries: list, top_cities: list) -> Dict[str, Any]:
+    """Shape aggregation results into the /api/geo/stats response"""
+    return {
+        "total_cached_ips": total_cached,
+        "top_countries": [{"country": c["_id"], "count": c["count"]} for c in top_countries],
+        "top_cities": [{"city": c["_id"], "count": c["count"]} for c in top_cities]
+    }
+
+
 class IPService:
     """Service for IP geolocation lookups and caching"""
     
@@ -28,22 +149,13 @@ class IPService:
     def __init__(self):
         self.db = DBConnect().get_db()
         self.cache_collection = self.db.ip_cache
-        self.api_token = IPInfoConfig.IPINFO_TOKEN
-        self._ensure_indexes()
-    
-    def _ensure_indexes(self):
-        """Ensure proper indexes exist for performance"""
-        try:
-            # Index on IP for fast lookups
-            self.cache_collection.create_index("ip", unique=True)
-            # TTL index for automatic cache cleanup
-            self.cache_collection.create_index(
-                "cached_at", 
-                expireAfterSeconds=self.CACHE_EXPIRY_DAYS * 24 * 3600
-            )
-        except Exception as e:
-            logger.warning(f"Index creation warning (may already exist): {e}")
     
+    @property
+    def api_token(self) -> str:
+        """ipinfo.io token from the current config snapshot (picks up refreshes)"""
+        return IPInfoConfig.IPINFO_TOKEN
+
+    @traced('ip.lookup')
     def get_ip_info(self, ip_address: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         Get geolocation information for an IP address.
@@ -55,7 +167,7 @@ class IPService:
         Returns:
             Dictionary containing IP geolocation data
         """
-        if not ip_address or ip_address in ['127.0.0.1', 'localhost', '::1']:
+        if not ip_address or ip_address in LOCAL_IPS:
             return self._get_local_ip_info(ip_address)
         
         # Use only the leftmost (original client) IP when multiple are present
@@ -79,18 +191,9 @@ class IPService:
     
     def _get_local_ip_info(self, ip_address: str) -> Dict[str, Any]:
         """Return info for local/development IP addresses"""
-        return {
-            "ip": ip_address,
-            "is_local": True,
-            "city": "Local Development",
-            "region": "Development",
-            "country": "XX",
-            "country_name": "Local",
-            "org": "Development Environment",
-            "timezone": "UTC",
-            "cached_at": datetime.utcnow().isoformat()
-        }
+        return local_ip_info(ip_address)
     
+    @traced('ip.cache_read')
     def _get_from_cache(self, ip_address: str) -> Optional[Dict[str, Any]]:
         """Get IP info from cache if available and not expired"""
         try:
@@ -104,8 +207,11 @@ class IPService:
             logger.error(f"Error reading from IP cache: {e}")
             return None
     
+    @traced('ip.ipinfo')
     def _fetch_from_ipinfo(self, ip_address: str) -> Dict[str, Any]:
         """Fetch IP info from ipinfo.io API"""
+        import requests  # deferred: keeps app start-up light
+
         try:
             url = self.IPINFO_API_URL.format(ip=ip_address)
             
@@ -114,77 +220,17 @@ class IPService:
                 headers['Authorization'] = f'Bearer {self.api_token}'
             
             response = requests.get(url, headers=headers, timeout=5)
-            
-            if response.status_code == 200:
-                data = response.json()
-                # Location is taken from API's city/region/country (origin), not from lat/long.
-                # We never derive city/country from coordinates, so display stays consistent with ipinfo.io.
-                country_code = (data.get('country') or '').strip().upper() or 'Unknown'
-                country_name = self._get_country_name(country_code) if country_code != 'Unknown' else 'Unknown'
-                city = (data.get('city') or 'Unknown').strip() or 'Unknown'
-                region = (data.get('region') or 'Unknown').strip() or 'Unknown'
-
-                ip_info = {
-                    "ip": ip_address,
-                    "city": city,
-                    "region": region,
-                    "country": country_code,
-                    "country_name": country_name,
-                    "postal": (data.get('postal') or '').strip(),
-                    "timezone": (data.get('timezone') or 'UTC').strip() or 'UTC',
-                    "org": (data.get('org') or 'Unknown').strip() or 'Unknown',
-                    "loc": (data.get('loc') or '').strip(),
-                    "fetched_at": datetime.utcnow().isoformat(),
-                    "source": "ipinfo.io"
-                }
-
-                # Store lat/long only for mapping; never used to derive city/country
-                if ip_info['loc']:
-                    try:
-                        lat, lon = ip_info['loc'].split(',')
-                        ip_info['latitude'] = float(lat.strip())
-                        ip_info['longitude'] = float(lon.strip())
-                    except (ValueError, AttributeError):
-                        pass
-
-                logger.info(f"IP info fetched for {ip_address}: {ip_info['city']}, {ip_info['country_name']}")
-                return ip_info
-            
-            elif response.status_code == 429:
-                logger.warning(f"ipinfo.io rate limit exceeded for IP {ip_address}")
-                return {
-                    "ip": ip_address,
-                    "error": "Rate limit exceeded",
-                    "city": "Unknown",
-                    "country": "Unknown"
-                }
-            
-            else:
-                logger.error(f"ipinfo.io API error: {response.status_code}")
-                return {
-                    "ip": ip_address,
-                    "error": f"API error: {response.status_code}",
-                    "city": "Unknown",
-                    "country": "Unknown"
-                }
+            data = response.json() if response.status_code == 200 else None
+            return parse_ipinfo_response(ip_address, response.status_code, data)
                 
         except requests.exceptions.Timeout:
             logger.error(f"Timeout fetching IP info for {ip_address}")
-            return {
-                "ip": ip_address,
-                "error": "Timeout",
-                "city": "Unknown",
-                "country": "Unknown"
-            }
+            return ip_lookup_error(ip_address, "Timeout")
         except Exception as e:
             logger.error(f"Error fetching IP info: {e}")
-            return {
-                "ip": ip_address,
-                "error": str(e),
-                "city": "Unknown",
-                "country": "Unknown"
-            }
+            return ip_lookup_error(ip_address, str(e))
     
+    @traced('ip.cache_write')
     def _save_to_cache(self, ip_address: str, ip_info: Dict[str, Any]):
         """Save IP info to cache"""
         try:
@@ -205,48 +251,24 @@ class IPService:
     
     def _get_country_name(self, country_code: str) -> str:
         """Convert country code to full country name"""
-        country_names = {
-            'US': 'United States', 'GB': 'United Kingdom', 'CA': 'Canada',
-            'AU': 'Australia', 'DE': 'Germany', 'FR': 'France', 'IN': 'India',
-            'JP': 'Japan', 'CN': 'China', 'BR': 'Brazil', 'MX': 'Mexico',
-            'NL': 'Netherlands', 'SE': 'Sweden', 'NO': 'Norway', 'DK': 'Denmark',
-            'FI': 'Finland', 'IE': 'Ireland', 'NZ': 'New Zealand', 'SG': 'Singapore',
-            'HK': 'Hong Kong', 'KR': 'South Korea', 'IT': 'Italy', 'ES': 'Spain',
-            'CH': 'Switzerland', 'AT': 'Austria', 'BE': 'Belgium', 'PL': 'Poland',
-            'PT': 'Portugal', 'RU': 'Russia', 'ZA': 'South Africa', 'AE': 'UAE',
-            'IL': 'Israel', 'TH': 'Thailand', 'MY': 'Malaysia', 'PH': 'Philippines',
-            'ID': 'Indonesia', 'VN': 'Vietnam', 'TR': 'Turkey', 'EG': 'Egypt',
-            'AR': 'Argentina', 'CL': 'Chile', 'CO': 'Colombia', 'PE': 'Peru',
-        }
-        return country_names.get(country_code, country_code)
+        return country_name_for(country_code)
     
+    @traced('ip.stats')
     def get_ip_stats(self) -> Dict[str, Any]:
-        """Get statistics about IP lookups"""
+        """Get statistics about IP lookups (analytics client)"""
         try:
-            total_cached = self.cache_collection.count_documents({})
+            db_connect = DBConnect()
+            cache_collection = db_connect.get_analytics_db().ip_cache
+            agg_options = db_connect.analytics_aggregate_options()
+            total_cached = cache_collection.count_documents({})
             
             # Get top countries
-            pipeline = [
-                {"$group": {"_id": "$country_name", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
-                {"$limit": 10}
-            ]
-            top_countries = list(self.cache_collection.aggregate(pipeline))
+            top_countries = list(cache_collection.aggregate(IP_COUNTRY_PIPELINE, **agg_options))
             
             # Get top cities
-            pipeline = [
-                {"$match": {"city": {"$ne": "Unknown"}}},
-                {"$group": {"_id": "$city", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
-                {"$limit": 10}
-            ]
-            top_cities = list(self.cache_collection.aggregate(pipeline))
+            top_cities = list(cache_collection.aggregate(IP_CITY_PIPELINE, **agg_options))
             
-            return {
-                "total_cached_ips": total_cached,
-                "top_countries": [{"country": c["_id"], "count": c["count"]} for c in top_countries],
-                "top_cities": [{"city": c["_id"], "count": c["count"]} for c in top_cities]
-            }
+            return format_ip_stats(total_cached, top_countries, top_cities)
         except Exception as e:
             logger.error(f"Error getting IP stats: {e}")
             return {}
@@ -5,24 +5,42 @@ Uses the `ddgs` meta-search library (successor to duckduckgo-search) which
 aggregates results from Google, Bing, Brave, DuckDuckGo, Yahoo, and more.
 All name parts (first, middle, last) and email domain are used.
 Results are scored to ensure the found profile actually matches the person.
+
+Search outcomes are cached in linkedin_lookup_cache, keyed by the normalized
+(first, middle, last, org hint) identity, so a re-submitted form or another
+visitor with the same name and email domain costs one indexed read instead
+of a round of external searches. Not-found results expire sooner than hits.
 """
 import logging
 import os
 import re
+import time
+import unicodedata
+from datetime import datetime, timedelta
+from functools import lru_cache
 from urllib.parse import unquote
 
-import requests
-from ddgs import DDGS
+from utils.db_connect import DBConnect
+from services.search_scheduler import get_search_scheduler
+from utils.keyword_matcher import KeywordMatcher
+from utils.tracing import span, traced
 
 logger = logging.getLogger(__name__)
 
-# Backends to try in order — "auto" lets ddgs pick the best available,
-# then we fall back to explicit engines if auto fails.
+# DDGS backends — "auto" lets ddgs pick the best available, the rest are
+# explicit engines. services/search_scheduler.py orders them per lookup by
+# recent success rate and latency, and skips ones that keep failing.
 DDGS_BACKENDS = ["auto", "google", "bing", "duckduckgo", "brave"]
 
 # Optional: Serper.dev API key for high-reliability fallback (2500 free/month)
 SERPER_API_KEY = os.getenv("SERPER_API_KEY", "")
 
+# Lookup cache (see utils/indexes.py for the TTL index)
+LOOKUP_CACHE_COLLECTION = "linkedin_lookup_cache"
+LOOKUP_CACHE_TTL = timedelta(days=int(os.getenv("LINKEDIN_CACHE_TTL_DAYS", "30")))
+LOOKUP_CACHE_NOT_FOUND_TTL = timedelta(hours=int(os.getenv("LINKEDIN_CACHE_NOT_FOUND_TTL_HOURS", "24")))
+_CACHED_FIELDS = ("found", "url", "headline", "organization_from_headline", "source", "match_score")
+
 # Personal email domains - no organization inferred
 PERSONAL_DOMAINS = {
     "gmail.com", "yahoo.com", "hotmail.com", "outlook.com",
@@ -84,6 +102,19 @@ NOTABLE_ORGS = {
     "toyota", "ford", "gm", "general motors", "bmw", "mercedes",
 }
 
+# Whole-word Aho-Corasick automaton over NOTABLE_ORGS, built once. Keywords
+# shorter than 3 characters (ge, gm, ey, ...) only count as the entire name.
+_NOTABLE_MATCHER = KeywordMatcher(k for k in NOTABLE_ORGS if len(k) >= 3)
+
+# Organizations derived from an email domain are one run-together token
+# ("Jpmorganchase", "Walmartlabs"), so they are also matched inside the word,
+# against keywords with spaces and punctuation removed ("bankofamerica").
+# Keywords of 3 characters only match at the start of the token
+# ("ibmresearch"), not inside it ("summitpartners" is not MIT).
+_SQUASHED_NOTABLE = {re.sub(r"[^a-z0-9]", "", k): k for k in NOTABLE_ORGS}
+_COMPOUND_MATCHER = KeywordMatcher((k for k in _SQUASHED_NOTABLE if len(k) > 3), whole_words=False)
+_SHORT_NOTABLE = tuple(sorted(k for k in _SQUASHED_NOTABLE if len(k) == 3))
+
 # Common misspellings of personal email domains
 PERSONAL_DOMAIN_TYPOS = {
     "gmial.com", "gamil.com", "gmai.com", "gmil.com",
@@ -99,24 +130,62 @@ PERSONAL_DOMAIN_TYPOS = {
     "outlool.com", "outlook.co",
 }
 
+# Provider names an unknown domain's first label is checked against for typos
+PERSONAL_PROVIDER_NAMES = ("gmail", "yahoo", "hotmail", "outlook", "icloud", "aol",
+                           "protonmail", "mail", "live", "msn", "ymail", "googlemail")
+PERSONAL_TYPO_DISTANCE = 2
+
 
 # ---------------------------------------------------------------------------
 # Utility helpers
 # ---------------------------------------------------------------------------
 
+def _deletes(word: str, distance: int) -> set:
+    """word plus every string obtained by deleting up to `distance` characters"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+def _build_deletion_index(names, distance: int) -> dict:
+    index = {}
+    for name in names:
+        for variant in _deletes(name, distance):
+            index.setdefault(variant, set()).add(name)
+    return index
+
+
+# SymSpell-style index: any word within PERSONAL_TYPO_DISTANCE edits of a
+# provider name shares a deletion variant with it, so candidates are a few
+# dict lookups instead of an edit-distance run against every name
+_PROVIDER_DELETES = _build_deletion_index(PERSONAL_PROVIDER_NAMES, PERSONAL_TYPO_DISTANCE)
+_PROVIDER_MAX_LENGTH = max(len(name) for name in PERSONAL_PROVIDER_NAMES)
+
+
+def _is_provider_typo(domain_name: str) -> bool:
+    if len(domain_name) > _PROVIDER_MAX_LENGTH + PERSONAL_TYPO_DISTANCE:
+        return False
+    candidates = set()
+    for variant in _deletes(domain_name, PERSONAL_TYPO_DISTANCE):
+        candidates |= _PROVIDER_DELETES.get(variant, set())
+    # Shared variants only bound the distance; confirm the real one
+    return any(_edit_distance(domain_name, name) <= PERSONAL_TYPO_DISTANCE for name in candidates)
+
+
 def _is_personal_domain(domain: str) -> bool:
-    domain = domain.lower().strip()
+    return _classify_domain(domain.lower().strip())
+
+
+@lru_cache(maxsize=4096)
+def _classify_domain(domain: str) -> bool:
     if domain in PERSONAL_DOMAINS or domain in PERSONAL_DOMAIN_TYPOS:
         return True
     if domain in INSTITUTIONAL_DOMAINS or any(domain.endswith(f".{inst}") for inst in INSTITUTIONAL_DOMAINS):
         return False
-    domain_name = domain.split(".")[0]
-    personal_names = {"gmail", "yahoo", "hotmail", "outlook", "icloud", "aol",
-                      "protonmail", "mail", "live", "msn", "ymail", "googlemail"}
-    for pn in personal_names:
-        if _edit_distance(domain_name, pn) <= 2:
-            return True
-    return False
+    return _is_provider_typo(domain.split(".")[0])
 
 
 def _edit_distance(s1: str, s2: str) -> int:
@@ -266,18 +335,34 @@ def extract_organization_from_headline(headline: str) -> str | None:
 # URL validation
 # ---------------------------------------------------------------------------
 
-def is_notable_org(org_name: str | None) -> bool:
-    """Check if an organization name matches a notable company/university."""
+def match_notable_org(org_name: str | None, from_email: bool = False) -> str | None:
+    """
+    NOTABLE_ORGS keyword an organization name matches, or None.
+    The name itself, or the longest keyword found in it as whole words
+    ("Jane Street Capital" -> "jane street"; "Metamorphic" -> None).
+
+    from_email: the name came from extract_organization_from_email and has
+    no word boundaries, so keywords are also matched inside it
+    ("Jpmorganchase" -> "jpmorgan"; see _COMPOUND_MATCHER).
+    """
     if not org_name:
-        return False
+        return None
     name = org_name.strip().lower()
     if name in NOTABLE_ORGS:
-        return True
-    # Check if any notable org keyword appears in the name
-    for notable in NOTABLE_ORGS:
-        if len(notable) >= 3 and notable in name:
-            return True
-    return False
+        return name
+    match = _NOTABLE_MATCHER.longest(name)
+    if match or not from_email:
+        return match
+    token = re.sub(r"[^a-z0-9]", "", name)
+    match = _COMPOUND_MATCHER.longest(token)
+    if match is None:
+        match = next((k for k in _SHORT_NOTABLE if token.startswith(k)), None)
+    return _SQUASHED_NOTABLE[match] if match else None
+
+
+def is_notable_org(org_name: str | None, from_email: bool = False) -> bool:
+    """Check if an organization name matches a notable company/university."""
+    return match_notable_org(org_name, from_email) is not None
 
 
 def get_notable_org_name(headline: str | None, org_from_email: str | None) -> str | None:
@@ -290,11 +375,50 @@ def get_notable_org_name(headline: str | None, org_from_email: str | None) -> st
     if org and is_notable_org(org):
         return org.strip()
     # Fall back to email-derived org
-    if org_from_email and is_notable_org(org_from_email):
+    if org_from_email and is_notable_org(org_from_email, from_email=True):
         return org_from_email.strip()
     return None
 
 
+# Known .edu domains group under one key/display name whatever the
+# organization text says ("Arizona State University" and "Asu" both -> asu)
+EDU_ORG_KEYS = {
+    "asu.edu": ("asu", "Asu"),
+    "mit.edu": ("mit", "MIT"),
+    "stanford.edu": ("stanford", "Stanford"),
+    "harvard.edu": ("harvard", "Harvard"),
+    "berkeley.edu": ("berkeley", "Berkeley"),
+    "yale.edu": ("yale", "Yale"),
+    "princeton.edu": ("princeton", "Princeton"),
+    "caltech.edu": ("caltech", "Caltech"),
+    "cmu.edu": ("cmu", "CMU"),
+    "cornell.edu": ("cornell", "Cornell"),
+}
+
+
+def organization_fields(email: str | None, organization: str | None) -> dict:
+    """
+    org_key / org_display / notable for a registered_visitors document.
+
+    Computed once when the registration is written so /api/info/org-stats
+    can group on the indexed org_key instead of deriving it per request.
+    Registrations without an email address get no org_key.
+    """
+    org_key, org_display = None, None
+    if email and "@" in email:
+        domain = email.split("@")[1].lower()
+        if domain in EDU_ORG_KEYS:
+            org_key, org_display = EDU_ORG_KEYS[domain]
+        elif organization:
+            org_key, org_display = organization.lower(), organization
+    from_email = bool(organization) and organization == extract_organization_from_email(email)
+    return {
+        "org_key": org_key,
+        "org_display": org_display,
+        "notable": bool(org_key) and is_notable_org(org_display or org_key, from_email),
+    }
+
+
 def validate_linkedin_url(url: str) -> str | None:
     if not url or not isinstance(url, str):
         return None
@@ -312,14 +436,29 @@ def validate_linkedin_url(url: str) -> str | None:
 # Search engines
 # ---------------------------------------------------------------------------
 
-def _ddgs_search(query: str, backend: str = "auto") -> list[dict]:
+# Message of the DDGSException ddgs raises for a search without results
+DDGS_NO_RESULTS = "No results found."
+
+
+def _ddgs_search(query: str, backend: str = "auto") -> list[dict] | None:
     """
     Search using the ddgs meta-search library.
-    Returns list of LinkedIn profile candidates.
+    Returns list of LinkedIn profile candidates ([] when the search found
+    nothing), or None if the search failed.
     """
     candidates = []
     try:
-        results = DDGS().text(query, max_results=10, backend=backend)
+        from ddgs import DDGS  # heavy (HTTP clients, engine modules); load on first search
+        from ddgs.exceptions import DDGSException
+        try:
+            results = DDGS().text(query, max_results=10, backend=backend)
+        except DDGSException as e:
+            # ddgs raises instead of returning [] when the engines answered
+            # with no results; only its subclasses (rate limit, timeout) and
+            # engine errors (another message) mean the backend failed
+            if type(e) is not DDGSException or str(e) != DDGS_NO_RESULTS:
+                raise
+            results = []
         for r in results:
             href = (r.get("href") or r.get("link") or "").strip()
             if "linkedin.com/in/" in href:
@@ -335,16 +474,19 @@ def _ddgs_search(query: str, backend: str = "auto") -> list[dict]:
                 })
     except Exception as e:
         logger.debug("DDGS search failed (backend=%s): %s", backend, e)
+        return None
     return candidates
 
 
-def _serper_search(query: str) -> list[dict]:
+def _serper_search(query: str) -> list[dict] | None:
     """
     Serper.dev Google search API fallback (2500 free queries/month).
-    Only used if SERPER_API_KEY env var is set.
+    Only used if SERPER_API_KEY env var is set. Returns None if the search failed.
     """
     if not SERPER_API_KEY:
         return []
+    import requests
+
     candidates = []
     try:
         resp = requests.post(
@@ -357,7 +499,7 @@ def _serper_search(query: str) -> list[dict]:
             timeout=8,
         )
         if resp.status_code != 200:
-            return candidates
+            return None
         for r in resp.json().get("organic", []):
             link = (r.get("link") or "").strip()
             if "linkedin.com/in/" in link:
@@ -373,6 +515,7 @@ def _serper_search(query: str) -> list[dict]:
                 })
     except Exception as e:
         logger.debug("Serper search failed: %s", e)
+        return None
     return candidates
 
 
@@ -450,10 +593,60 @@ def _build_queries(
     return queries
 
 
+# ---------------------------------------------------------------------------
+# Lookup cache
+# ---------------------------------------------------------------------------
+
+def _identity_part(s: str) -> str:
+    """Lowercase, accents and punctuation stripped, whitespace collapsed"""
+    s = unicodedata.normalize("NFKD", s or "")
+    s = "".join(c for c in s if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w\s]", " ", s.lower()).split())
+
+
+def lookup_cache_key(first_name: str, middle_name: str, last_name: str, org_hint: str) -> str:
+    """Cache _id for a normalized (first, middle, last, org_hint) identity"""
+    return "|".join(_identity_part(p) for p in (first_name, middle_name, last_name, org_hint))
+
+
+@traced('linkedin.cache_read')
+def _lookup_cache_get(key: str) -> dict | None:
+    """Cached search outcome (one _id read), or None on miss/expiry/error"""
+    try:
+        doc = DBConnect().get_db()[LOOKUP_CACHE_COLLECTION].find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.utcnow()}}
+        )
+    except Exception as e:
+        logger.warning("LinkedIn lookup cache read failed: %s", e)
+        return None
+    if not doc:
+        return None
+    return dict(doc["result"], cached=True)
+
+
+@traced('linkedin.cache_write')
+def _lookup_cache_put(key: str, result: dict):
+    ttl = LOOKUP_CACHE_TTL if result.get("found") else LOOKUP_CACHE_NOT_FOUND_TTL
+    now = datetime.utcnow()
+    try:
+        DBConnect().get_db()[LOOKUP_CACHE_COLLECTION].replace_one(
+            {"_id": key},
+            {
+                "result": {k: result[k] for k in _CACHED_FIELDS if k in result},
+                "cached_at": now,
+                "expires_at": now + ttl,
+            },
+            upsert=True,
+        )
+    except Exception as e:
+        logger.warning("LinkedIn lookup cache write failed: %s", e)
+
+
 # ---------------------------------------------------------------------------
 # Main entry point
 # ---------------------------------------------------------------------------
 
+@traced('linkedin.search')
 def search_linkedin_profile(
     first_name: str,
     last_name: str,
@@ -461,6 +654,7 @@ def search_linkedin_profile(
     linkedin_url: str | None = None,
     middle_name: str | None = None,
     location: dict | None = None,
+    use_cache: bool = True,
 ) -> dict:
     """
     Find LinkedIn profile for the given person.
@@ -469,13 +663,22 @@ def search_linkedin_profile(
         location: dict with optional keys "city", "region", "country"
                   from the visitor's IP geolocation. Used to boost
                   scoring for profiles that mention the same location.
+        use_cache: read linkedin_lookup_cache before searching; the
+                   re-enrichment job turns this off to force a fresh search
+                   (the outcome is still written back)
 
     Strategy:
     1. User-provided LinkedIn URL (instant, 100% accurate)
     2. DDGS meta-search across multiple backends (auto, google, bing, etc.)
-       with multiple query variations (full name + org, name only, etc.)
+       with multiple query variations (full name + org, name only, etc.),
+       in the order the search scheduler ranks the backends
     3. Serper.dev API fallback (if SERPER_API_KEY is configured)
 
+    Steps 2-3 are skipped when linkedin_lookup_cache holds an unexpired
+    outcome for the same normalized name + org hint (returned with
+    cached=True); fresh outcomes are written back. Location is not part of
+    the key: it only breaks ties between candidates for the same name.
+
     All candidates are scored against the person's name, org, and location.
     Only results scoring >= 70 (both first AND last name match + extra signals) are returned.
     If no confident match is found, returns {found: False} rather than
@@ -502,12 +705,34 @@ def search_linkedin_profile(
         return {"found": False, "source": "none"}
 
     org_hint = _get_org_hint(email)
-    queries = _build_queries(first_name, middle_name, last_name, org_hint)
 
-    # 2. Try DDGS with each query × each backend
+    cache_key = lookup_cache_key(first_name, middle_name, last_name, org_hint)
+    cached = _lookup_cache_get(cache_key) if use_cache else None
+    if cached is not None:
+        logger.info("LinkedIn lookup cache hit for %s %s %s", first_name, middle_name, last_name)
+        return cached
+
+    queries = _build_queries(first_name, middle_name, last_name, org_hint)
+    # At least one search completed, possibly with no results ([]): the miss
+    # is then worth caching. Only errors (None) from every search suppress it.
+    searched = False
+
+    # 2. Try DDGS with each query × each backend the scheduler allows; a
+    # backend that errors is not retried for the remaining queries
+    scheduler = get_search_scheduler()
+    backends = scheduler.order()
+    failed = set()
     for query in queries:
-        for backend in DDGS_BACKENDS:
-            candidates = _ddgs_search(query, backend)
+        for backend in backends:
+            if backend in failed or not scheduler.acquire(backend):
+                continue
+            started = time.monotonic()
+            with span('linkedin.ddgs'):
+                candidates = _ddgs_search(query, backend)
+            scheduler.record(backend, candidates is not None, time.monotonic() - started)
+            if candidates is None:
+                failed.add(backend)
+            searched = searched or candidates is not None
             best = _pick_best(
                 candidates, first_name, middle_name, last_name,
                 org_hint, location,
@@ -518,12 +743,15 @@ def search_linkedin_profile(
                     first_name, middle_name, last_name,
                     best.get("source"), best.get("match_score"),
                 )
+                _lookup_cache_put(cache_key, best)
                 return best
 
     # 3. Serper.dev fallback (if configured)
     if SERPER_API_KEY:
         for query in queries[:2]:  # conserve quota, use top 2 queries
-            candidates = _serper_search(query)
+            with span('linkedin.serper'):
+                candidates = _serper_search(query)
+            searched = searched or candidates is not None
             best = _pick_best(
                 candidates, first_name, middle_name, last_name,
                 org_hint, location,
@@ -533,7 +761,12 @@ def search_linkedin_profile(
                     "LinkedIn found for %s %s %s via serper (score=%s)",
                     first_name, middle_name, last_name, best.get("match_score"),
                 )
+                _lookup_cache_put(cache_key, best)
                 return best
 
     logger.info("LinkedIn not found for: %s %s %s", first_name, middle_name, last_name)
-    return {"found": False, "source": "all_exhausted"}
+    result = {"found": False, "source": "all_exhausted"}
+    if searched:
+        # Not cached when every search errored (outage, rate limit)
+        _lookup_cache_put(cache_key, result)
+    return result
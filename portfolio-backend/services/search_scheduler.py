@@ -0,0 +1,171 @@
+"""
+Search Scheduler - Adaptive ordering of DDGS search backends
+
+search_linkedin_profile used to walk DDGS_BACKENDS in a fixed order, so a
+backend that is rate-limiting us (google and bing do, in bursts) was still
+tried first on every registration. The scheduler instead:
+
+- ranks backends by Thompson sampling: each backend's success rate is a
+  Beta(successes + 1, failures + 1) posterior, sampled per lookup and scaled
+  down by the backend's average latency. Counts decay by
+  DDGS_SCHEDULER_DECAY on every update, so a backend that recovers from a
+  rate limit wins its place back.
+- trips a per-backend circuit breaker after DDGS_BREAKER_FAILURES consecutive
+  failures. An open backend is skipped for DDGS_BREAKER_COOLDOWN_SECONDS, then
+  gets a single probe call (half-open); a failed probe doubles the cooldown
+  up to DDGS_BREAKER_MAX_COOLDOWN_SECONDS.
+
+A "failure" is a search that errored (_ddgs_search returned None); a search
+that worked but found no profile is a success. State is per process and is
+exposed through GET /api/metrics/search-backends.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+
+class BackendStats:
+    """Decayed outcome counts, latency and breaker state for one backend"""
+    __slots__ = ('name', 'successes', 'failures', 'latency', 'calls',
+                 'consecutive_failures', 'state', 'opened_at', 'cooldown', 'probing')
+
+    def __init__(self, name: str, cooldown: float):
+        self.name = name
+        self.successes = 0.0
+        self.failures = 0.0
+        self.latency = None  # EWMA of call duration in seconds
+        self.calls = 0
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.cooldown = cooldown
+        self.probing = False
+
+
+class SearchScheduler:
+    """Thompson-sampling backend order with per-backend circuit breakers"""
+
+    def __init__(self, backends: Iterable[str], failure_threshold: int = None,
+                 cooldown_seconds: float = None, max_cooldown_seconds: float = None,
+                 decay: float = None, latency_scale: float = None, rng: random.Random = None):
+        self.failure_threshold = failure_threshold or int(os.getenv('DDGS_BREAKER_FAILURES', '3'))
+        self.cooldown_seconds = cooldown_seconds or float(os.getenv('DDGS_BREAKER_COOLDOWN_SECONDS', '60'))
+        self.max_cooldown_seconds = max_cooldown_seconds or float(os.getenv('DDGS_BREAKER_MAX_COOLDOWN_SECONDS', '900'))
+        self.decay = decay or float(os.getenv('DDGS_SCHEDULER_DECAY', '0.98'))
+        # A backend this slow (seconds) counts half as much as an instant one
+        self.latency_scale = latency_scale or 3.0
+        self._rng = rng or random.Random()
+        self._stats = {name: BackendStats(name, self.cooldown_seconds) for name in backends}
+        self._lock = threading.Lock()
+
+    def _available(self, stats: BackendStats, now: float) -> bool:
+        if stats.state == OPEN and now - stats.opened_at >= stats.cooldown:
+            stats.state = HALF_OPEN
+        if stats.state == HALF_OPEN:
+            return not stats.probing
+        return stats.state == CLOSED
+
+    def order(self) -> List[str]:
+        """Backends to try for one lookup, best first; open breakers are left out"""
+        now = time.monotonic()
+        scored = []
+        with self._lock:
+            for stats in self._stats.values():
+                if not self._available(stats, now):
+                    continue
+                theta = self._rng.betavariate(stats.successes + 1, stats.failures + 1)
+                if stats.latency is not None:
+                    theta /= 1 + stats.latency / self.latency_scale
+                scored.append((theta, stats.name))
+        scored.sort(reverse=True)
+        return [name for _, name in scored]
+
+    def acquire(self, backend: str) -> bool:
+        """
+        Whether backend may be called right now. Claims the single probe of a
+        half-open breaker, so concurrent lookups do not all hit a backend
+        that is still rate-limiting us.
+        """
+        with self._lock:
+            stats = self._stats.get(backend)
+            if stats is None or not self._available(stats, time.monotonic()):
+                return False
+            if stats.state == HALF_OPEN:
+                stats.probing = True
+            return True
+
+    def record(self, backend: str, ok: bool, latency: float):
+        """Report the outcome of a call made after acquire()"""
+        with self._lock:
+            stats = self._stats.get(backend)
+            if stats is None:
+                return
+            stats.successes *= self.decay
+            stats.failures *= self.decay
+            stats.calls += 1
+            stats.latency = latency if stats.latency is None else 0.8 * stats.latency + 0.2 * latency
+            probe = stats.state == HALF_OPEN
+            stats.probing = False
+
+            if ok:
+                stats.successes += 1
+                stats.consecutive_failures = 0
+                if stats.state != CLOSED:
+                    logger.info(f"Search backend {backend} recovered, closing breaker")
+                stats.state = CLOSED
+                stats.cooldown = self.cooldown_seconds
+                return
+
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            if probe:
+                stats.cooldown = min(stats.cooldown * 2, self.max_cooldown_seconds)
+            if probe or stats.consecutive_failures >= self.failure_threshold:
+                if stats.state != OPEN:
+                    logger.warning(
+                        f"Search backend {backend} failing, skipping it for {stats.cooldown:.0f}s"
+                    )
+                stats.state = OPEN
+                stats.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-backend state for inspection"""
+        now = time.monotonic()
+        with self._lock:
+            backends = {}
+            for stats in self._stats.values():
+                total = stats.successes + stats.failures
+                backends[stats.name] = {
+                    'state': stats.state,
+                    'calls': stats.calls,
+                    'success_rate': round(stats.successes / total, 3) if total else None,
+                    'latency_ms': round(stats.latency * 1000, 1) if stats.latency is not None else None,
+                    'consecutive_failures': stats.consecutive_failures,
+                    'retry_in_seconds': (
+                        round(max(0.0, stats.opened_at + stats.cooldown - now), 1)
+                        if stats.state == OPEN else None
+                    ),
+                }
+        return {'pid': os.getpid(), 'backends': backends}
+
+
+# Singleton instance
+_search_scheduler = None
+_search_scheduler_lock = threading.Lock()
+
+def get_search_scheduler() -> SearchScheduler:
+    """Get singleton instance of SearchScheduler over DDGS_BACKENDS"""
+    global _search_scheduler
+    if _search_scheduler is None:
+        with _search_scheduler_lock:
+            if _search_scheduler is None:
+                from services.linkedin_service import DDGS_BACKENDS
+                _search_scheduler = SearchScheduler(DDGS_BACKENDS)
+    return _search_scheduler
@@ -10,10 +10,61 @@ import logging
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from utils.db_connect import DBConnect
+from utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
+# ---------------------------------------------------------------------------
+# Pure helpers shared by SessionService and AsyncSessionService
+# ---------------------------------------------------------------------------
+
+def is_session_current(session: Dict[str, Any], expiry_hours: int) -> bool:
+    """True if the session is still within its expiry window"""
+    expiry_time = session['created_at'] + timedelta(hours=expiry_hours)
+    return datetime.utcnow() < expiry_time
+
+
+def new_session_doc(session_id: str, ip_address: str, user_agent: str = None) -> Dict[str, Any]:
+    """Document inserted for a first-seen session"""
+    return {
+        "session_id": session_id,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "created_at": datetime.utcnow(),
+        "last_activity": datetime.utcnow(),
+        "page_views": 1,
+        "pages_visited": [],
+        "is_tracked": False  # Flag to prevent duplicate visitor entries
+    }
+
+
+def section_times_update(session_id: str, page: str, total_time_ms: int,
+                         sections: dict, timestamp: str = None) -> Dict[str, Any]:
+    """Upsert document for section_analytics (one doc per session + page)"""
+    # Build section update fields
+    section_updates = {}
+    for section_id, data in sections.items():
+        time_ms = data.get('timeMs', 0) if isinstance(data, dict) else 0
+        visits = data.get('visits', 0) if isinstance(data, dict) else 0
+        section_updates[f"sections.{section_id}.timeMs"] = time_ms
+        section_updates[f"sections.{section_id}.visits"] = visits
+
+    return {
+        "$set": {
+            "session_id": session_id,
+            "page": page,
+            "total_time_ms": total_time_ms,
+            "last_updated": datetime.utcnow(),
+            "client_timestamp": timestamp,
+            **section_updates
+        },
+        "$setOnInsert": {
+            "created_at": datetime.utcnow()
+        }
+    }
+
+
 class SessionService:
     """Service for managing visitor sessions"""
     
@@ -23,21 +74,8 @@ class SessionService:
     def __init__(self):
         self.db = DBConnect().get_db()
         self.collection = self.db.sessions
-        self._ensure_indexes()
-    
-    def _ensure_indexes(self):
-        """Ensure proper indexes exist for performance"""
-        try:
-            # Index on session_id for fast lookups
-            self.collection.create_index("session_id", unique=True)
-            # TTL index for automatic session cleanup
-            self.collection.create_index(
-                "created_at", 
-                expireAfterSeconds=self.SESSION_EXPIRY_HOURS * 3600
-            )
-        except Exception as e:
-            logger.warning(f"Index creation warning (may already exist): {e}")
     
+    @traced('session.validate')
     def validate_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
         Validate a session ID and return session data if valid.
@@ -53,16 +91,15 @@ class SessionService:
             
         try:
             session = self.collection.find_one({"session_id": session_id})
-            if session:
-                # Check if session is still valid (within expiry window)
-                expiry_time = session['created_at'] + timedelta(hours=self.SESSION_EXPIRY_HOURS)
-                if datetime.utcnow() < expiry_time:
-                    return session
+            # Check if session is still valid (within expiry window)
+            if session and is_session_current(session, self.SESSION_EXPIRY_HOURS):
+                return session
             return None
         except Exception as e:
             logger.error(f"Error validating session: {e}")
             return None
     
+    @traced('session.get_or_create')
     def create_or_get_session(self, session_id: str, ip_address: str, 
                                user_agent: str = None) -> Dict[str, Any]:
         """
@@ -90,16 +127,7 @@ class SessionService:
                 return {**existing, "is_new": False}
             
             # Create new session
-            session_doc = {
-                "session_id": session_id,
-                "ip_address": ip_address,
-                "user_agent": user_agent,
-                "created_at": datetime.utcnow(),
-                "last_activity": datetime.utcnow(),
-                "page_views": 1,
-                "pages_visited": [],
-                "is_tracked": False  # Flag to prevent duplicate visitor entries
-            }
+            session_doc = new_session_doc(session_id, ip_address, user_agent)
             
             self.collection.insert_one(session_doc)
             logger.info(f"New session created: {session_id}")
@@ -114,6 +142,7 @@ class SessionService:
                 "error": str(e)
             }
     
+    @traced('session.should_track')
     def should_track_visitor(self, session_id: str) -> bool:
         """
         Check if this session should create a new visitor entry.
@@ -134,6 +163,7 @@ class SessionService:
             logger.error(f"Error checking session tracking status: {e}")
             return True  # Default to tracking on error
     
+    @traced('session.mark_tracked')
     def mark_session_tracked(self, session_id: str, visitor_id: str = None):
         """
         Mark a session as having been tracked in visitor_info.
@@ -157,6 +187,7 @@ class SessionService:
         except Exception as e:
             logger.error(f"Error marking session as tracked: {e}")
     
+    @traced('session.page_visit')
     def add_page_visit(self, session_id: str, page: str):
         """
         Add a page to the session's visited pages list.
@@ -177,6 +208,7 @@ class SessionService:
         except Exception as e:
             logger.error(f"Error adding page visit: {e}")
     
+    @traced('session.section_times')
     def store_section_times(self, session_id: str, page: str,
                              total_time_ms: int, sections: dict,
                              timestamp: str = None):
@@ -194,27 +226,9 @@ class SessionService:
         try:
             analytics_collection = self.db.section_analytics
             
-            # Build section update fields
-            section_updates = {}
-            for section_id, data in sections.items():
-                time_ms = data.get('timeMs', 0) if isinstance(data, dict) else 0
-                visits = data.get('visits', 0) if isinstance(data, dict) else 0
-                section_updates[f"sections.{section_id}.timeMs"] = time_ms
-                section_updates[f"sections.{section_id}.visits"] = visits
-            
-            update_doc = {
-                "$set": {
-                    "session_id": session_id,
-                    "page": page,
-                    "total_time_ms": total_time_ms,
-                    "last_updated": datetime.utcnow(),
-                    "client_timestamp": timestamp,
-                    **section_updates
-                },
-                "$setOnInsert": {
-                    "created_at": datetime.utcnow()
-                }
-            }
+            update_doc = section_times_update(
+                session_id, page, total_time_ms, sections, timestamp
+            )
             
             analytics_collection.update_one(
                 {"session_id": session_id, "page": page},
@@ -233,14 +247,16 @@ class SessionService:
         except Exception as e:
             logger.error(f"Error storing section times: {e}")
     
-    def get_session_stats(self) -> Dict[str, Any]:
-        """Get overall session statistics"""
+    @traced('session.stats')
+    def get_session_stats(self, session=None) -> Dict[str, Any]:
+        """Get overall session statistics (analytics client)"""
         try:
-            total_sessions = self.collection.count_documents({})
-            active_sessions = self.collection.count_documents({
+            collection = DBConnect().get_analytics_db().sessions
+            total_sessions = collection.count_documents({}, session=session)
+            active_sessions = collection.count_documents({
                 "last_activity": {"$gte": datetime.utcnow() - timedelta(hours=1)}
-            })
-            tracked_sessions = self.collection.count_documents({"is_tracked": True})
+            }, session=session)
+            tracked_sessions = collection.count_documents({"is_tracked": True}, session=session)
             
             return {
                 "total_sessions": total_sessions,
@@ -0,0 +1,117 @@
+"""
+User Cache - Read-through cache of user records for the auth routes
+
+login and profile look users up by username on every request; credential
+stuffing mostly targets usernames that do not exist. This cache keeps:
+
+- the fields auth needs for known users (AUTH_FIELDS), for USER_CACHE_TTL_SECONDS
+- a negative entry for unknown usernames, for USER_CACHE_NEGATIVE_TTL_SECONDS
+
+in a bounded LRU (USER_CACHE_MAX_ENTRIES), so repeated lookups of the same
+name - found or not - cost no MongoDB round trip. The auth routes invalidate
+a username whenever they write its login state (failed-login $inc,
+successful-login $set, registration), so this process never acts on stale
+lockout state. Other workers see such writes within the TTL.
+
+A lookup reads MongoDB outside the lock, so a write can be invalidated while
+the read is in flight. Each in-flight username carries a generation that
+invalidate() bumps, and a read is only cached if its generation is unchanged.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from utils.db_connect import DBConnect
+
+logger = logging.getLogger(__name__)
+
+# Projection: everything login/profile read, nothing else
+AUTH_FIELDS = {
+    '_id': 1, 'username': 1, 'password_hash': 1, 'email': 1, 'created_at': 1,
+    'login_attempts': 1, 'last_failed_login': 1,
+}
+
+_MISSING = object()
+
+
+class UserCache:
+    """TTL + LRU cache of auth user records, with negative caching"""
+
+    def __init__(self, ttl_seconds: float = None, negative_ttl_seconds: float = None,
+                 max_entries: int = None):
+        self.ttl = ttl_seconds or float(os.getenv('USER_CACHE_TTL_SECONDS', '30'))
+        self.negative_ttl = negative_ttl_seconds or float(os.getenv('USER_CACHE_NEGATIVE_TTL_SECONDS', '30'))
+        self.max_entries = max_entries or int(os.getenv('USER_CACHE_MAX_ENTRIES', '10000'))
+        self._entries = OrderedDict()  # username -> (expires_at, user dict or _MISSING)
+        # username -> [reads in flight, generation]; only while a read is in flight
+        self._inflight: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def collection(self):
+        return DBConnect().get_db().users
+
+    def get(self, username: str) -> Optional[Dict[str, Any]]:
+        """User record (AUTH_FIELDS only) or None if no such user"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(username)
+                self.hits += 1
+                return None if entry[1] is _MISSING else dict(entry[1])
+            self.misses += 1
+            inflight = self._inflight.setdefault(username, [0, 0])
+            inflight[0] += 1
+            generation = inflight[1]
+
+        user = _MISSING
+        try:
+            user = self.collection.find_one({'username': username}, AUTH_FIELDS)
+        finally:
+            with self._lock:
+                inflight[0] -= 1
+                if not inflight[0]:
+                    del self._inflight[username]
+                # Not cached if invalidate() ran during the read: it may predate the write
+                if user is not _MISSING and inflight[1] == generation:
+                    ttl = self.ttl if user is not None else self.negative_ttl
+                    self._entries[username] = (now + ttl, user if user is not None else _MISSING)
+                    self._entries.move_to_end(username)
+                    if len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        return dict(user) if user is not None else None
+
+    def invalidate(self, username: str):
+        """Drop a username after writing its record (or creating it)"""
+        with self._lock:
+            self._entries.pop(username, None)
+            inflight = self._inflight.get(username)
+            if inflight is not None:
+                inflight[1] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for inflight in self._inflight.values():
+                inflight[1] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+# Singleton instance
+_user_cache = None
+
+def get_user_cache() -> UserCache:
+    """Get singleton instance of UserCache"""
+    global _user_cache
+    if _user_cache is None:
+        _user_cache = UserCache()
+    return _user_cache
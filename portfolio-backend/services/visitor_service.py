@@ -10,14 +10,196 @@ This service handles:
 import logging
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
-from pymongo.errors import DuplicateKeyError
-from utils.db_connect import DBConnect
+from utils.db_connect import DBConnect, pymongo_errors
+from utils.tracing import traced
+from models.visitor_schema import (
+    SCHEMA_VERSION,
+    BROWSER_TERMS,
+    compact_geo,
+    decode_term,
+    encode_user_agent,
+    expand_visitor_doc,
+    trim_raw_data,
+)
 from services.session_service import get_session_service
-from services.ip_service import get_ip_service
+from services.ip_service import get_ip_service, country_name_for
 
 logger = logging.getLogger(__name__)
 
 
+# ---------------------------------------------------------------------------
+# Pure helpers shared by VisitorService and AsyncVisitorService
+# ---------------------------------------------------------------------------
+
+def effective_ip(server_ip: str, client_ip: str) -> str:
+    """
+    Determine the effective IP address to use.
+    Prefer client IP if it's valid and different from local addresses.
+    """
+    local_ips = ['127.0.0.1', 'localhost', '::1', None, '']
+    
+    # If client provided an IP and server is local, use client IP
+    if server_ip in local_ips and client_ip and client_ip not in local_ips:
+        return client_ip.split(',')[0].strip()
+    
+    # Otherwise prefer server-detected IP
+    if server_ip and server_ip not in local_ips:
+        return server_ip.split(',')[0].strip()
+    
+    # Fallback to client IP
+    if client_ip and client_ip not in local_ips:
+        return client_ip.split(',')[0].strip()
+    
+    return server_ip or '127.0.0.1'
+
+
+@traced('visitor.parse_ua')
+def parse_user_agent(user_agent: str) -> Dict[str, str]:
+    """Parse user agent string to extract browser, OS, device info"""
+    try:
+        from ua_parser import user_agent_parser
+        parsed = user_agent_parser.Parse(user_agent)
+        return {
+            "browser": parsed.get('user_agent', {}).get('family'),
+            "browser_version": '.'.join(filter(None, [
+                str(parsed.get('user_agent', {}).get('major', '')),
+                str(parsed.get('user_agent', {}).get('minor', ''))
+            ])),
+            "os": parsed.get('os', {}).get('family'),
+            "os_version": '.'.join(filter(None, [
+                str(parsed.get('os', {}).get('major', '')),
+                str(parsed.get('os', {}).get('minor', ''))
+            ])),
+            "device": parsed.get('device', {}).get('family')
+        }
+    except Exception as e:
+        logger.error(f"Error parsing user agent: {e}")
+        return {}
+
+
+def build_visitor_doc(session_id: str, ip_address: str, client_ip: str,
+                      ip_info: Dict[str, Any], user_agent: str, ua_data: Dict[str, str],
+                      page: str, referrer: str, raw_data: dict,
+                      fingerprint_hash: str = None) -> Dict[str, Any]:
+    """
+    Document inserted into visitor_info for a newly tracked visitor
+    (compact schema, see models/visitor_schema.py). geo keeps the lookup
+    fields that outlive the ip_cache entry; user_agent is only parsed, not stored.
+    """
+    now = datetime.utcnow()
+    visitor_doc = {
+        "schema_version": SCHEMA_VERSION,
+        "session_id": session_id,
+        "ip_address": ip_address,
+        **encode_user_agent(ua_data),
+        "page": page,
+        "referrer": referrer,
+        "timestamp": now,
+        "last_activity": now,
+        "visit_count": 1,
+        "raw_data": trim_raw_data(raw_data),
+        "geo": compact_geo(ip_info),
+    }
+    if client_ip and client_ip != ip_address:
+        visitor_doc["client_reported_ip"] = client_ip
+    if fingerprint_hash:
+        visitor_doc["fingerprint_hash"] = fingerprint_hash
+    return visitor_doc
+
+
+def returning_visitor_update(page: str) -> Dict[str, Any]:
+    """Visit bump applied when a known fingerprint comes back"""
+    return {
+        "$set": {"last_activity": datetime.utcnow(), "page": page},
+        "$inc": {"visit_count": 1}
+    }
+
+
+# Filter matching visitor_info documents without a fingerprint (legacy)
+LEGACY_VISITOR_FILTER = {
+    "$or": [
+        {"fingerprint_hash": {"$exists": False}},
+        {"fingerprint_hash": None},
+        {"fingerprint_hash": ""}
+    ]
+}
+
+# Aggregations behind get_statistics(). Country and browser keys differ between
+# schema versions (v1 names vs v2 ISO codes / term codes), so these fetch
+# extra groups and format_statistics() decodes, merges and trims them.
+COUNTRY_PIPELINE = [
+    {"$group": {"_id": {"$ifNull": ["$geo.country_name", "$geo.country"]}, "count": {"$sum": 1}}},
+    {"$sort": {"count": -1}},
+    {"$limit": 30}
+]
+CITY_PIPELINE = [
+    {"$match": {"geo.city": {"$ne": None, "$ne": "Unknown"}}},
+    {"$group": {"_id": "$geo.city", "count": {"$sum": 1}}},
+    {"$sort": {"count": -1}},
+    {"$limit": 10}
+]
+PAGE_PIPELINE = [
+    {"$group": {"_id": "$page", "count": {"$sum": 1}}},
+    {"$sort": {"count": -1}},
+    {"$limit": 5}
+]
+BROWSER_PIPELINE = [
+    {"$match": {"browser": {"$ne": None}}},
+    {"$group": {"_id": "$browser", "count": {"$sum": 1}}},
+    {"$sort": {"count": -1}},
+    {"$limit": 20}
+]
+
+
+def _merge_counts(groups: list, decode, limit: int) -> List[tuple]:
+    """Decode group keys, sum groups that decode to the same key, keep the top `limit`"""
+    merged: Dict[Any, int] = {}
+    for group in groups:
+        key = decode(group["_id"])
+        merged[key] = merged.get(key, 0) + group["count"]
+    return sorted(merged.items(), key=lambda item: -item[1])[:limit]
+
+
+def _country_label(value) -> Optional[str]:
+    # v2 stores the ISO code; v1 stored the name (which maps to itself)
+    if isinstance(value, str) and len(value) == 2:
+        return country_name_for(value.upper())
+    return value
+
+
+def format_statistics(total_visitors: int, unique_ips: int, last_24h: int,
+                      last_7d: int, last_30d: int, top_countries: list,
+                      top_cities: list, top_pages: list, top_browsers: list,
+                      session_stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape raw counts/aggregation results into the /api/info/stats response"""
+    return {
+        "total_visitors": total_visitors,
+        "unique_ips": unique_ips,
+        "visitors_24h": last_24h,
+        "visitors_7d": last_7d,
+        "visitors_30d": last_30d,
+        "top_countries": [
+            {"country": country or "Unknown", "count": count}
+            for country, count in _merge_counts(top_countries, _country_label, 10)
+        ],
+        "top_cities": [
+            {"city": c["_id"], "count": c["count"]} 
+            for c in top_cities
+        ],
+        "top_pages": [
+            {"page": p["_id"], "count": p["count"]} 
+            for p in top_pages
+        ],
+        "top_browsers": [
+            {"browser": browser, "count": count}
+            for browser, count in _merge_counts(
+                top_browsers, lambda value: decode_term(BROWSER_TERMS, value), 5
+            )
+        ],
+        "sessions": session_stats
+    }
+
+
 class VisitorService:
     """Service for managing visitor tracking and analytics"""
     
@@ -26,25 +208,8 @@ class VisitorService:
         self.collection = self.db.visitor_info
         self.session_service = get_session_service()
         self.ip_service = get_ip_service()
-        self._ensure_indexes()
-    
-    def _ensure_indexes(self):
-        """Ensure proper indexes exist for performance"""
-        try:
-            # Compound index for common queries
-            self.collection.create_index([
-                ("session_id", 1),
-                ("timestamp", -1)
-            ])
-            # Index for IP-based queries
-            self.collection.create_index("ip_address")
-            # Index for time-based queries
-            self.collection.create_index("timestamp")
-            # Sparse index for fingerprint-based deduplication (cross-session same browser)
-            self.collection.create_index("fingerprint_hash", unique=True, sparse=True)
-        except Exception as e:
-            logger.warning(f"Index creation warning (may already exist): {e}")
     
+    @traced('visitor.track')
     def track_visitor(self, session_id: str, ip_address: str,
                       client_ip: str = None, user_agent: str = None,
                       page: str = 'unknown', referrer: str = 'direct',
@@ -68,10 +233,10 @@ class VisitorService:
             Result dictionary with tracking status (new, existing, or error)
         """
         try:
-            effective_ip = self._get_effective_ip(ip_address, client_ip)
+            visitor_ip = self._get_effective_ip(ip_address, client_ip)
 
             self.session_service.create_or_get_session(
-                session_id, effective_ip, user_agent
+                session_id, visitor_ip, user_agent
             )
             self.session_service.add_page_visit(session_id, page)
 
@@ -81,17 +246,14 @@ class VisitorService:
                 if existing:
                     self.collection.update_one(
                         {"fingerprint_hash": fingerprint_hash},
-                        {
-                            "$set": {"last_activity": datetime.utcnow(), "page": page},
-                            "$inc": {"visit_count": 1}
-                        }
+                        returning_visitor_update(page)
                     )
                     logger.info(f"Returning visitor by fingerprint: {fingerprint_hash[:12]}...")
                     return {
                         "status": "existing",
                         "message": "Visitor already tracked (same browser)",
                         "session_id": session_id,
-                        "ip": effective_ip
+                        "ip": visitor_ip
                     }
 
             # Session-based dedup: same tab/session = one visitor entry per session
@@ -101,55 +263,30 @@ class VisitorService:
                     "status": "existing",
                     "message": "Session already tracked",
                     "session_id": session_id,
-                    "ip": effective_ip
+                    "ip": visitor_ip
                 }
 
-            ip_info = self.ip_service.get_ip_info(effective_ip)
+            ip_info = self.ip_service.get_ip_info(visitor_ip)
             ua_data = self._parse_user_agent(user_agent) if user_agent else {}
 
-            visitor_doc = {
-                "session_id": session_id,
-                "ip_address": effective_ip,
-                "client_reported_ip": client_ip,
-                "ip_info": ip_info,
-                "user_agent_raw": user_agent,
-                "browser": ua_data.get("browser"),
-                "os": ua_data.get("os"),
-                "device": ua_data.get("device"),
-                "page": page,
-                "referrer": referrer,
-                "timestamp": datetime.utcnow(),
-                "last_activity": datetime.utcnow(),
-                "visit_count": 1,
-                "raw_data": raw_data or {},
-                "geo": {
-                    "city": ip_info.get("city"),
-                    "region": ip_info.get("region"),
-                    "country": ip_info.get("country"),
-                    "country_name": ip_info.get("country_name"),
-                    "timezone": ip_info.get("timezone"),
-                    "org": ip_info.get("org")
-                }
-            }
-            if fingerprint_hash:
-                visitor_doc["fingerprint_hash"] = fingerprint_hash
+            visitor_doc = build_visitor_doc(
+                session_id, visitor_ip, client_ip, ip_info, user_agent, ua_data,
+                page, referrer, raw_data, fingerprint_hash
+            )
 
             try:
                 result = self.collection.insert_one(visitor_doc)
-            except DuplicateKeyError:
+            except pymongo_errors().DuplicateKeyError:
                 # Race: another request with same fingerprint_hash inserted first
                 self.collection.update_one(
                     {"fingerprint_hash": fingerprint_hash},
-                    {
-                        "$set": {"last_activity": datetime.utcnow(), "page": page},
-                        "$inc": {"visit_count": 1}
-                    }
+                    returning_visitor_update(page)
                 )
                 return {
                     "status": "existing",
                     "message": "Visitor already tracked (same browser)",
                     "session_id": session_id,
-                    "ip": effective_ip
+                    "ip": visitor_ip
                 }
 
             if result.inserted_id:
@@ -165,7 +302,7 @@ class VisitorService:
                     "status": "created",
                     "message": "Visitor tracked successfully",
                     "session_id": session_id,
-                    "ip": effective_ip,
+                    "ip": visitor_ip,
                     "location": {
                         "city": ip_info.get("city"),
                         "country": ip_info.get("country_name")
@@ -185,59 +322,26 @@ class VisitorService:
             }
     
     def _get_effective_ip(self, server_ip: str, client_ip: str) -> str:
-        """
-        Determine the effective IP address to use.
-        Prefer client IP if it's valid and different from local addresses.
-        """
-        local_ips = ['127.0.0.1', 'localhost', '::1', None, '']
-        
-        # If client provided an IP and server is local, use client IP
-        if server_ip in local_ips and client_ip and client_ip not in local_ips:
-            return client_ip.split(',')[0].strip()
-        
-        # Otherwise prefer server-detected IP
-        if server_ip and server_ip not in local_ips:
-            return server_ip.split(',')[0].strip()
-        
-        # Fallback to client IP
-        if client_ip and client_ip not in local_ips:
-            return client_ip.split(',')[0].strip()
-        
-        return server_ip or '127.0.0.1'
+        """Determine the effective IP address to use (see effective_ip)"""
+        return effective_ip(server_ip, client_ip)
     
     def _parse_user_agent(self, user_agent: str) -> Dict[str, str]:
         """Parse user agent string to extract browser, OS, device info"""
-        try:
-            from ua_parser import user_agent_parser
-            parsed = user_agent_parser.Parse(user_agent)
-            return {
-                "browser": parsed.get('user_agent', {}).get('family'),
-                "browser_version": '.'.join(filter(None, [
-                    str(parsed.get('user_agent', {}).get('major', '')),
-                    str(parsed.get('user_agent', {}).get('minor', ''))
-                ])),
-                "os": parsed.get('os', {}).get('family'),
-                "os_version": '.'.join(filter(None, [
-                    str(parsed.get('os', {}).get('major', '')),
-                    str(parsed.get('os', {}).get('minor', ''))
-                ])),
-                "device": parsed.get('device', {}).get('family')
-            }
-        except Exception as e:
-            logger.error(f"Error parsing user agent: {e}")
-            return {}
+        return parse_user_agent(user_agent)
     
+    @traced('visitor.by_session')
     def get_visitor_by_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get visitor info by session ID"""
         try:
             visitor = self.collection.find_one({"session_id": session_id})
             if visitor:
                 visitor['_id'] = str(visitor['_id'])
-            return visitor
+            return expand_visitor_doc(visitor)
         except Exception as e:
             logger.error(f"Error getting visitor by session: {e}")
             return None
     
+    @traced('visitor.by_ip')
     def get_visitors_by_ip(self, ip_address: str) -> List[Dict[str, Any]]:
         """Get all visitors from a specific IP address"""
         try:
@@ -246,111 +350,69 @@ class VisitorService:
             ).sort("timestamp", -1))
             for v in visitors:
                 v['_id'] = str(v['_id'])
-            return visitors
+            return [expand_visitor_doc(v) for v in visitors]
         except Exception as e:
             logger.error(f"Error getting visitors by IP: {e}")
             return []
 
-    def get_unique_visitor_count(self) -> int:
+    def get_unique_visitor_count(self, session=None) -> int:
         """
         Count unique visitors: distinct fingerprint_hash count plus legacy
         documents without a fingerprint_hash (each counted as one).
+        Reads go through the analytics client.
         """
         try:
-            distinct_hashes = self.collection.distinct("fingerprint_hash")
+            collection = DBConnect().get_analytics_db().visitor_info
+            distinct_hashes = collection.distinct("fingerprint_hash", session=session)
             unique_by_fingerprint = len([h for h in distinct_hashes if h])
-            legacy_count = self.collection.count_documents({
-                "$or": [
-                    {"fingerprint_hash": {"$exists": False}},
-                    {"fingerprint_hash": None},
-                    {"fingerprint_hash": ""}
-                ]
-            })
+            legacy_count = collection.count_documents(LEGACY_VISITOR_FILTER, session=session)
             return unique_by_fingerprint + legacy_count
         except Exception as e:
             logger.error(f"Error getting unique visitor count: {e}")
             return 0
 
+    @traced('visitor.stats')
     def get_statistics(self) -> Dict[str, Any]:
-        """Get comprehensive visitor statistics"""
+        """Get comprehensive visitor statistics (analytics client)"""
         try:
             now = datetime.utcnow()
-            
-            # Basic counts
-            total_visitors = self.collection.count_documents({})
-            unique_ips = len(self.collection.distinct('ip_address'))
-            
-            # Time-based stats
-            last_24h = self.collection.count_documents({
-                "timestamp": {"$gte": now - timedelta(hours=24)}
-            })
-            last_7d = self.collection.count_documents({
-                "timestamp": {"$gte": now - timedelta(days=7)}
-            })
-            last_30d = self.collection.count_documents({
-                "timestamp": {"$gte": now - timedelta(days=30)}
-            })
-            
-            # Geographic distribution
-            country_pipeline = [
-                {"$group": {"_id": "$geo.country_name", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
-                {"$limit": 10}
-            ]
-            top_countries = list(self.collection.aggregate(country_pipeline))
-            
-            city_pipeline = [
-                {"$match": {"geo.city": {"$ne": None, "$ne": "Unknown"}}},
-                {"$group": {"_id": "$geo.city", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
-                {"$limit": 10}
-            ]
-            top_cities = list(self.collection.aggregate(city_pipeline))
-            
-            # Page views
-            page_pipeline = [
-                {"$group": {"_id": "$page", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
-                {"$limit": 5}
-            ]
-            top_pages = list(self.collection.aggregate(page_pipeline))
-            
-            # Browser stats
-            browser_pipeline = [
-                {"$match": {"browser": {"$ne": None}}},
-                {"$group": {"_id": "$browser", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
-                {"$limit": 5}
-            ]
-            top_browsers = list(self.collection.aggregate(browser_pipeline))
-            
-            # Session stats
-            session_stats = self.session_service.get_session_stats()
-            
-            return {
-                "total_visitors": total_visitors,
-                "unique_ips": unique_ips,
-                "visitors_24h": last_24h,
-                "visitors_7d": last_7d,
-                "visitors_30d": last_30d,
-                "top_countries": [
-                    {"country": c["_id"] or "Unknown", "count": c["count"]} 
-                    for c in top_countries
-                ],
-                "top_cities": [
-                    {"city": c["_id"], "count": c["count"]} 
-                    for c in top_cities
-                ],
-                "top_pages": [
-                    {"page": p["_id"], "count": p["count"]} 
-                    for p in top_pages
-                ],
-                "top_browsers": [
-                    {"browser": b["_id"], "count": b["count"]} 
-                    for b in top_browsers
-                ],
-                "sessions": session_stats
-            }
+            db_connect = DBConnect()
+            collection = db_connect.get_analytics_db().visitor_info
+            agg_options = db_connect.analytics_aggregate_options()
+
+            with db_connect.analytics_session() as session:
+                # Basic counts
+                total_visitors = collection.count_documents({}, session=session)
+                unique_ips = len(collection.distinct('ip_address', session=session))
+
+                # Time-based stats
+                last_24h = collection.count_documents({
+                    "timestamp": {"$gte": now - timedelta(hours=24)}
+                }, session=session)
+                last_7d = collection.count_documents({
+                    "timestamp": {"$gte": now - timedelta(days=7)}
+                }, session=session)
+                last_30d = collection.count_documents({
+                    "timestamp": {"$gte": now - timedelta(days=30)}
+                }, session=session)
+
+                # Geographic distribution
+                top_countries = list(collection.aggregate(COUNTRY_PIPELINE, session=session, **agg_options))
+                top_cities = list(collection.aggregate(CITY_PIPELINE, session=session, **agg_options))
+
+                # Page views
+                top_pages = list(collection.aggregate(PAGE_PIPELINE, session=session, **agg_options))
+
+                # Browser stats
+                top_browsers = list(collection.aggregate(BROWSER_PIPELINE, session=session, **agg_options))
+
+                # Session stats
+                session_stats = self.session_service.get_session_stats(session=session)
+
+            return format_statistics(
+                total_visitors, unique_ips, last_24h, last_7d, last_30d,
+                top_countries, top_cities, top_pages, top_browsers, session_stats
+            )
         except Exception as e:
             logger.error(f"Error getting visitor statistics: {e}")
             return {}
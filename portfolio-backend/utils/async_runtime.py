@@ -0,0 +1,98 @@
+"""
+Shared asyncio runtime for async views and services
+
+Flask's default async support runs every async view in a fresh event loop,
+which rules out long-lived async clients (AsyncMongoClient, httpx.AsyncClient
+are bound to the loop that first uses them). Instead, one event loop runs in a
+background thread per process and every coroutine is submitted to it:
+
+    request thread  --run_coroutine()-->  shared loop (all async I/O)
+
+The request thread only waits on the result, so many in-flight requests share
+a single loop and its connection pools. contextvars (and therefore Flask's
+request/app context) are copied into the submitted task.
+"""
+import asyncio
+import concurrent.futures
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Callable, Coroutine
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on how long a request thread waits for its coroutine
+ASYNC_VIEW_TIMEOUT_SECONDS = float(os.getenv('ASYNC_VIEW_TIMEOUT_SECONDS', '30'))
+
+_loop = None
+_loop_thread = None
+_loop_pid = None
+_lock = threading.Lock()
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop):
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Get (or start) the shared background event loop for this process"""
+    global _loop, _loop_thread, _loop_pid
+    if _loop is not None and _loop_pid == os.getpid():
+        return _loop
+    with _lock:
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(
+                target=_run_loop, args=(_loop,), name='async-runtime', daemon=True
+            )
+            _loop_thread.start()
+            _loop_pid = os.getpid()
+            logger.info(f"Async runtime loop started (pid={_loop_pid})")
+    return _loop
+
+
+def in_loop_thread() -> bool:
+    """True when called from the shared loop's own thread"""
+    return _loop_thread is not None and threading.current_thread() is _loop_thread
+
+
+def loop_thread_id():
+    """Thread identifier of the shared loop, or None before it starts"""
+    return _loop_thread.ident if _loop_thread is not None else None
+
+
+def run_coroutine(coro: Awaitable, timeout: float = None) -> Any:
+    """
+    Run a coroutine on the shared loop and block until it finishes.
+
+    Must not be called from the loop thread itself (it would deadlock).
+    """
+    if in_loop_thread():
+        raise RuntimeError("run_coroutine() called from the async runtime thread")
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    try:
+        return future.result(timeout=timeout or ASYNC_VIEW_TIMEOUT_SECONDS)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+
+def async_to_sync(func: Callable[..., Coroutine]) -> Callable[..., Any]:
+    """Flask.async_to_sync replacement that dispatches to the shared loop"""
+    def wrapper(*args, **kwargs):
+        return run_coroutine(func(*args, **kwargs))
+    return wrapper
+
+
+def _reset_after_fork():
+    """The loop thread does not survive fork; start a new one on next use"""
+    global _loop, _loop_thread, _loop_pid, _lock
+    _loop = None
+    _loop_thread = None
+    _loop_pid = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
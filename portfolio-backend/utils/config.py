@@ -1,6 +1,12 @@
 import os
 import secrets
+import threading
+import time
+import logging
+from dataclasses import dataclass, field
 from datetime import timedelta
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
 
 # Load environment variables from .env file if available (local development)
 try:
@@ -9,38 +15,42 @@ try:
 except ImportError:
     pass  # python-dotenv not installed, use system env vars
 
+logger = logging.getLogger(__name__)
 
-def _get_config_value(key: str, default: str = None) -> str:
-    """
-    Get configuration value from SSM Parameter Store or environment variable.
+# Seconds between background SSM refreshes (0 disables refreshing)
+CONFIG_REFRESH_SECONDS = 300
 
-    Priority:
-    1. SSM Parameter Store (when USE_SSM_SECRETS=true, i.e., Lambda)
-    2. Environment variable
-    3. Default value
-    """
-    use_ssm = os.getenv('USE_SSM_SECRETS', 'false').lower() == 'true'
 
-    if use_ssm:
-        try:
-            from utils.ssm_config import ssm_config
-            value = getattr(ssm_config, key, None)
-            if value:
-                return value
-        except Exception as e:
-            import logging
-            logging.warning(f"SSM config failed for {key}: {e}")
+def _use_ssm() -> bool:
+    return os.getenv('USE_SSM_SECRETS', 'false').lower() == 'true'
+
 
-    # Fallback to environment variable
-    return os.getenv(key, default)
+def _get_int_env(key: str, default: int = None):
+    """Read an integer environment variable; empty or invalid values give the default."""
+    value = os.getenv(key, '')
+    if value.strip() == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logging.warning(f"Invalid integer for {key}: {value!r}, using {default}")
+        return default
 
 
-def _get_jwt_secret_key() -> str:
+def _get_bool_env(key: str, default: bool = False) -> bool:
+    """Read a true/false environment variable; empty values give the default."""
+    value = os.getenv(key, '').strip().lower()
+    if value == '':
+        return default
+    return value in ('1', 'true', 'yes', 'on')
+
+
+def _resolve_jwt_secret_key(ssm_secrets: Mapping[str, str], previous: Optional[str]) -> str:
     """
     Get JWT secret key. In production, a secret must be configured (SSM or env).
     In development, generates a per-process fallback so tokens are invalidated on restart.
     """
-    value = _get_config_value('JWT_SECRET_KEY', None)
+    value = ssm_secrets.get('JWT_SECRET_KEY') or os.getenv('JWT_SECRET_KEY')
     if value:
         return value
     env = os.getenv('ENVIRONMENT', 'development').lower()
@@ -49,17 +59,180 @@ def _get_jwt_secret_key() -> str:
             "JWT_SECRET_KEY must be set in production (via SSM or environment variable). "
             "Refusing to run with an unconfigured secret."
         )
-    return secrets.token_hex(32)
+    # Keep the generated key across refreshes, or every refresh would log users out
+    return previous or secrets.token_hex(32)
+
+
+def _database_config(ssm_secrets: Mapping[str, str]) -> Dict[str, Any]:
+    return {
+        'mongo_uri': (
+            ssm_secrets.get('MONGODB_URI')
+            or os.getenv('MONGODB_URI')
+            or os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
+        ),
+        'db_name': os.getenv('DB_NAME', 'portfolio_db'),
+        # Connection pool / timeout settings passed to MongoClient.
+        # None means "use the driver default".
+        'pool': {
+            'maxPoolSize': _get_int_env('MONGO_MAX_POOL_SIZE', 50),
+            'minPoolSize': _get_int_env('MONGO_MIN_POOL_SIZE', 0),
+            'maxIdleTimeMS': _get_int_env('MONGO_MAX_IDLE_TIME_MS', 300000),
+            'serverSelectionTimeoutMS': _get_int_env('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000),
+            'connectTimeoutMS': _get_int_env('MONGO_CONNECT_TIMEOUT_MS', 5000),
+            'socketTimeoutMS': _get_int_env('MONGO_SOCKET_TIMEOUT_MS'),
+            'waitQueueTimeoutMS': _get_int_env('MONGO_WAIT_QUEUE_TIMEOUT_MS'),
+        },
+        # Separate client for the stats/aggregation endpoints so slow
+        # analytics reads never hold connections the ingestion path needs.
+        # Timeouts not listed here are inherited from 'pool'.
+        'analytics': {
+            'readPreference': os.getenv('MONGO_ANALYTICS_READ_PREFERENCE', 'secondaryPreferred'),
+            # Driver minimum is 90s; ignored when readPreference is primary
+            'maxStalenessSeconds': _get_int_env('MONGO_ANALYTICS_MAX_STALENESS_SECONDS', 120),
+            'maxPoolSize': _get_int_env('MONGO_ANALYTICS_MAX_POOL_SIZE', 5),
+            'minPoolSize': _get_int_env('MONGO_ANALYTICS_MIN_POOL_SIZE', 0),
+            'socketTimeoutMS': _get_int_env('MONGO_ANALYTICS_SOCKET_TIMEOUT_MS', 60000),
+            'waitQueueTimeoutMS': _get_int_env('MONGO_ANALYTICS_WAIT_QUEUE_TIMEOUT_MS'),
+        },
+        'analytics_allow_disk_use': _get_bool_env('MONGO_ANALYTICS_ALLOW_DISK_USE', True),
+        # Read each stats response from one snapshot (replica set, 5.0+)
+        'analytics_snapshot': _get_bool_env('MONGO_ANALYTICS_SNAPSHOT', False),
+    }
+
+
+def _freeze(value):
+    """Read-only view of nested dicts (snapshots are shared between threads)"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Configuration snapshot
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    Immutable view of the resolved configuration.
+
+    Built once from a single SSM GetParameters call (when USE_SSM_SECRETS is
+    on) plus environment variables, and swapped atomically on refresh, so
+    readers never lock and never call SSM.
+    """
+    secrets: Mapping[str, str]
+    database: Mapping[str, Any]
+    jwt_secret_key: str
+    ipinfo_token: str
+    version: int = 1
+    loaded_at: float = field(default_factory=time.time)
+
+
+_snapshot: Optional[ConfigSnapshot] = None
+_snapshot_lock = threading.Lock()
+_refresher: Optional[threading.Thread] = None
+
+
+def _fetch_secrets(previous: Optional[ConfigSnapshot]) -> Dict[str, str]:
+    if not _use_ssm():
+        return {}
+    from utils.ssm_config import get_all_secrets
+    fetched = get_all_secrets()
+    if previous is None:
+        return fetched
+    # get_all_secrets() returns what it could read; keep last known values
+    # for anything missing rather than dropping to env/defaults on a blip
+    return {**previous.secrets, **fetched}
+
+
+def _build_snapshot(previous: Optional[ConfigSnapshot] = None) -> ConfigSnapshot:
+    ssm_secrets = _fetch_secrets(previous)
+    return ConfigSnapshot(
+        secrets=_freeze(ssm_secrets),
+        database=_freeze(_database_config(ssm_secrets)),
+        jwt_secret_key=_resolve_jwt_secret_key(
+            ssm_secrets, previous.jwt_secret_key if previous else None
+        ),
+        ipinfo_token=ssm_secrets.get('IPINFO_TOKEN') or os.getenv('IPINFO_TOKEN', ''),
+        version=previous.version + 1 if previous else 1,
+    )
+
+
+def get_config() -> ConfigSnapshot:
+    """Current configuration snapshot (loaded on first call, lock-free after)"""
+    snapshot = _snapshot
+    if snapshot is not None:
+        return snapshot
+    return _load_initial()
+
+
+def _load_initial() -> ConfigSnapshot:
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = _build_snapshot()
+            _start_refresher()
+        return _snapshot
+
+
+def refresh_config() -> ConfigSnapshot:
+    """Rebuild the snapshot now and publish it (one SSM call when enabled)"""
+    global _snapshot
+    previous = get_config()
+    snapshot = _build_snapshot(previous)
+    changed = sorted(
+        key for key in set(previous.secrets) | set(snapshot.secrets)
+        if previous.secrets.get(key) != snapshot.secrets.get(key)
+    )
+    if changed:
+        # Values read per use (ipinfo token) apply immediately; the MongoDB URI
+        # and JWT key are bound when the client / app is created
+        logger.info(f"Configuration refreshed (v{snapshot.version}), changed: {', '.join(changed)}")
+    _snapshot = snapshot
+    return snapshot
+
+
+def _refresh_loop(interval: int):
+    while True:
+        time.sleep(interval)
+        try:
+            refresh_config()
+        except Exception as e:
+            logger.error(f"Configuration refresh failed, keeping previous snapshot: {e}")
+
+
+def _start_refresher():
+    """Background TTL refresh; only useful when values come from SSM"""
+    global _refresher
+    interval = _get_int_env('CONFIG_REFRESH_SECONDS', CONFIG_REFRESH_SECONDS)
+    if not _use_ssm() or not interval or interval <= 0:
+        return
+    if _refresher is not None and _refresher.is_alive():
+        return
+    _refresher = threading.Thread(
+        target=_refresh_loop, args=(interval,), name='config-refresh', daemon=True
+    )
+    _refresher.start()
+
+
+def _after_fork_in_child():
+    """Threads do not survive fork: restart the refresher in the child"""
+    global _refresher, _snapshot_lock
+    _snapshot_lock = threading.Lock()
+    _refresher = None
+    if _snapshot is not None:
+        _start_refresher()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
 
 
 class DBConfigMeta(type):
     """Metaclass to make DBConfig work as both class and instance."""
     @property
     def DATABASE_CONFIG(cls):
-        return {
-            'mongo_uri': _get_config_value('MONGODB_URI', os.getenv('MONGO_URI', 'mongodb://localhost:27017/')),
-            'db_name': os.getenv('DB_NAME', 'portfolio_db'),
-        }
+        return get_config().database
 
 
 class DBConfig(object, metaclass=DBConfigMeta):
@@ -71,7 +244,7 @@ class AppConfigMeta(type):
     """Metaclass so AppConfig.JWT_SECRET_KEY is a class-level property."""
     @property
     def JWT_SECRET_KEY(cls):
-        return _get_jwt_secret_key()
+        return get_config().jwt_secret_key
 
 
 class AppConfig(object, metaclass=AppConfigMeta):
@@ -89,4 +262,4 @@ class IPInfoConfig(object):
     @classmethod
     @property
     def IPINFO_TOKEN(cls):
-        return _get_config_value('IPINFO_TOKEN', '')
+        return get_config().ipinfo_token
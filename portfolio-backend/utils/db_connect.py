@@ -1,42 +1,178 @@
 import logging
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, OperationFailure
+import os
+import threading
+from contextlib import contextmanager
 from .config import DBConfig
 
 logger = logging.getLogger(__name__)
 
+# Client roles (also the pool metrics labels)
+PRIMARY = 'primary'
+ASYNC = 'async'
+ANALYTICS = 'analytics'
+ASYNC_ANALYTICS = 'async_analytics'
+
+_pymongo_errors = None
+
+
+def pymongo_errors():
+    """
+    pymongo.errors, imported once on first use: app start-up does not load
+    the driver, and hot paths skip the import statement after the first call.
+    """
+    global _pymongo_errors
+    if _pymongo_errors is None:
+        import pymongo.errors
+        _pymongo_errors = pymongo.errors
+    return _pymongo_errors
+
 
 class DBConnect:
-    """MongoDB connection manager"""
-    _client = None
+    """
+    MongoDB connection manager.
+
+    One client per role is shared per process:
+    - primary / async: tracking and auth traffic (reads and writes)
+    - analytics / async_analytics: stats aggregations, with their own pool and
+      read preference (secondaries by default) so they cannot exhaust the
+      connections ingestion needs
+
+    Clients are tied to the PID that created them: a forked child (e.g.
+    gunicorn with preload_app) never reuses the parent's clients and builds
+    its own on first use.
+    """
+    _clients = {}
+    _client_pids = {}
+    _lock = threading.Lock()
 
     def __init__(self):
         self.config = DBConfig.DATABASE_CONFIG
         self.mongo_uri = self.config['mongo_uri']
         self.db_name = self.config['db_name']
 
+    def _client_options(self, role: str = PRIMARY) -> dict:
+        """Pool and timeout options, skipping unset values (driver defaults)"""
+        options = dict(self.config.get('pool', {}))
+        if role in (ANALYTICS, ASYNC_ANALYTICS):
+            options.update(self.config.get('analytics', {}))
+            read_preference = (options.get('readPreference') or 'primary')
+            if read_preference == 'primary':
+                # maxStalenessSeconds is invalid with primary reads
+                options.pop('maxStalenessSeconds', None)
+            elif options.get('maxStalenessSeconds') is not None:
+                options['maxStalenessSeconds'] = max(90, options['maxStalenessSeconds'])
+        return {k: v for k, v in options.items() if v is not None}
+
+    def _get_client(self, role: str):
+        """Return the client for a role, creating it on first use in this process"""
+        pid = os.getpid()
+        client = DBConnect._clients.get(role)
+        if client is not None and DBConnect._client_pids.get(role) == pid:
+            return client
+
+        with DBConnect._lock:
+            if any(p != pid for p in DBConnect._client_pids.values()):
+                # Inherited from a parent process: sockets are shared with the
+                # parent, so drop the references without closing them.
+                DBConnect._discard_clients()
+            client = DBConnect._clients.get(role)
+            if client is None:
+                client = self._create_client(role)
+                DBConnect._clients[role] = client
+                DBConnect._client_pids[role] = pid
+        return client
+
+    def _create_client(self, role: str):
+        # pymongo (and its listeners) are imported with the first client, not
+        # with this module, so importing services/blueprints stays cheap
+        from pymongo import MongoClient
+        from pymongo.errors import ConnectionFailure
+        from .db_monitoring import get_event_listeners
+
+        options = self._client_options(role)
+        listeners = get_event_listeners(role)
+        if role in (ASYNC, ASYNC_ANALYTICS):
+            # No I/O here: the async clients are only ever used from the
+            # shared loop in utils.async_runtime, which is what the driver requires.
+            from pymongo import AsyncMongoClient
+            client = AsyncMongoClient(self.mongo_uri, event_listeners=listeners, **options)
+            logger.info(f"MongoDB {role} client created (pid={os.getpid()})")
+            return client
+        try:
+            client = MongoClient(self.mongo_uri, event_listeners=listeners, **options)
+            # Verify connection
+            client.admin.command('ping')
+            logger.info(f"MongoDB {role} client connected (pid={os.getpid()}, options={options})")
+            return client
+        except ConnectionFailure as e:
+            logger.error(f"MongoDB connection failed: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"MongoDB initialization error: {e}")
+            raise
+
     def _connect(self):
         """Establish MongoDB connection if not already connected"""
-        if DBConnect._client is None:
-            try:
-                DBConnect._client = MongoClient(self.mongo_uri)
-                # Verify connection
-                DBConnect._client.admin.command('ping')
-                logger.info("MongoDB successfully connected")
-            except ConnectionFailure as e:
-                logger.error(f"MongoDB connection failed: {e}")
-                raise
-            except Exception as e:
-                logger.error(f"MongoDB initialization error: {e}")
-                raise
-        return DBConnect._client
+        return self._get_client(PRIMARY)
+
+    @classmethod
+    def _discard_clients(cls):
+        """Forget the current clients (used after fork)"""
+        if cls._clients:
+            from .db_monitoring import reset_pool_gauges
+            for role in cls._clients:
+                reset_pool_gauges(role)
+        cls._clients = {}
+        cls._client_pids = {}
+
+    @classmethod
+    def _after_fork_in_child(cls):
+        """Reset client state in a freshly forked child process"""
+        cls._lock = threading.Lock()
+        cls._discard_clients()
 
     def get_db(self):
         """Get database instance"""
         client = self._connect()
         return client[self.db_name]
 
+    def get_async_db(self):
+        """Get async database instance (for use on the shared event loop)"""
+        return self._get_client(ASYNC)[self.db_name]
+
+    def get_analytics_db(self):
+        """Get database instance for stats/aggregation reads (separate pool)"""
+        return self._get_client(ANALYTICS)[self.db_name]
+
+    def get_async_analytics_db(self):
+        """Async counterpart of get_analytics_db (for use on the shared event loop)"""
+        return self._get_client(ASYNC_ANALYTICS)[self.db_name]
+
+    def analytics_aggregate_options(self) -> dict:
+        """Keyword arguments for aggregate() on the analytics path"""
+        if self.config.get('analytics_allow_disk_use', True):
+            return {'allowDiskUse': True}
+        return {}
+
+    @contextmanager
+    def analytics_session(self):
+        """
+        Snapshot session for multi-query stats, so every count and aggregate
+        in one response sees the same point in time. Yields None (no session)
+        unless MONGO_ANALYTICS_SNAPSHOT is enabled; snapshot reads need a
+        replica set on MongoDB 5.0+.
+        """
+        if not self.config.get('analytics_snapshot'):
+            yield None
+            return
+        with self._get_client(ANALYTICS).start_session(snapshot=True) as session:
+            yield session
+
     def get_collection(self, collection_name):
         """Get a specific collection"""
         db = self.get_db()
         return db[collection_name]
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=DBConnect._after_fork_in_child)
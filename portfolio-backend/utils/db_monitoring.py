@@ -0,0 +1,220 @@
+"""
+MongoDB driver monitoring - connection pool, server and command listeners
+
+Registered on every MongoClient created by DBConnect. The listeners export:
+- Pool checkout wait time (histogram, ms) and checkout failures
+- Pool size (open connections) and connections currently checked out
+- Connection churn (created/closed counters, closed broken down by reason)
+- Server/topology changes (servers opened/closed, description changes)
+- Per-route command metrics: every command (name, collection, duration, docs
+  returned) is attributed to the Flask request that issued it
+
+Use get_pool_metrics() to read a snapshot, e.g. to size maxPoolSize for the
+number of concurrent requests a worker handles. Command metrics are kept in
+utils/request_db_stats.py, which does not import pymongo so the Flask hooks
+can be installed without loading the driver.
+"""
+import logging
+from typing import Dict, Any, Optional, Tuple
+from pymongo import monitoring
+from utils.metrics import Counter, Gauge, Histogram
+from utils.request_db_stats import RequestDBStats, current_request_stats, record_command
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """Metric set for one MongoClient role ('primary', 'analytics', ...)"""
+
+    def __init__(self):
+        self.checkout_wait_ms = Histogram()
+        self.checkouts = Counter()
+        self.checkout_failures = Counter()
+        self.checked_out = Gauge()
+        self.pool_size = Gauge()
+        self.connections_created = Counter()
+        self.connections_closed = Counter()
+        self.closed_by_reason: Dict[str, Counter] = {}
+        self.pool_cleared = Counter()
+        self.server_changes = Counter()
+        self.servers = Gauge()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'pool_size': self.pool_size.value,
+            'checked_out': self.checked_out.value,
+            'checkouts': self.checkouts.value,
+            'checkout_failures': self.checkout_failures.value,
+            'checkout_wait_ms': self.checkout_wait_ms.snapshot(),
+            'connections_created': self.connections_created.value,
+            'connections_closed': self.connections_closed.value,
+            'connections_closed_by_reason': {
+                reason: counter.value for reason, counter in self.closed_by_reason.items()
+            },
+            'pool_cleared': self.pool_cleared.value,
+            'servers': self.servers.value,
+            'server_description_changes': self.server_changes.value,
+        }
+
+
+_pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def _metrics_for(role: str) -> PoolMetrics:
+    metrics = _pool_metrics.get(role)
+    if metrics is None:
+        metrics = _pool_metrics.setdefault(role, PoolMetrics())
+    return metrics
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Records CMAP (connection pool) events into PoolMetrics"""
+
+    def __init__(self, role: str = 'primary'):
+        self.metrics = _metrics_for(role)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.metrics.pool_cleared.inc()
+        logger.warning(f"MongoDB pool cleared for {event.address}")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.metrics.connections_created.inc()
+        self.metrics.pool_size.inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.metrics.connections_closed.inc()
+        self.metrics.pool_size.dec()
+        reason = str(event.reason)
+        counter = self.metrics.closed_by_reason.get(reason)
+        if counter is None:
+            counter = self.metrics.closed_by_reason.setdefault(reason, Counter())
+        counter.inc()
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self.metrics.checkout_failures.inc()
+        if event.duration is not None:
+            self.metrics.checkout_wait_ms.observe(event.duration * 1000)
+
+    def connection_checked_out(self, event):
+        self.metrics.checkouts.inc()
+        self.metrics.checked_out.inc()
+        if event.duration is not None:
+            self.metrics.checkout_wait_ms.observe(event.duration * 1000)
+
+    def connection_checked_in(self, event):
+        self.metrics.checked_out.dec()
+
+
+class ServerMetricsListener(monitoring.ServerListener):
+    """Tracks servers known to the client and their state changes"""
+
+    def __init__(self, role: str = 'primary'):
+        self.metrics = _metrics_for(role)
+
+    def opened(self, event):
+        self.metrics.servers.inc()
+
+    def description_changed(self, event):
+        previous = event.previous_description.server_type_name
+        new = event.new_description.server_type_name
+        if previous != new:
+            self.metrics.server_changes.inc()
+            logger.info(f"MongoDB server {event.server_address} changed: {previous} -> {new}")
+
+    def closed(self, event):
+        self.metrics.servers.dec()
+
+
+# ---------------------------------------------------------------------------
+# Command monitoring (per request / per route, see utils/request_db_stats.py)
+# ---------------------------------------------------------------------------
+
+def _command_collection(command_name: str, command: Dict[str, Any]) -> Optional[str]:
+    if command_name == 'getMore':
+        return command.get('collection')
+    target = command.get(command_name)
+    return target if isinstance(target, str) else None
+
+
+def _docs_returned(reply: Dict[str, Any]) -> int:
+    cursor = reply.get('cursor')
+    if isinstance(cursor, dict):
+        batch = cursor.get('firstBatch', cursor.get('nextBatch'))
+        return len(batch) if batch is not None else 0
+    if 'value' in reply:  # findAndModify
+        return 1 if reply['value'] is not None else 0
+    return 0
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """
+    Attributes every command to the current request's route.
+
+    The started event carries the command document (collection name) and
+    runs in the issuing context; it is matched to its succeeded/failed event
+    by (connection_id, request_id).
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Tuple, Tuple[str, Optional[RequestDBStats]]] = {}
+
+    def started(self, event):
+        collection = _command_collection(event.command_name, event.command)
+        key = f"{event.command_name} {collection}" if collection else event.command_name
+        self._in_flight[(event.connection_id, event.request_id)] = (key, current_request_stats())
+
+    def succeeded(self, event):
+        self._record(event, _docs_returned(event.reply) if event.reply else 0, failed=False)
+
+    def failed(self, event):
+        self._record(event, 0, failed=True)
+
+    def _record(self, event, docs: int, failed: bool):
+        entry = self._in_flight.pop((event.connection_id, event.request_id), None)
+        if entry is None:
+            return
+        key, request_stats = entry
+        record_command(key, event.duration_micros / 1000, docs, failed, request_stats)
+
+
+# Single instance shared by all clients: in-flight commands are keyed by
+# connection, so sync and async clients cannot collide.
+_command_listener = CommandMetricsListener()
+
+
+def get_event_listeners(role: str = 'primary') -> list:
+    """Listeners to pass as MongoClient(event_listeners=...)"""
+    return [PoolMetricsListener(role), ServerMetricsListener(role), _command_listener]
+
+
+def reset_pool_gauges(role: str = 'primary'):
+    """
+    Zero the pool gauges for a role. Called when a client is discarded
+    (e.g. after fork) so the new client's pool starts from a clean count.
+    """
+    metrics = _pool_metrics.get(role)
+    if metrics:
+        metrics.pool_size.set(0)
+        metrics.checked_out.set(0)
+        metrics.servers.set(0)
+
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """Snapshot of pool metrics for every client role"""
+    return {role: metrics.snapshot() for role, metrics in _pool_metrics.items()}
+
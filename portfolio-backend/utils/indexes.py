@@ -0,0 +1,185 @@
+"""
+Declarative MongoDB index manifest and reconciler
+
+Every collection's indexes are declared once in INDEX_MANIFEST. Services no
+longer issue create_index calls at construction time; instead the reconciler
+(jobs/reconcile_indexes.py) compares the manifest with list_indexes() and only
+creates what is missing, so application start-up does no index DDL.
+
+Indexes are matched by key pattern, not by name, so indexes created earlier by
+the old _ensure_indexes() code (default names) are recognised.
+"""
+import logging
+from typing import Dict, Any, List, Tuple
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+logger = logging.getLogger(__name__)
+
+# Session documents expire 24h after creation (SessionService.SESSION_EXPIRY_HOURS)
+SESSION_TTL_SECONDS = 24 * 3600
+# IP cache entries expire after 30 days (IPService.CACHE_EXPIRY_DAYS)
+IP_CACHE_TTL_SECONDS = 30 * 24 * 3600
+
+INDEX_MANIFEST: Dict[str, List[IndexModel]] = {
+    'visitor_info': [
+        IndexModel([('session_id', ASCENDING), ('timestamp', DESCENDING)]),
+        IndexModel([('ip_address', ASCENDING)]),
+        IndexModel([('timestamp', ASCENDING)]),
+        # Fingerprint-based deduplication (cross-session same browser)
+        IndexModel([('fingerprint_hash', ASCENDING)], unique=True, sparse=True),
+    ],
+    'sessions': [
+        IndexModel([('session_id', ASCENDING)], unique=True),
+        IndexModel([('created_at', ASCENDING)], expireAfterSeconds=SESSION_TTL_SECONDS),
+    ],
+    'ip_cache': [
+        IndexModel([('ip', ASCENDING)], unique=True),
+        IndexModel([('cached_at', ASCENDING)], expireAfterSeconds=IP_CACHE_TTL_SECONDS),
+    ],
+    'section_analytics': [
+        # Upsert key for store_section_times
+        IndexModel([('session_id', ASCENDING), ('page', ASCENDING)]),
+    ],
+    'registered_visitors': [
+        # register_visitor: $or on session_id / fingerprint_hash (index union)
+        IndexModel([('session_id', ASCENDING)]),
+        IndexModel([('fingerprint_hash', ASCENDING)]),
+        IndexModel([('email', ASCENDING)]),
+        IndexModel([('linkedin.found', ASCENDING)]),
+        # org-stats: notable registrations grouped by org_key
+        IndexModel([('notable', ASCENDING), ('org_key', ASCENDING)]),
+    ],
+    'linkedin_profiles': [
+        # register_visitor upserts by email, or by name when email is missing
+        IndexModel([('email', ASCENDING)]),
+        IndexModel([('first_name', ASCENDING), ('last_name', ASCENDING)]),
+        # org-stats: found profiles grouped by notable_org
+        IndexModel([('found', ASCENDING), ('notable_org', ASCENDING)]),
+    ],
+    'linkedin_lookup_cache': [
+        # _id is the normalized identity; entries carry their own expiry
+        # (shorter for not-found results)
+        IndexModel([('expires_at', ASCENDING)], expireAfterSeconds=0),
+    ],
+    'users': [
+        IndexModel([('username', ASCENDING)], unique=True),
+        IndexModel([('email', ASCENDING)]),
+    ],
+    'rate_limit_buckets': [
+        # Buckets carry their own expiry (end of the following window)
+        IndexModel([('expires_at', ASCENDING)], expireAfterSeconds=0),
+    ],
+    'contact_messages': [
+        # get_messages sorts newest first
+        IndexModel([('created_at', DESCENDING)]),
+    ],
+}
+
+# Index options that must match for an existing index to satisfy the manifest
+_COMPARED_OPTIONS = ('unique', 'sparse', 'expireAfterSeconds', 'partialFilterExpression')
+
+
+def _key_pattern(index_doc: Dict[str, Any]) -> Tuple:
+    # Servers may report numeric directions as floats (1.0) for shell-created indexes
+    return tuple(
+        (field, int(direction) if isinstance(direction, (int, float)) else direction)
+        for field, direction in index_doc['key'].items()
+    )
+
+
+def _options(index_doc: Dict[str, Any]) -> Dict[str, Any]:
+    # expireAfterSeconds=0 is a real TTL (expire at the stored date), so only
+    # None / False mean "not set"
+    return {
+        opt: index_doc[opt] for opt in _COMPARED_OPTIONS
+        if index_doc.get(opt) is not None and index_doc.get(opt) is not False
+    }
+
+
+def diff_collection(collection, wanted: List[IndexModel]) -> Dict[str, list]:
+    """
+    Compare the manifest for one collection with its existing indexes.
+
+    Returns:
+        {'missing': [IndexModel], 'ttl_changes': [(name, seconds)],
+         'conflicts': [(wanted_doc, existing_doc)], 'present': [name]}
+    """
+    existing = {}
+    for index in collection.list_indexes():
+        existing[_key_pattern(index)] = index
+
+    result = {'missing': [], 'ttl_changes': [], 'conflicts': [], 'present': []}
+    for model in wanted:
+        doc = model.document
+        current = existing.get(_key_pattern(doc))
+        if current is None:
+            result['missing'].append(model)
+            continue
+        want_opts, have_opts = _options(doc), _options(current)
+        if want_opts == have_opts:
+            result['present'].append(current['name'])
+            continue
+        # A TTL change alone can be applied in place with collMod
+        want_other = {k: v for k, v in want_opts.items() if k != 'expireAfterSeconds'}
+        have_other = {k: v for k, v in have_opts.items() if k != 'expireAfterSeconds'}
+        if want_other == have_other and 'expireAfterSeconds' in want_opts and 'expireAfterSeconds' in have_opts:
+            result['ttl_changes'].append((current['name'], want_opts['expireAfterSeconds']))
+        else:
+            result['conflicts'].append((doc, current))
+    return result
+
+
+def reconcile_indexes(db, apply: bool = True, collections: List[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Bring the database's indexes in line with INDEX_MANIFEST.
+
+    Only creates missing indexes and adjusts TTLs; conflicting indexes (same
+    keys, different unique/sparse/partial options) are reported, never dropped.
+
+    Args:
+        db: pymongo Database
+        apply: False for a dry run (report only)
+        collections: restrict to these collection names
+
+    Returns:
+        Per-collection report: missing indexes and pending TTL changes (what
+        differs), created/ttl_updated (what was applied), present, conflicts
+    """
+    report = {}
+    for name, wanted in INDEX_MANIFEST.items():
+        if collections and name not in collections:
+            continue
+        collection = db[name]
+        diff = diff_collection(collection, wanted)
+        entry = {
+            'present': diff['present'],
+            'missing': [m.document['name'] for m in diff['missing']],
+            'ttl_changes': [
+                {'name': index_name, 'expireAfterSeconds': seconds}
+                for index_name, seconds in diff['ttl_changes']
+            ],
+            'created': [],
+            'ttl_updated': [],
+            'conflicts': [
+                {'wanted': dict(w, key=dict(w['key'])), 'existing': c['name']}
+                for w, c in diff['conflicts']
+            ],
+            'errors': [],
+        }
+        for model in diff['missing'] if apply else []:
+            try:
+                entry['created'].extend(collection.create_indexes([model]))
+            except Exception as e:
+                logger.error(f"Failed to create index {model.document['name']} on {name}: {e}")
+                entry['errors'].append(f"{model.document['name']}: {e}")
+        for index_name, seconds in diff['ttl_changes'] if apply else []:
+            try:
+                db.command('collMod', name, index={'name': index_name, 'expireAfterSeconds': seconds})
+                entry['ttl_updated'].append(index_name)
+            except Exception as e:
+                logger.error(f"Failed to update TTL of {index_name} on {name}: {e}")
+                entry['errors'].append(f"{index_name}: {e}")
+        for conflict in entry['conflicts']:
+            logger.warning(f"Index conflict on {name}: {conflict}")
+        report[name] = entry
+    return report
@@ -0,0 +1,85 @@
+"""
+Aho-Corasick keyword matcher
+
+Finds every occurrence of a fixed keyword set in one pass over the text,
+whatever the number of keywords. By default matches are whole words only:
+the characters on either side of a match must not be letters or digits, so
+"meta" matches "Meta Platforms" but not "Metamorphic Labs". With
+whole_words=False a keyword may also sit inside a word ("walmart" in
+"walmartlabs"), for text without word boundaries such as domain names.
+
+    matcher = KeywordMatcher(["google", "jane street", "p&g"])
+    matcher.find_all("senior swe at google")   # [(14, "google")]
+    matcher.longest("jane street capital")      # "jane street"
+"""
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+
+
+class KeywordMatcher:
+    """Automaton over lowercase keywords, built once"""
+    __slots__ = ('_goto', '_fail', '_out', 'keywords', 'whole_words')
+
+    def __init__(self, keywords: Iterable[str], whole_words: bool = True):
+        self.whole_words = whole_words
+        self.keywords = sorted({k.strip().lower() for k in keywords if k and k.strip()})
+        self._goto = [{}]   # state -> {char: state}
+        self._out = [()]    # state -> keywords ending here
+        for keyword in self.keywords:
+            state = 0
+            for ch in keyword:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._out.append(())
+                state = nxt
+            self._out[state] = self._out[state] + (keyword,)
+
+        # Failure links (BFS); outputs of the fallback state are merged in
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text: str) -> List[Tuple[int, str]]:
+        """(start index, keyword) for every match in text"""
+        if not text:
+            return []
+        text = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        whole_words = self.whole_words
+        matches = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                end = i + 1
+                if whole_words and end < len(text) and text[end].isalnum():
+                    continue
+                for keyword in out[state]:
+                    start = end - len(keyword)
+                    if not whole_words or start == 0 or not text[start - 1].isalnum():
+                        matches.append((start, keyword))
+        return matches
+
+    def longest(self, text: str) -> Optional[str]:
+        """Most specific (longest, then leftmost) keyword in text"""
+        best = None
+        for start, keyword in self.find_all(text):
+            if best is None or len(keyword) > len(best[1]) or (
+                    len(keyword) == len(best[1]) and start < best[0]):
+                best = (start, keyword)
+        return best[1] if best else None
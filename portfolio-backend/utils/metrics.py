@@ -0,0 +1,88 @@
+"""
+In-process metric primitives.
+
+Small, dependency-free counters and histograms used by the monitoring hooks
+(MongoDB pool/command listeners, request middleware). Values live in the
+worker process only; exporters read them through snapshot().
+"""
+import threading
+from bisect import bisect_left
+from typing import Dict, Any, Iterable, Optional
+
+# Latency buckets in milliseconds (upper bounds, +Inf is implicit)
+DEFAULT_LATENCY_BUCKETS_MS = (
+    0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+)
+
+
+class Counter:
+    """Monotonic counter"""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Gauge:
+    """Value that can go up and down (pool size, in-flight requests)"""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float):
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative counts are computed on snapshot)"""
+
+    def __init__(self, buckets: Optional[Iterable[float]] = None):
+        self.buckets = tuple(sorted(buckets or DEFAULT_LATENCY_BUCKETS_MS))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative, running = {}, 0
+        for bound, n in zip(self.buckets, counts):
+            running += n
+            cumulative[str(bound)] = running
+        cumulative['+Inf'] = count
+        return {
+            'count': count,
+            'sum': round(total, 3),
+            'avg': round(total / count, 3) if count else 0.0,
+            'buckets': cumulative,
+        }
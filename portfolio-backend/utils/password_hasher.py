@@ -0,0 +1,207 @@
+"""
+bcrypt hashing off the request threads
+
+bcrypt is deliberately slow (~250 ms per hash or check at the target cost), so
+running it on gunicorn request threads lets a burst of logins take every core
+the worker has. PasswordHasher sends the work to a small process pool instead:
+
+- at most `workers` hashes run at once, `queue_limit` more may wait; anything
+  beyond that raises PasswordHasherBusy straight away (the auth routes answer
+  503 + Retry-After) instead of queueing unbounded CPU work
+- the cost factor is calibrated once per process to the hardware:
+  the highest rounds whose hash time stays within BCRYPT_TARGET_MS, never
+  below MIN_ROUNDS (BCRYPT_ROUNDS pins it and skips calibration)
+- calibration and the pool start happen when the hasher is built; warm() does
+  that at worker start (gunicorn post_worker_init, the Lambda warmup stage
+  password_hasher), otherwise the first login or registration pays for it
+- needs_rehash() tells the login route when a stored hash is weaker than the
+  current cost, so it can be upgraded while the plaintext is at hand
+
+On Lambda (one request per container, no /dev/shm for multiprocessing) and
+with PASSWORD_HASH_WORKERS=0, hashing runs inline on the calling thread.
+"""
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Never hash below the cost the app used before calibration existed
+MIN_ROUNDS = 12
+MAX_ROUNDS = 15
+DEFAULT_TARGET_MS = 250
+# Rounds used to time the hardware (each extra round doubles the cost);
+# cheaper than MIN_ROUNDS so calibration adds little to start-up
+_CALIBRATION_ROUNDS = 10
+
+
+class PasswordHasherBusy(Exception):
+    """All hashing slots (running + queued) are taken; retry later"""
+
+
+def _hash(password: bytes, rounds: int) -> bytes:
+    import bcrypt  # native extension, only needed on auth routes
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def _verify(password: bytes, password_hash: bytes) -> bool:
+    import bcrypt
+    return bcrypt.checkpw(password, password_hash)
+
+
+def hash_rounds(password_hash: str) -> Optional[int]:
+    """Cost factor of a $2b$12$... hash (None if unparseable)"""
+    parts = (password_hash or '').split('$')
+    try:
+        return int(parts[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def calibrate_rounds(target_ms: float = DEFAULT_TARGET_MS) -> int:
+    """Highest cost whose hash time stays within target_ms on this machine"""
+    started = time.perf_counter()
+    _hash(b'calibration', _CALIBRATION_ROUNDS)
+    base_ms = max((time.perf_counter() - started) * 1000, 0.1)
+    rounds = _CALIBRATION_ROUNDS + int(math.floor(math.log2(max(target_ms / base_ms, 1))))
+    rounds = max(MIN_ROUNDS, min(MAX_ROUNDS, rounds))
+    logger.info(
+        f"bcrypt calibrated: {base_ms:.1f} ms at {_CALIBRATION_ROUNDS} rounds, "
+        f"using {rounds} rounds (~{base_ms * 2 ** (rounds - _CALIBRATION_ROUNDS):.0f} ms, target {target_ms} ms)"
+    )
+    return rounds
+
+
+def _default_workers() -> int:
+    if os.getenv('AWS_LAMBDA_FUNCTION_NAME'):
+        return 0
+    value = os.getenv('PASSWORD_HASH_WORKERS', '')
+    if value.strip():
+        return max(0, int(value))
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+class PasswordHasher:
+    """bcrypt hash/verify on a bounded process pool (see module docstring)"""
+
+    def __init__(self, workers: int = None, queue_limit: int = None,
+                 rounds: int = None, target_ms: float = None, timeout: float = None):
+        self.workers = _default_workers() if workers is None else workers
+        self.queue_limit = (
+            int(os.getenv('PASSWORD_HASH_QUEUE_LIMIT', '8')) if queue_limit is None else queue_limit
+        )
+        self.timeout = (
+            float(os.getenv('PASSWORD_HASH_TIMEOUT_SECONDS', '10')) if timeout is None else timeout
+        )
+        self._slots = threading.BoundedSemaphore(max(1, self.workers) + self.queue_limit)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+        pinned = rounds or os.getenv('BCRYPT_ROUNDS', '').strip()
+        if pinned:
+            self.rounds = max(MIN_ROUNDS, int(pinned))
+        else:
+            self.rounds = calibrate_rounds(
+                target_ms or float(os.getenv('BCRYPT_TARGET_MS', DEFAULT_TARGET_MS))
+            )
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    # spawn: forking a process that runs the DB client and
+                    # event loop threads is not safe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                    logger.info(f"Password hasher pool started ({self.workers} workers)")
+        return self._executor
+
+    def warm(self):
+        """Start a pool worker now instead of on the first hash"""
+        executor = self._get_executor()
+        if executor is not None:
+            executor.submit(int).result(timeout=self.timeout)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        release = True
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                return fn(*args)
+            try:
+                future = executor.submit(fn, *args)
+                try:
+                    return future.result(timeout=self.timeout)
+                except FutureTimeoutError:
+                    # A task that already started keeps its slot until it
+                    # finishes, so the pool never holds more than the slots allow
+                    if not future.cancel():
+                        release = False
+                        future.add_done_callback(lambda _: self._slots.release())
+                    raise PasswordHasherBusy()
+            except BrokenProcessPool:
+                logger.error("Password hasher pool broken, restarting it")
+                with self._executor_lock:
+                    self._executor = None
+                return fn(*args)
+        finally:
+            if release:
+                self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password.encode('utf-8'), self.rounds).decode('utf-8')
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        try:
+            return self._run(_verify, password.encode('utf-8'), password_hash.encode('utf-8'))
+        except PasswordHasherBusy:
+            raise
+        except Exception:
+            return False
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True when the stored hash uses fewer rounds than the current cost"""
+        current = hash_rounds(password_hash)
+        return current is not None and current < self.rounds
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_password_hasher = None
+_password_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _password_hasher
+    if _password_hasher is None:
+        with _password_hasher_lock:
+            if _password_hasher is None:
+                _password_hasher = PasswordHasher()
+    return _password_hasher
+
+
+def _reset_after_fork():
+    """Pool processes belong to the parent; a forked child builds its own"""
+    global _password_hasher, _password_hasher_lock
+    _password_hasher = None
+    _password_hasher_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,306 @@
+"""
+On-demand per-request CPU profiling
+
+Off unless asked for. A request is profiled when it carries a valid signed
+X-Profile-Token header (minted by POST /api/metrics/profiles/token for a
+limited time), or when it is picked by PROFILE_SAMPLE_RATE, optionally
+restricted to PROFILE_SAMPLE_ROUTES.
+
+Profiling is by sampling: one background thread wakes every
+PROFILE_INTERVAL_MS while any profiled request is in flight, reads the
+stacks of the profiled request threads with sys._current_frames() and
+counts them. The request itself runs unmodified (no sys.setprofile
+hooks), so the overhead lands on the sampler thread and the numbers stay
+close to an unprofiled request. Async views do their work on the shared
+event loop (utils/async_runtime.py), so their profiles also sample the
+loop thread; that thread serves every in-flight async request, so its
+stacks may include other requests' work.
+
+Finished profiles (collapsed stacks, "frame;frame;frame count") are kept in
+a bounded per-process ring buffer. GET /api/metrics/profiles lists them and
+GET /api/metrics/profiles/collapsed downloads them in the format
+flamegraph.pl, speedscope and inferno read.
+"""
+import hashlib
+import hmac
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile-Token'
+# Fraction of requests profiled without a token (0 = only signed requests)
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+# Routes the sampled fraction applies to, e.g. "GET /api/info/org-stats" (empty = all)
+PROFILE_SAMPLE_ROUTES = {
+    route.strip() for route in os.getenv('PROFILE_SAMPLE_ROUTES', '').split(',') if route.strip()
+}
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+# Profiles kept per worker process
+PROFILE_BUFFER_SIZE = int(os.getenv('PROFILE_BUFFER_SIZE', '50'))
+# Distinct stacks kept per profile; further ones are counted under one frame
+PROFILE_MAX_STACKS = int(os.getenv('PROFILE_MAX_STACKS', '2000'))
+PROFILE_MAX_DEPTH = 128
+# Longest validity a profile token can be minted with
+PROFILE_TOKEN_MAX_TTL_SECONDS = 3600
+
+TRUNCATED_STACK = '[truncated]'
+
+
+def _signing_key() -> bytes:
+    """PROFILE_SIGNING_KEY, else a key derived from the JWT secret"""
+    key = os.getenv('PROFILE_SIGNING_KEY')
+    if key:
+        return key.encode()
+    from utils.config import AppConfig
+    return hmac.new(AppConfig.JWT_SECRET_KEY.encode(), b'request-profiling', hashlib.sha256).digest()
+
+
+def _signature(expires: int) -> str:
+    return hmac.new(_signing_key(), f"profile:{expires}".encode(), hashlib.sha256).hexdigest()
+
+
+def sign_profile_token(ttl_seconds: int) -> Dict[str, Any]:
+    """Header value that turns on profiling until it expires"""
+    ttl_seconds = max(1, min(int(ttl_seconds), PROFILE_TOKEN_MAX_TTL_SECONDS))
+    expires = int(time.time()) + ttl_seconds
+    return {'header': PROFILE_HEADER, 'value': f"{expires}.{_signature(expires)}", 'expires_at': expires}
+
+
+def verify_profile_token(value: Optional[str]) -> bool:
+    if not value:
+        return False
+    expires, _, signature = value.partition('.')
+    try:
+        expires = int(expires)
+    except ValueError:
+        return False
+    now = time.time()
+    if not now < expires <= now + PROFILE_TOKEN_MAX_TTL_SECONDS:
+        return False
+    try:
+        return hmac.compare_digest(signature, _signature(expires))
+    except Exception as e:
+        logger.error(f"Profile token check failed: {e}")
+        return False
+
+
+def should_profile(route: str, token: Optional[str]) -> Optional[str]:
+    """Why this request is profiled ('token' or 'sampled'), or None"""
+    if token is not None:
+        if verify_profile_token(token):
+            return 'token'
+        logger.warning(f"Invalid or expired {PROFILE_HEADER} on {route}")
+    if PROFILE_SAMPLE_RATE and (not PROFILE_SAMPLE_ROUTES or route in PROFILE_SAMPLE_ROUTES):
+        if random.random() < PROFILE_SAMPLE_RATE:
+            return 'sampled'
+    return None
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get('__name__') or os.path.basename(code.co_filename)
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def collapse_stack(frame) -> str:
+    """Outermost-first frame names joined by ';' (collapsed stack format)"""
+    names = []
+    while frame is not None and len(names) < PROFILE_MAX_DEPTH:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    names.reverse()
+    return ';'.join(names)
+
+
+class Profile:
+    """Stack samples of one request"""
+
+    def __init__(self, route: str, trigger: str, threads: Dict[int, str]):
+        self.id = uuid.uuid4().hex[:16]
+        self.route = route
+        self.trigger = trigger
+        # thread id -> label prefixed to its stacks ('request', 'event-loop')
+        self.threads = threads
+        self.started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc)
+        self.stacks: Dict[str, int] = {}
+        self.samples = 0
+        self.status = None
+        self.duration_ms = None
+
+    def add(self, stack: str):
+        count = self.stacks.get(stack)
+        if count is None and len(self.stacks) >= PROFILE_MAX_STACKS:
+            stack, count = TRUNCATED_STACK, self.stacks.get(TRUNCATED_STACK)
+        self.stacks[stack] = (count or 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'route': self.route,
+            'trigger': self.trigger,
+            'status': self.status,
+            'started_at': self.started_at.isoformat(timespec='milliseconds'),
+            'duration_ms': self.duration_ms,
+            'samples': self.samples,
+            'interval_ms': PROFILE_INTERVAL_MS,
+            'stacks': len(self.stacks),
+        }
+
+    def collapsed(self) -> List[str]:
+        """Collapsed stack lines, rooted at the route so profiles can be merged"""
+        return [f"{self.route};{stack} {count}" for stack, count in self.stacks.items()]
+
+
+class _Sampler:
+    """Background thread sampling the stacks of every active profile"""
+
+    def __init__(self):
+        self._active: Dict[str, Profile] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def start(self, profile: Profile):
+        with self._lock:
+            self._active[profile.id] = profile
+            if self._thread is None or self._pid != os.getpid():
+                self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+        self._wake.set()
+
+    def stop(self, profile: Profile):
+        with self._lock:
+            self._active.pop(profile.id, None)
+
+    def _run(self):
+        interval = PROFILE_INTERVAL_MS / 1000
+        while True:
+            # Sampled under the lock, so a profile is never written after stop()
+            with self._lock:
+                if self._active:
+                    frames = sys._current_frames()
+                    for profile in self._active.values():
+                        for thread_id, label in profile.threads.items():
+                            frame = frames.get(thread_id)
+                            if frame is not None:
+                                profile.add(f"{label};{collapse_stack(frame)}")
+                        profile.samples += 1
+                    del frames
+                else:
+                    self._wake.clear()
+            if not self._wake.is_set():
+                self._wake.wait()
+            else:
+                time.sleep(interval)
+
+
+_sampler = _Sampler()
+_buffer: deque = deque(maxlen=PROFILE_BUFFER_SIZE)
+_buffer_lock = threading.Lock()
+
+
+def start_profile(route: str, trigger: str, include_loop: bool = False) -> Profile:
+    """Start sampling the calling thread (and the shared event loop thread)"""
+    from utils.async_runtime import get_loop, loop_thread_id
+
+    threads = {threading.get_ident(): 'request'}
+    if include_loop:
+        # The loop starts with the first async view; this may be it
+        get_loop()
+        threads[loop_thread_id()] = 'event-loop'
+    profile = Profile(route, trigger, threads)
+    _sampler.start(profile)
+    return profile
+
+
+def finish_profile(profile: Profile, status: int) -> Profile:
+    """Stop sampling and keep the profile in the buffer"""
+    _sampler.stop(profile)
+    profile.status = status
+    profile.duration_ms = round((time.perf_counter() - profile.started) * 1000, 3)
+    with _buffer_lock:
+        _buffer.append(profile)
+    logger.info(
+        f"Profiled {profile.route} ({profile.trigger}): {profile.duration_ms} ms, "
+        f"{profile.samples} samples, id={profile.id}"
+    )
+    return profile
+
+
+def _buffered(route: str = None, profile_id: str = None) -> List[Profile]:
+    with _buffer_lock:
+        profiles = list(_buffer)
+    profiles.reverse()
+    if profile_id:
+        profiles = [p for p in profiles if p.id == profile_id]
+    if route:
+        profiles = [p for p in profiles if route in p.route]
+    return profiles
+
+
+def get_profiles() -> Dict[str, Any]:
+    """Summaries of the buffered profiles, newest first"""
+    return {
+        'sample_rate': PROFILE_SAMPLE_RATE,
+        'sample_routes': sorted(PROFILE_SAMPLE_ROUTES),
+        'capacity': PROFILE_BUFFER_SIZE,
+        'profiles': [p.summary() for p in _buffered()],
+    }
+
+
+def collapsed_stacks(route: str = None, profile_id: str = None) -> Optional[str]:
+    """
+    Buffered profiles as collapsed stacks, identical stacks summed
+    (None if no profile matches)
+    """
+    profiles = _buffered(route, profile_id)
+    if not profiles:
+        return None
+    merged: Dict[str, int] = {}
+    for profile in profiles:
+        for line in profile.collapsed():
+            stack, _, count = line.rpartition(' ')
+            merged[stack] = merged.get(stack, 0) + int(count)
+    return ''.join(f"{stack} {count}\n" for stack, count in sorted(merged.items()))
+
+
+def init_profiling(app):
+    """Register request hooks that profile signed or sampled Flask requests"""
+    import inspect
+    from flask import g, request
+
+    @app.before_request
+    def _start_profile():
+        rule = request.url_rule.rule if request.url_rule else '<unmatched>'
+        route = f"{request.method} {rule}"
+        trigger = should_profile(route, request.headers.get(PROFILE_HEADER))
+        if trigger is None:
+            return
+        view = app.view_functions.get(request.endpoint)
+        g._profile = start_profile(route, trigger, include_loop=inspect.iscoroutinefunction(view))
+
+    @app.after_request
+    def _profile_status(response):
+        if '_profile' in g:
+            g._profile_status = response.status_code
+            if g._profile.trigger == 'token':
+                response.headers['X-Profile-Id'] = g._profile.id
+        return response
+
+    @app.teardown_request
+    def _finish_profile(exc):
+        profile = g.pop('_profile', None)
+        if profile is not None:
+            finish_profile(profile, g.pop('_profile_status', 500 if exc is not None else 200))
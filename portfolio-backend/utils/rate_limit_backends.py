@@ -0,0 +1,308 @@
+"""
+Shared rate-limit backends
+
+The default RateLimiter (utils/security.py) counts per process, so N gunicorn
+workers or Lambda containers allow N times the configured rate. With
+RATE_LIMIT_BACKEND set, get_rate_limiter() returns a SharedRateLimiter over
+one of these stores instead:
+
+    mmap    a fixed-size counter table in a memory-mapped file, shared by all
+            workers on the host (RATE_LIMIT_MMAP_PATH, default /dev/shm)
+    mongo   one document per key and fixed window in rate_limit_buckets,
+            incremented atomically and removed by a TTL index - for limits
+            shared across hosts and Lambda containers
+
+Both keep the sliding-window-counter algorithm of the in-memory limiter: a
+key's rate is previous_window * (unexpired share) + current_window.
+
+SharedRateLimiter pre-aggregates hits locally and only talks to the store
+when a key's pending hits reach RATE_LIMIT_BATCH_SIZE, its view is older than
+RATE_LIMIT_SYNC_SECONDS, a new window starts, or the estimate gets within
+RATE_LIMIT_SYNC_FRACTION of the limit. Far from the limit most checks are a
+dict lookup; near it every check syncs, so overshoot stays small. If the
+store fails the limiter falls back to its local counts (fails open).
+"""
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_COLLECTION = 'rate_limit_buckets'
+
+
+class RateLimitBackend:
+    """Counter store shared between processes"""
+
+    def add(self, key: str, window_index: int, window_seconds: int, count: int,
+            need_previous: bool) -> Tuple[Optional[int], int]:
+        """
+        Add count hits to key's window and return the shared totals.
+
+        Returns:
+            (previous window total or None if not requested, current window total)
+        """
+        raise NotImplementedError
+
+
+class MmapBackend(RateLimitBackend):
+    """
+    Counter table in a shared memory-mapped file.
+
+    Fixed-size open-addressing table of `slots` entries (key hash, window
+    start, window length, current, previous; 32 bytes each). A key that finds
+    no free or expired slot within PROBES takes over the probed slot that
+    expires first, so the table never grows. Updates are serialised with
+    flock on the file.
+    """
+    ENTRY = struct.Struct('<QqIII4x')
+    PROBES = 8
+
+    def __init__(self, path: str = None, slots: int = None):
+        self.path = path or os.getenv('RATE_LIMIT_MMAP_PATH') or os.path.join(
+            '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+            'portfolio-rate-limit'
+        )
+        self.slots = slots or int(os.getenv('RATE_LIMIT_MMAP_SLOTS', '65536'))
+        self._lock = threading.Lock()
+        self._pid = None
+        self._open()
+
+    def _open(self):
+        size = self.slots * self.ENTRY.size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        self._fd = fd
+        self._map = mmap.mmap(fd, size, mmap.MAP_SHARED)
+        self._pid = os.getpid()
+
+    def _ensure_own_fd(self):
+        # flock is per open file description: a forked child must reopen
+        # the file or its locks would not exclude the parent's
+        if self._pid != os.getpid():
+            self._lock = threading.Lock()
+            self._open()
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        value = int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+        return value or 1  # 0 marks an empty slot
+
+    def add(self, key, window_index, window_seconds, count, need_previous):
+        self._ensure_own_fd()
+        key_hash = self._hash(key)
+        first = key_hash % self.slots
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                window_start = window_index * window_seconds
+                entries = []
+                for probe in range(self.PROBES):
+                    offset = ((first + probe) % self.slots) * self.ENTRY.size
+                    entries.append((offset,) + self.ENTRY.unpack_from(self._map, offset))
+                # The key's own slot may sit past a free or expired one (its
+                # earlier probe expired since), so look for it on every probe first
+                target = next(
+                    ((offset, start, current, previous)
+                     for offset, entry_hash, start, _, current, previous in entries
+                     if entry_hash == key_hash),
+                    None
+                )
+                if target is None:
+                    oldest, oldest_expiry = None, None
+                    for offset, entry_hash, start, window, _, _ in entries:
+                        # A slot's counts matter until its current window has
+                        # also served as someone's previous window
+                        expiry = start + 2 * window
+                        if entry_hash == 0 or expiry <= window_start:
+                            oldest = offset
+                            break
+                        if oldest is None or expiry < oldest_expiry:
+                            oldest, oldest_expiry = offset, expiry
+                    target = (oldest, window_start, 0, 0)
+
+                offset, start, current, previous = target
+                if start != window_start:
+                    previous = current if start == window_start - window_seconds else 0
+                    current = 0
+                current = min(current + count, 0xFFFFFFFF)
+                self.ENTRY.pack_into(
+                    self._map, offset, key_hash, window_start, window_seconds, current, previous
+                )
+                return previous, current
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+class MongoBackend(RateLimitBackend):
+    """
+    Atomic per-window buckets in MongoDB.
+
+    Bucket _id is "<key>|<window index>"; $inc with upsert makes concurrent
+    flushes from any number of nodes safe. expires_at (end of the following
+    window) drives the TTL index declared in utils/indexes.py.
+    """
+
+    def __init__(self, collection=None):
+        if collection is None:
+            from utils.db_connect import DBConnect
+            collection = DBConnect().get_collection(RATE_LIMIT_COLLECTION)
+        self.collection = collection
+
+    def add(self, key, window_index, window_seconds, count, need_previous):
+        from pymongo import ReturnDocument
+
+        expires_at = datetime.fromtimestamp((window_index + 2) * window_seconds, tz=timezone.utc)
+        bucket = self.collection.find_one_and_update(
+            {'_id': f"{key}|{window_index}"},
+            {'$inc': {'count': count}, '$setOnInsert': {'expires_at': expires_at}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+            projection={'count': 1}
+        )
+        previous = None
+        if need_previous:
+            # The previous window is closed, so it is read once per window
+            doc = self.collection.find_one({'_id': f"{key}|{window_index - 1}"}, {'count': 1})
+            previous = doc['count'] if doc else 0
+        return previous, bucket['count']
+
+
+class _SharedView:
+    """
+    A key's last-synced shared totals plus hits not yet flushed.
+
+    Fields are updated under `lock`; store round trips are made without it,
+    on pending hits taken out of the view first.
+    """
+    __slots__ = ('start', 'previous', 'current', 'pending', 'synced_at', 'lock')
+
+    def __init__(self, start: int):
+        self.start = start
+        self.previous = None
+        self.current = 0
+        self.pending = 0
+        self.synced_at = 0.0
+        self.lock = threading.Lock()
+
+
+class SharedRateLimiter:
+    """
+    Sliding-window-counter limiter over a shared RateLimitBackend with local
+    pre-aggregation (see module docstring). Same interface as RateLimiter.
+    """
+
+    def __init__(self, backend: RateLimitBackend, max_keys: int = None,
+                 batch_size: int = None, sync_seconds: float = None, sync_fraction: float = None):
+        self.backend = backend
+        self.max_keys = max_keys or int(os.getenv('RATE_LIMIT_MAX_KEYS', '50000'))
+        self.batch_size = batch_size or int(os.getenv('RATE_LIMIT_BATCH_SIZE', '10'))
+        self.sync_seconds = sync_seconds or float(os.getenv('RATE_LIMIT_SYNC_SECONDS', '1'))
+        self.sync_fraction = sync_fraction or float(os.getenv('RATE_LIMIT_SYNC_FRACTION', '0.8'))
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sync(self, key: str, view: _SharedView, window_seconds: int, now: float):
+        with view.lock:
+            start, count, need_previous = view.start, view.pending, view.previous is None
+            view.pending = 0
+        try:
+            previous, current = self.backend.add(key, start, window_seconds, count, need_previous)
+        except Exception as e:
+            # Fail open on local counts; retry after the sync interval
+            logger.warning(f"Rate limit backend unavailable, using local counts: {e}")
+            with view.lock:
+                if view.start == start:
+                    view.pending += count
+                view.synced_at = now
+            return
+        with view.lock:
+            if view.start != start:
+                return  # a new window started meanwhile
+            if previous is not None:
+                view.previous = previous
+            # Totals only grow within a window; a concurrent sync that
+            # finished first may already have reported a higher one
+            view.current = max(view.current, current)
+            view.synced_at = now
+
+    def _flush_window(self, key: str, start: int, window_seconds: int, count: int):
+        """Add hits still pending for a finished window"""
+        try:
+            self.backend.add(key, start, window_seconds, count, False)
+        except Exception as e:
+            logger.warning(f"Rate limit backend unavailable, dropping {count} hits: {e}")
+
+    def is_rate_limited(self, key: str, max_requests: int = 100, window_seconds: int = 60) -> bool:
+        """
+        Check if a key is rate limited across all workers/nodes sharing the backend.
+        Returns True if rate limit exceeded (the request is not counted).
+        """
+        now = time.time()
+        index = int(now // window_seconds)
+        with self._lock:
+            view = self._views.get(key)
+            if view is None:
+                view = _SharedView(index)
+                self._views[key] = view
+                if len(self._views) > self.max_keys:
+                    self._views.popitem(last=False)
+            else:
+                self._views.move_to_end(key)
+
+        # Store round trips happen outside the LRU lock; a key's view is only
+        # approximate anyway, so concurrent checks on one key may both sync
+        stale = None
+        if view.start != index:
+            with view.lock:
+                if view.start != index:
+                    stale = (view.start, view.pending)
+                    view.start, view.previous, view.current, view.pending = index, None, 0, 0
+        if stale and stale[1]:
+            self._flush_window(key, stale[0], window_seconds, stale[1])
+        if view.previous is None:
+            self._sync(key, view, window_seconds, now)
+
+        elapsed = (now - index * window_seconds) / window_seconds
+        estimate = (view.previous or 0) * (1 - elapsed) + view.current + view.pending
+        if estimate >= max_requests and now - view.synced_at >= self.sync_seconds:
+            # Re-check a stale view before rejecting; a fresh one is trusted so
+            # a client hammering past its limit costs no round trips
+            self._sync(key, view, window_seconds, now)
+            estimate = (view.previous or 0) * (1 - elapsed) + view.current + view.pending
+        if estimate >= max_requests:
+            return True
+
+        with view.lock:
+            view.pending += 1
+            pending = view.pending
+        if (pending >= self.batch_size
+                or now - view.synced_at >= self.sync_seconds
+                or estimate + 1 >= max_requests * self.sync_fraction):
+            self._sync(key, view, window_seconds, now)
+        return False
+
+    def cleanup(self):
+        """Kept for interface compatibility; the LRU bounds memory"""
+
+    def __len__(self):
+        return len(self._views)
+
+
+def create_shared_rate_limiter(backend: str) -> SharedRateLimiter:
+    """SharedRateLimiter for RATE_LIMIT_BACKEND ('mmap' or 'mongo')"""
+    if backend == 'mmap':
+        return SharedRateLimiter(MmapBackend())
+    if backend == 'mongo':
+        return SharedRateLimiter(MongoBackend())
+    raise ValueError(f"Unknown rate limit backend: {backend}")
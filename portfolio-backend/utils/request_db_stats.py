@@ -0,0 +1,200 @@
+"""
+Per-request MongoDB command metrics
+
+The CommandListener in utils/db_monitoring.py reports every finished command
+(name, collection, duration, docs returned) through record_command(). Commands
+are attributed to the Flask request that issued them via a contextvar set in
+before_request, aggregated per route ("POST /api/info/"), and the request's
+total DB time is returned in a Server-Timing header.
+
+get_command_metrics() shows how many commands each route runs per request;
+N+1 patterns show up as a high per_request count for one command/collection
+pair. This module has no pymongo import, so app start-up does not load the
+driver just to install the hooks.
+"""
+import logging
+import os
+from contextvars import ContextVar
+from typing import Dict, Any, Optional
+from utils.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Emit "Server-Timing: db;dur=..;desc=.." on responses
+SERVER_TIMING_ENABLED = os.getenv('DB_SERVER_TIMING', 'true').lower() == 'true'
+# Log a warning when one request issues more commands than this (0 disables)
+COMMANDS_WARN_THRESHOLD = int(os.getenv('DB_COMMANDS_WARN_THRESHOLD', '25'))
+
+# Commands-per-request buckets (upper bounds)
+COMMAND_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+# Route used for commands issued outside a request (jobs, warmup, startup)
+BACKGROUND_ROUTE = '<background>'
+
+
+class CommandStats:
+    """Calls, duration and documents returned for one command/collection pair"""
+
+    def __init__(self):
+        self.duration_ms = Histogram()
+        self.docs_returned = Counter()
+        self.failures = Counter()
+
+    def snapshot(self, requests: int = 0) -> Dict[str, Any]:
+        duration = self.duration_ms.snapshot()
+        return {
+            'calls': duration['count'],
+            'per_request': round(duration['count'] / requests, 2) if requests else None,
+            'failures': self.failures.value,
+            'docs_returned': self.docs_returned.value,
+            'duration_ms': duration,
+        }
+
+
+class RouteDBMetrics:
+    """Aggregated database usage of one route ("POST /api/info/")"""
+
+    def __init__(self):
+        self.requests = Counter()
+        self.db_time_ms = Histogram()
+        self.commands_per_request = Histogram(COMMAND_COUNT_BUCKETS)
+        self.commands: Dict[str, CommandStats] = {}
+
+    def command(self, key: str) -> CommandStats:
+        stats = self.commands.get(key)
+        if stats is None:
+            stats = self.commands.setdefault(key, CommandStats())
+        return stats
+
+    def snapshot(self) -> Dict[str, Any]:
+        requests = self.requests.value
+        return {
+            'requests': requests,
+            'db_time_ms': self.db_time_ms.snapshot(),
+            'commands_per_request': self.commands_per_request.snapshot(),
+            'commands': {
+                key: stats.snapshot(requests) for key, stats in sorted(self.commands.items())
+            },
+        }
+
+
+_route_metrics: Dict[str, RouteDBMetrics] = {}
+
+
+def _route_metrics_for(route: str) -> RouteDBMetrics:
+    metrics = _route_metrics.get(route)
+    if metrics is None:
+        metrics = _route_metrics.setdefault(route, RouteDBMetrics())
+    return metrics
+
+
+class RequestDBStats:
+    """
+    Commands issued while serving one request.
+
+    Recorded from the request thread, or from the event loop thread while the
+    request thread waits on an async view, so no locking is needed.
+    """
+
+    __slots__ = ('route', 'commands', 'duration_ms', 'docs_returned')
+
+    def __init__(self, route: str):
+        self.route = route
+        self.commands = 0
+        self.duration_ms = 0.0
+        self.docs_returned = 0
+
+
+# Set for the duration of a Flask request. Async views run in a copy of the
+# request's context, so commands issued on the event loop see the same object.
+_current_request: ContextVar[Optional[RequestDBStats]] = ContextVar(
+    'db_request_stats', default=None
+)
+
+
+def begin_request(route: str):
+    """Start attributing commands to a request; returns a token for end_request"""
+    return _current_request.set(RequestDBStats(route))
+
+
+def current_request_stats() -> Optional[RequestDBStats]:
+    return _current_request.get()
+
+
+def end_request(token=None) -> Optional[RequestDBStats]:
+    """Fold the current request's totals into its route and stop attributing"""
+    stats = _current_request.get()
+    try:
+        if token is not None:
+            _current_request.reset(token)
+        else:
+            _current_request.set(None)
+    except ValueError:
+        # Token from another context (e.g. teardown ran elsewhere)
+        _current_request.set(None)
+    if stats is None:
+        return None
+    route = _route_metrics_for(stats.route)
+    route.requests.inc()
+    route.db_time_ms.observe(stats.duration_ms)
+    route.commands_per_request.observe(stats.commands)
+    if COMMANDS_WARN_THRESHOLD and stats.commands > COMMANDS_WARN_THRESHOLD:
+        logger.warning(
+            f"{stats.route} issued {stats.commands} MongoDB commands "
+            f"({stats.duration_ms:.1f} ms) in one request"
+        )
+    return stats
+
+
+def record_command(key: str, duration_ms: float, docs: int, failed: bool,
+                   request_stats: Optional[RequestDBStats]):
+    """Record one finished command against its route (and request, if any)"""
+    route = request_stats.route if request_stats else BACKGROUND_ROUTE
+    stats = _route_metrics_for(route).command(key)
+    stats.duration_ms.observe(duration_ms)
+    if docs:
+        stats.docs_returned.inc(docs)
+    if failed:
+        stats.failures.inc()
+    if request_stats is not None:
+        request_stats.commands += 1
+        request_stats.duration_ms += duration_ms
+        request_stats.docs_returned += docs
+
+
+def server_timing_value(stats: Optional[RequestDBStats]) -> Optional[str]:
+    """Server-Timing header value for a request's DB time (None when disabled)"""
+    if stats is None or not SERVER_TIMING_ENABLED:
+        return None
+    return f'db;dur={stats.duration_ms:.2f};desc="{stats.commands} cmds"'
+
+
+def init_db_instrumentation(app):
+    """
+    Register request hooks that scope command metrics to each Flask request
+    and add a Server-Timing header with the request's database time.
+    """
+    from flask import g, request
+
+    @app.before_request
+    def _begin_db_stats():
+        rule = request.url_rule.rule if request.url_rule else '<unmatched>'
+        g._db_stats_token = begin_request(f"{request.method} {rule}")
+
+    @app.after_request
+    def _server_timing(response):
+        value = server_timing_value(current_request_stats())
+        if value:
+            response.headers.add('Server-Timing', value)
+        return response
+
+    @app.teardown_request
+    def _end_db_stats(exc):
+        token = g.pop('_db_stats_token', None)
+        if token is not None:
+            end_request(token)
+
+
+def get_command_metrics() -> Dict[str, Any]:
+    """Snapshot of per-route command metrics"""
+    return {route: metrics.snapshot() for route, metrics in sorted(_route_metrics.items())}
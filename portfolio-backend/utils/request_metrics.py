@@ -0,0 +1,193 @@
+"""
+Per-route HTTP request metrics
+
+Request count by status, latency histogram and in-flight gauge for every
+(blueprint, route, method). init_request_metrics() installs the Flask hooks;
+the Lambda fast path reports through request_started()/request_finished().
+
+Collectors are sharded per thread: each worker thread only ever writes its
+own shard, so recording takes no lock; render_prometheus() sums the shards
+when /api/metrics is scraped. Counts read mid-update may be one request
+behind, which scraping tolerates anyway.
+
+On Lambda (or with METRICS_EMF=true) each request is also written to stdout
+as a CloudWatch Embedded Metric Format line, because scraping one container's
+memory tells nothing about the fleet.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+from utils.metrics import DEFAULT_LATENCY_BUCKETS_MS
+
+EMF_ENABLED = os.getenv(
+    'METRICS_EMF', 'true' if os.getenv('AWS_LAMBDA_FUNCTION_NAME') else 'false'
+).lower() == 'true'
+EMF_NAMESPACE = os.getenv('METRICS_NAMESPACE', 'PortfolioBackend')
+
+LATENCY_BUCKETS_S = tuple(bound / 1000 for bound in DEFAULT_LATENCY_BUCKETS_MS)
+
+# (blueprint, route, method)
+RouteKey = Tuple[str, str, str]
+
+
+class _Shard:
+    """One thread's metrics; only that thread writes to it"""
+    __slots__ = ('statuses', 'latency', 'in_flight')
+
+    def __init__(self):
+        self.statuses: Dict[Tuple[RouteKey, int], int] = {}
+        # route -> [bucket counts..., +Inf count, sum in seconds]
+        self.latency: Dict[RouteKey, List[float]] = {}
+        self.in_flight: Dict[RouteKey, int] = {}
+
+
+_shards: List[_Shard] = []
+_shards_lock = threading.Lock()
+_local = threading.local()
+
+
+def _shard() -> _Shard:
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _local.shard = _Shard()
+        with _shards_lock:
+            _shards.append(shard)
+    return shard
+
+
+def request_started(key: RouteKey):
+    shard = _shard()
+    shard.in_flight[key] = shard.in_flight.get(key, 0) + 1
+
+
+def request_finished(key: RouteKey, status: int, duration_s: float):
+    shard = _shard()
+    shard.in_flight[key] = shard.in_flight.get(key, 0) - 1
+    shard.statuses[key, status] = shard.statuses.get((key, status), 0) + 1
+    latency = shard.latency.get(key)
+    if latency is None:
+        latency = shard.latency[key] = [0] * (len(LATENCY_BUCKETS_S) + 1) + [0.0]
+    latency[bisect_left(LATENCY_BUCKETS_S, duration_s)] += 1
+    latency[-1] += duration_s
+    if EMF_ENABLED:
+        _emit_emf(key, status, duration_s)
+
+
+def _emit_emf(key: RouteKey, status: int, duration_s: float):
+    blueprint, route, method = key
+    record = {
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': EMF_NAMESPACE,
+                'Dimensions': [['Blueprint', 'Route'], ['Blueprint']],
+                'Metrics': [
+                    {'Name': 'Requests', 'Unit': 'Count'},
+                    {'Name': 'ServerErrors', 'Unit': 'Count'},
+                    {'Name': 'Latency', 'Unit': 'Milliseconds'},
+                ],
+            }],
+        },
+        'Blueprint': blueprint,
+        'Route': f"{method} {route}",
+        'Status': status,
+        'Requests': 1,
+        'ServerErrors': int(status >= 500),
+        'Latency': round(duration_s * 1000, 3),
+    }
+    # Straight to stdout: EMF lines must be bare JSON, without the log format prefix
+    sys.stdout.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+
+def _collect():
+    with _shards_lock:
+        shards = list(_shards)
+    statuses, latency, in_flight = {}, {}, {}
+    for shard in shards:
+        for key, n in list(shard.statuses.items()):
+            statuses[key] = statuses.get(key, 0) + n
+        for key, values in list(shard.latency.items()):
+            total = latency.setdefault(key, [0] * len(values))
+            for i, n in enumerate(list(values)):
+                total[i] += n
+        for key, n in list(shard.in_flight.items()):
+            in_flight[key] = in_flight.get(key, 0) + n
+    return statuses, latency, in_flight
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(key: RouteKey, **extra) -> str:
+    blueprint, route, method = key
+    pairs = [('blueprint', blueprint), ('route', route), ('method', method)] + list(extra.items())
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def render_prometheus() -> str:
+    """All request metrics in the Prometheus text exposition format (0.0.4)"""
+    statuses, latency, in_flight = _collect()
+    lines = [
+        '# HELP http_requests_total Requests served, by route and status.',
+        '# TYPE http_requests_total counter',
+    ]
+    for (key, status), n in sorted(statuses.items()):
+        lines.append(f"http_requests_total{_labels(key, status=status)} {n}")
+
+    lines += [
+        '# HELP http_request_duration_seconds Request latency.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    for key, values in sorted(latency.items()):
+        running = 0
+        for bound, n in zip(LATENCY_BUCKETS_S, values):
+            running += n
+            lines.append(f"http_request_duration_seconds_bucket{_labels(key, le=repr(bound))} {running}")
+        running += values[len(LATENCY_BUCKETS_S)]
+        lines.append(f"http_request_duration_seconds_bucket{_labels(key, le='+Inf')} {running}")
+        lines.append(f"http_request_duration_seconds_sum{_labels(key)} {values[-1]:.6f}")
+        lines.append(f"http_request_duration_seconds_count{_labels(key)} {running}")
+
+    lines += [
+        '# HELP http_requests_in_flight Requests being served.',
+        '# TYPE http_requests_in_flight gauge',
+    ]
+    for key, n in sorted(in_flight.items()):
+        lines.append(f"http_requests_in_flight{_labels(key)} {n}")
+    return '\n'.join(lines) + '\n'
+
+
+def init_request_metrics(app):
+    """Register Flask hooks that record every request's route, status and latency"""
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_metrics():
+        key = (
+            request.blueprint or 'app',
+            request.url_rule.rule if request.url_rule else '<unmatched>',
+            request.method,
+        )
+        g._request_metrics = (key, time.perf_counter())
+        request_started(key)
+
+    @app.after_request
+    def _response_status(response):
+        g._request_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _finish_request_metrics(exc):
+        started = g.pop('_request_metrics', None)
+        if started is None:
+            return
+        key, start = started
+        # No after_request on an unhandled exception: Flask answers 500
+        status = g.pop('_request_status', 500 if exc is not None else 200)
+        request_finished(key, status, time.perf_counter() - start)
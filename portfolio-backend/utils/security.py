@@ -1,11 +1,90 @@
 """Security utilities for input validation and sanitization."""
+import functools
+import os
 import re
 import html
 import logging
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from utils.validation import INJECTION_RE
 
 logger = logging.getLogger(__name__)
 
+# Headers added to every response (Flask after_request hook and the Lambda fast path)
+SECURITY_HEADERS = {
+    'X-Content-Type-Options': 'nosniff',
+    'X-Frame-Options': 'DENY',
+    'X-XSS-Protection': '0',
+    'Referrer-Policy': 'strict-origin-when-cross-origin',
+}
+
+# CORS policy for /api/* (flask-cors options; the Lambda fast path applies the same)
+CORS_OPTIONS = {
+    "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    "allow_headers": ["Content-Type", "Authorization", "X-Profile-Token"],
+    "supports_credentials": True,
+    "max_age": 3600
+}
+
+
+def get_allowed_origins() -> List[str]:
+    """CORS origins from ALLOWED_ORIGINS (comma-separated)"""
+    return os.getenv('ALLOWED_ORIGINS', 'http://localhost:5173,http://localhost:3000').split(',')
+
+
+def security_headers(path: str) -> Dict[str, str]:
+    """Security headers for a response to the given path"""
+    headers = dict(SECURITY_HEADERS)
+    if path.startswith('/api/'):
+        headers['Cache-Control'] = 'no-store'
+    return headers
+
+
+def cors_headers(origin: Optional[str], preflight: bool = False,
+                 request_headers: str = '') -> Dict[str, str]:
+    """
+    CORS response headers matching what flask-cors sends for CORS_OPTIONS.
+    Empty (no Access-Control-* headers) when the origin is not allowed.
+    """
+    if not origin or origin not in get_allowed_origins():
+        return {}
+    headers = {'Access-Control-Allow-Origin': origin, 'Vary': 'Origin'}
+    if CORS_OPTIONS['supports_credentials']:
+        headers['Access-Control-Allow-Credentials'] = 'true'
+    if preflight:
+        allowed = {h.lower() for h in CORS_OPTIONS['allow_headers']}
+        requested = [h.strip() for h in request_headers.split(',') if h.strip()]
+        matched = [h for h in requested if h.lower() in allowed]
+        headers['Access-Control-Allow-Methods'] = ', '.join(sorted(CORS_OPTIONS['methods']))
+        if matched:
+            headers['Access-Control-Allow-Headers'] = ', '.join(matched)
+        headers['Access-Control-Max-Age'] = str(CORS_OPTIONS['max_age'])
+    return headers
+
+# Usernames allowed on the monitoring endpoints (/api/metrics/*); empty = nobody.
+# Anyone can register an account, so a valid JWT alone is not enough there.
+ADMIN_USERNAMES = frozenset(
+    name.strip() for name in os.getenv('ADMIN_USERNAMES', '').split(',') if name.strip()
+)
+
+
+def admin_required(fn):
+    """Like @jwt_required(), but the token's user must be in ADMIN_USERNAMES (else 403)"""
+    from flask import jsonify
+    from flask_jwt_extended import get_jwt_identity, jwt_required
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        username = get_jwt_identity()
+        if username not in ADMIN_USERNAMES:
+            logger.warning(f"Non-admin user {username!r} denied access to an admin endpoint")
+            return jsonify({'error': 'Admin access required'}), 403
+        return fn(*args, **kwargs)
+    return jwt_required()(wrapper)
+
 
 def get_client_ip(request) -> str:
     """
@@ -89,11 +168,11 @@ class InputSanitizer:
         if not value:
             return False
         
-        value_lower = value.lower()
-        for pattern in InputSanitizer.NOSQL_INJECTION_PATTERNS:
-            if re.search(pattern, value_lower, re.IGNORECASE):
-                logger.warning(f"Potential NoSQL injection detected: {pattern}")
-                return True
+        # Single precompiled alternation of NOSQL_INJECTION_PATTERNS
+        match = INJECTION_RE.search(value)
+        if match:
+            logger.warning(f"Potential NoSQL injection detected: {match.group(0)}")
+            return True
         return False
     
     @staticmethod
@@ -135,66 +214,107 @@ class InputSanitizer:
         return None
 
 
+class _WindowCounter:
+    """Sliding-window-counter state for one key (fixed size)"""
+    __slots__ = ('window', 'start', 'current', 'previous')
+
+    def __init__(self, window: int, start: int):
+        self.window = window
+        self.start = start      # index of the current fixed window
+        self.current = 0        # hits in the current window
+        self.previous = 0       # hits in the window before it
+
+
 class RateLimiter:
     """
-    Simple in-memory rate limiter.
+    In-memory sliding-window-counter rate limiter.
+
+    Each key keeps two counters (this fixed window and the previous one) and
+    the rate is estimated as previous * (unexpired share of the previous
+    window) + current, so a check is O(1) and per-key state is constant.
+    Keys live in an LRU capped at max_keys, which bounds memory no matter
+    how many distinct clients show up; the least recently seen key is
+    dropped first.
 
     Note: On AWS Lambda, each invocation may run in a different container, so state
     does not persist across requests. This provides best-effort per-container limiting
     only. API Gateway throttling (configured in Terraform) is the primary rate limit.
+    Set RATE_LIMIT_BACKEND to share counts between workers or nodes
+    (utils/rate_limit_backends.py).
     """
 
-    def __init__(self):
-        self._requests = {}
-    
+    def __init__(self, max_keys: int = None):
+        self.max_keys = max_keys or int(os.getenv('RATE_LIMIT_MAX_KEYS', '50000'))
+        self._counters = OrderedDict()
+        self._lock = threading.Lock()
+
     def is_rate_limited(self, key: str, max_requests: int = 100, window_seconds: int = 60) -> bool:
         """
         Check if a key is rate limited.
-        Returns True if rate limit exceeded.
+        Returns True if rate limit exceeded (the request is not counted).
         """
-        import time
-        current_time = time.time()
-
-        # Periodic cleanup to prevent memory growth (every 100 checks)
-        if not hasattr(self, '_check_count'):
-            self._check_count = 0
-        self._check_count += 1
-        if self._check_count % 100 == 0:
-            self.cleanup()
-
-        if key not in self._requests:
-            self._requests[key] = []
-
-        # Remove old requests outside the window
-        self._requests[key] = [
-            req_time for req_time in self._requests[key]
-            if current_time - req_time < window_seconds
-        ]
-
-        # Check if limit exceeded
-        if len(self._requests[key]) >= max_requests:
-            return True
+        now = time.time()
+        index = int(now // window_seconds)
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = _WindowCounter(window_seconds, index)
+                self._counters[key] = counter
+                if len(self._counters) > self.max_keys:
+                    self._counters.popitem(last=False)
+            else:
+                self._counters.move_to_end(key)
+                if index != counter.start:
+                    counter.previous = counter.current if index == counter.start + 1 else 0
+                    counter.current = 0
+                    counter.start = index
+
+            elapsed = (now - index * window_seconds) / window_seconds
+            estimate = counter.previous * (1 - elapsed) + counter.current
+            if estimate >= max_requests:
+                return True
+            counter.current += 1
+            return False
 
-        # Add current request
-        self._requests[key].append(current_time)
-        return False
-    
     def cleanup(self):
-        """Remove stale entries to prevent memory growth"""
-        import time
-        current_time = time.time()
-        
-        keys_to_remove = []
-        for key, requests in self._requests.items():
-            if not requests or current_time - max(requests) > 3600:
-                keys_to_remove.append(key)
-        
-        for key in keys_to_remove:
-            del self._requests[key]
+        """Drop keys whose counters have fully expired (optional; the LRU bounds memory)"""
+        now = time.time()
+        with self._lock:
+            expired = [
+                key for key, counter in self._counters.items()
+                if now // counter.window > counter.start + 1
+            ]
+            for key in expired:
+                del self._counters[key]
+
+    def __len__(self):
+        return len(self._counters)
+
+
+# Global rate limiter instance (backend chosen on first use)
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
 
+def _create_rate_limiter():
+    backend = os.getenv('RATE_LIMIT_BACKEND', 'memory').strip().lower()
+    if backend in ('', 'memory'):
+        return RateLimiter()
+    try:
+        from utils.rate_limit_backends import create_shared_rate_limiter
+        limiter = create_shared_rate_limiter(backend)
+        logger.info(f"Rate limiter using shared '{backend}' backend")
+        return limiter
+    except Exception as e:
+        logger.error(f"Rate limit backend '{backend}' unavailable, using per-process limits: {e}")
+        return RateLimiter()
 
-# Global rate limiter instance
-_rate_limiter = RateLimiter()
 
-def get_rate_limiter() -> RateLimiter:
+def get_rate_limiter():
+    """RateLimiter, or a SharedRateLimiter when RATE_LIMIT_BACKEND is mmap/mongo"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = _create_rate_limiter()
     return _rate_limiter
@@ -0,0 +1,268 @@
+"""
+Lightweight request tracing
+
+Services mark their interesting steps with spans:
+
+    @traced('session.validate')
+    def validate_session(self, session_id): ...
+
+    with span('linkedin.ddgs'):
+        candidates = _ddgs_search(query, backend)
+
+Spans nest (a span opened inside another records it as its parent) and are
+timed with time.perf_counter(). They are collected on the request's Trace,
+held in a contextvar like the per-request DB stats: async views run in a copy
+of the request's context, so spans opened on the shared event loop (including
+asyncio.gather children) land on the same trace. Outside a request (jobs,
+warmup) span() does nothing beyond one contextvar lookup.
+
+Per request, span time is summed by name and returned in the Server-Timing
+header next to the DB entry ("session.validate;dur=1.20, ip.lookup;dur=3.05;
+desc=\"2 calls\""). A sampled fraction of requests, plus every request slower
+than TRACE_SLOW_MS, is kept as a full trace record in an in-memory ring buffer
+read by GET /api/metrics/traces.
+"""
+import functools
+import inspect
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Collect spans and emit them in Server-Timing
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'true').lower() == 'true'
+# Fraction of requests kept in the trace buffer
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.01'))
+# Requests at least this slow are always kept (0 disables)
+TRACE_SLOW_MS = float(os.getenv('TRACE_SLOW_MS', '1000'))
+# Trace records held per worker process
+TRACE_BUFFER_SIZE = int(os.getenv('TRACE_BUFFER_SIZE', '200'))
+# Spans recorded per request; further spans are only counted
+TRACE_MAX_SPANS = int(os.getenv('TRACE_MAX_SPANS', '256'))
+# Server-Timing entries per response (the slowest span names win)
+SERVER_TIMING_MAX_ENTRIES = 12
+
+
+class Span:
+    """One timed step; parent is the index of the enclosing span in Trace.spans"""
+    __slots__ = ('name', 'start', 'end', 'parent', 'depth')
+
+    def __init__(self, name: str, start: float, parent: Optional[int], depth: int):
+        self.name = name
+        self.start = start
+        self.end = None
+        self.parent = parent
+        self.depth = depth
+
+
+class Trace:
+    """Spans recorded while serving one request"""
+    __slots__ = ('route', 'started', 'started_at', 'spans', 'dropped')
+
+    def __init__(self, route: str):
+        self.route = route
+        self.started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc)
+        self.spans: List[Span] = []
+        self.dropped = 0
+
+    def totals(self) -> Dict[str, List[float]]:
+        """Finished span time by name: name -> [total ms, calls], in first-seen order"""
+        totals = {}
+        for s in self.spans:
+            if s.end is None:
+                continue
+            entry = totals.get(s.name)
+            if entry is None:
+                entry = totals[s.name] = [0.0, 0]
+            entry[0] += (s.end - s.start) * 1000
+            entry[1] += 1
+        return totals
+
+    def record(self, status: int, duration_ms: float) -> Dict[str, Any]:
+        return {
+            'trace_id': uuid.uuid4().hex[:16],
+            'route': self.route,
+            'status': status,
+            'started_at': self.started_at.isoformat(timespec='milliseconds'),
+            'duration_ms': round(duration_ms, 3),
+            'spans': [
+                {
+                    'name': s.name,
+                    'start_ms': round((s.start - self.started) * 1000, 3),
+                    'duration_ms': round((s.end - s.start) * 1000, 3) if s.end is not None else None,
+                    'depth': s.depth,
+                    'parent': s.parent,
+                }
+                for s in self.spans
+            ],
+            'dropped_spans': self.dropped,
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar('request_trace', default=None)
+# Index of the innermost open span in the current trace
+_current_span: ContextVar[Optional[int]] = ContextVar('request_span', default=None)
+
+_buffer: deque = deque(maxlen=TRACE_BUFFER_SIZE)
+_buffer_lock = threading.Lock()
+
+
+class span:
+    """
+    Time a block as a child of the current span (no-op outside a traced request).
+
+    A class rather than a @contextmanager generator: it runs on every service
+    call, and this keeps the untraced path to one contextvar lookup.
+    """
+    __slots__ = ('name', '_span', '_token')
+
+    def __init__(self, name: str):
+        self.name = name
+        self._span = None
+        self._token = None
+
+    def __enter__(self):
+        trace = _current_trace.get()
+        if trace is None:
+            return self
+        if len(trace.spans) >= TRACE_MAX_SPANS:
+            trace.dropped += 1
+            return self
+        parent = _current_span.get()
+        depth = trace.spans[parent].depth + 1 if parent is not None else 0
+        self._span = Span(self.name, time.perf_counter(), parent, depth)
+        trace.spans.append(self._span)
+        self._token = _current_span.set(len(trace.spans) - 1)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._span is None:
+            return False
+        self._span.end = time.perf_counter()
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Exited in another context than entered (generator moved threads)
+            _current_span.set(self._span.parent)
+        return False
+
+
+def traced(name: str):
+    """Decorator: run the function (sync or async) inside span(name)"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def begin_trace(route: str):
+    """Start tracing a request; returns a token for end_trace (None when disabled)"""
+    if not TRACING_ENABLED:
+        return None
+    _current_span.set(None)
+    return _current_trace.set(Trace(route))
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def end_trace(token, status: int) -> Optional[Trace]:
+    """Stop tracing and keep the trace in the buffer if it is sampled or slow"""
+    trace = _current_trace.get()
+    try:
+        _current_trace.reset(token)
+    except ValueError:
+        _current_trace.set(None)
+    if trace is None:
+        return None
+    duration_ms = (time.perf_counter() - trace.started) * 1000
+    if (TRACE_SLOW_MS and duration_ms >= TRACE_SLOW_MS) or random.random() < TRACE_SAMPLE_RATE:
+        record = trace.record(status, duration_ms)
+        with _buffer_lock:
+            _buffer.append(record)
+    return trace
+
+
+def server_timing_value(trace: Optional[Trace]) -> Optional[str]:
+    """Server-Timing header value with the request's span time by name"""
+    if trace is None:
+        return None
+    totals = trace.totals()
+    if not totals:
+        return None
+    if len(totals) > SERVER_TIMING_MAX_ENTRIES:
+        slowest = sorted(totals, key=lambda n: totals[n][0], reverse=True)[:SERVER_TIMING_MAX_ENTRIES]
+        totals = {name: totals[name] for name in totals if name in slowest}
+    entries = []
+    for name, (total_ms, calls) in totals.items():
+        entry = f"{name};dur={total_ms:.2f}"
+        if calls > 1:
+            entry += f';desc="{calls} calls"'
+        entries.append(entry)
+    return ', '.join(entries)
+
+
+def get_traces(limit: int = 50, route: str = None, min_ms: float = 0) -> Dict[str, Any]:
+    """Buffered trace records, newest first"""
+    with _buffer_lock:
+        records = list(_buffer)
+    records.reverse()
+    if route:
+        records = [r for r in records if route in r['route']]
+    if min_ms:
+        records = [r for r in records if r['duration_ms'] >= min_ms]
+    return {
+        'enabled': TRACING_ENABLED,
+        'sample_rate': TRACE_SAMPLE_RATE,
+        'slow_ms': TRACE_SLOW_MS,
+        'buffered': len(_buffer),
+        'capacity': TRACE_BUFFER_SIZE,
+        'traces': records[:limit],
+    }
+
+
+def init_tracing(app):
+    """
+    Register request hooks that trace each Flask request and add its span
+    totals to the Server-Timing header.
+    """
+    from flask import g, request
+
+    @app.before_request
+    def _begin_trace():
+        rule = request.url_rule.rule if request.url_rule else '<unmatched>'
+        g._trace_token = begin_trace(f"{request.method} {rule}")
+
+    @app.after_request
+    def _trace_server_timing(response):
+        g._trace_status = response.status_code
+        value = server_timing_value(current_trace())
+        if value:
+            response.headers.add('Server-Timing', value)
+        return response
+
+    @app.teardown_request
+    def _end_trace(exc):
+        token = g.pop('_trace_token', None)
+        if token is not None:
+            end_trace(token, g.pop('_trace_status', 500 if exc is not None else 200))
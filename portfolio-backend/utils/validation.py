@@ -0,0 +1,153 @@
+"""
+Declarative request validation
+
+Each endpoint declares its payload once as a Schema of Fields at import time:
+
+    LOGIN_SCHEMA = Schema(
+        Field('username', 'username', check_injection=True),
+        Field('password', 'password'),
+    )
+    values = LOGIN_SCHEMA.validate(request.get_json())
+
+Building the Schema resolves every field's converter, limits and messages, so
+validate() is a single pass over the fields: look up, coerce, check for
+injection, sanitize, check length. Conversions match InputSanitizer (same
+control-character stripping, HTML escaping, username and email rules).
+
+Errors raise ValidationError. Injection attempts (operator strings such as
+$where, or an object/array where a string is expected) raise at once with
+injection=True; other failures report the first failing field after the
+pass, so injection always takes precedence, as in the hand-written checks
+this replaces.
+"""
+import html
+import re
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# One alternation for all operators InputSanitizer.NOSQL_INJECTION_PATTERNS lists
+INJECTION_RE = re.compile(
+    r'\$(?:where|gt|lt|ne|eq|regex|or|and|not|exists|type|expr|jsonschema|mod|text)',
+    re.IGNORECASE
+)
+CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]')
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+USERNAME_STRIP_RE = re.compile(r'[^a-zA-Z0-9_]')
+
+
+class ValidationError(Exception):
+    """Request payload failed validation"""
+
+    def __init__(self, message: str, field: str = None, injection: bool = False):
+        super().__init__(message)
+        self.message = message
+        self.field = field
+        self.injection = injection
+
+
+def _clean(value: str, max_length: int) -> str:
+    return CONTROL_CHARS_RE.sub('', value.strip()[:max_length])
+
+
+def _string(value: str, max_length: int) -> str:
+    return _clean(value, max_length)
+
+
+def _html(value: str, max_length: int) -> str:
+    return html.escape(_clean(value, max_length))
+
+
+def _username(value: str, max_length: int) -> str:
+    return USERNAME_STRIP_RE.sub('', _clean(value, max_length))
+
+
+def _email(value: str, max_length: int) -> str:
+    value = _clean(value.lower(), max_length)
+    return value if EMAIL_RE.match(value) else ''
+
+
+def _password(value: str, max_length: int) -> str:
+    # Not sanitized: special characters are part of the secret
+    return value.strip()[:max_length]
+
+
+_CONVERTERS: Dict[str, Tuple[Callable[[str, int], str], int]] = {
+    # kind: (converter, default max_length)
+    'string': (_string, 1000),
+    'html': (_html, 10000),
+    'username': (_username, 50),
+    'email': (_email, 320),
+    'password': (_password, 1024),
+}
+
+
+class Field:
+    """
+    One payload field.
+
+    Args:
+        name: key in the validated result
+        kind: string | html | username | email | password
+        source: payload key(s) to read, first present wins (default: name)
+        required: empty after conversion is an error
+        min_length: shorter (after conversion) is an error
+        max_length: input is truncated to this length before conversion
+        check_injection: reject MongoDB operator strings in the raw value
+        message: error message for required/min_length failures
+    """
+    __slots__ = ('name', 'sources', 'convert', 'required', 'min_length',
+                 'max_length', 'check_injection', 'message')
+
+    def __init__(self, name: str, kind: str = 'string', source=None, required: bool = False,
+                 min_length: int = 0, max_length: int = None, check_injection: bool = False,
+                 message: str = None):
+        if kind not in _CONVERTERS:
+            raise ValueError(f"Unknown field kind: {kind}")
+        self.convert, default_max = _CONVERTERS[kind]
+        self.name = name
+        if source is None:
+            self.sources = (name,)
+        else:
+            self.sources = (source,) if isinstance(source, str) else tuple(source)
+        self.required = required or min_length > 0
+        self.min_length = min_length
+        self.max_length = max_length or default_max
+        self.check_injection = check_injection
+        self.message = message or f"{name} is required"
+
+
+class Schema:
+    """A compiled set of Fields; validate() returns the converted values"""
+
+    def __init__(self, *fields: Field):
+        self.fields = fields
+
+    def validate(self, data: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        if not isinstance(data, dict):
+            raise ValidationError('No data provided')
+        result = {}
+        error = None
+        for field in self.fields:
+            raw = None
+            for source in field.sources:
+                raw = data.get(source)
+                if raw is not None:
+                    break
+            if raw is None:
+                raw = ''
+            elif isinstance(raw, (dict, list)):
+                # {"$gt": ""} style operator objects
+                raise ValidationError('Invalid input', field.name, injection=True)
+            elif not isinstance(raw, str):
+                raw = str(raw)
+
+            if field.check_injection and INJECTION_RE.search(raw):
+                raise ValidationError('Invalid input', field.name, injection=True)
+
+            value = field.convert(raw, field.max_length) if raw else ''
+            if error is None and field.required and len(value) < max(field.min_length, 1):
+                error = ValidationError(field.message, field.name)
+            result[field.name] = value
+
+        if error is not None:
+            raise error
+        return result
@@ -0,0 +1,151 @@
+"""
+Lambda INIT-phase warmup
+
+Everything in the app is lazy (imports, MongoDB clients, service singletons),
+which keeps cold starts small but makes the first request pay for it. With
+LAMBDA_WARMUP enabled, lambda_handler runs these stages at module import, i.e.
+during the Lambda INIT phase (and ahead of time under provisioned concurrency):
+
+    config          load the configuration snapshot (one SSM call)
+    app             import blueprints, create_app(), build the apig-wsgi handler
+    mongo           open the primary MongoClient pool (connect + ping)
+    async_mongo     start the shared event loop and ping with AsyncMongoClient
+    user_agent      import ua_parser and parse a sample UA (regex set)
+    services        construct the sync service singletons
+    async_services  construct the async service singletons (and httpx client)
+    password_hasher calibrate the bcrypt cost factor (imports bcrypt)
+
+LAMBDA_WARMUP=true runs all stages; a comma-separated list runs only those.
+A failing stage is logged and skipped - warmup never fails the INIT phase.
+"""
+import json
+import logging
+import os
+import time
+from typing import Callable, Dict, Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+_SAMPLE_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36'
+)
+
+
+def _warm_config():
+    from utils.config import get_config
+    get_config()
+
+
+def _warm_mongo():
+    from utils.db_connect import DBConnect
+    DBConnect().get_db()  # creates the client and pings
+
+
+def _warm_async_mongo():
+    from utils.async_runtime import run_coroutine
+    from utils.db_connect import DBConnect
+
+    async def ping():
+        await DBConnect().get_async_db().command('ping')
+
+    run_coroutine(ping())
+
+
+def _warm_user_agent():
+    from services.visitor_service import parse_user_agent
+    parse_user_agent(_SAMPLE_USER_AGENT)
+
+
+def _warm_services():
+    from services.session_service import get_session_service
+    from services.ip_service import get_ip_service
+    from services.visitor_service import get_visitor_service
+    get_session_service()
+    get_ip_service()
+    get_visitor_service()
+
+
+def _warm_async_services():
+    from utils.async_runtime import run_coroutine
+    from services.async_visitor_service import get_async_visitor_service
+    from services.async_ip_service import get_async_ip_service
+
+    async def build():
+        get_async_visitor_service()
+        # httpx client is bound to the loop, so create it on the loop
+        get_async_ip_service()._get_http_client()
+
+    run_coroutine(build())
+
+
+def _warm_password_hasher():
+    from utils.password_hasher import get_password_hasher
+    get_password_hasher().warm()
+
+
+def parse_stages(value: Optional[str]) -> list:
+    """LAMBDA_WARMUP value -> stage names ('' / false = none, true = all)"""
+    value = (value or '').strip().lower()
+    if value in ('', '0', 'false', 'no', 'off'):
+        return []
+    if value in ('1', 'true', 'yes', 'on', 'all'):
+        return list(STAGE_NAMES)
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def run_warmup(build_app: Callable[[], Any], stages: Iterable[str] = None) -> Dict[str, Any]:
+    """
+    Run warmup stages in order and log per-stage timings.
+
+    Args:
+        build_app: callable that builds the app/handler (lambda_handler.get_handler)
+        stages: stage names to run (default: all)
+
+    Returns:
+        {'stages': {name: {'ms': float, 'ok': bool[, 'error': str]}}, 'total_ms': float}
+    """
+    actions = dict(_STAGES, app=build_app)
+    wanted = list(stages) if stages is not None else list(STAGE_NAMES)
+    report = {
+        'initialization_type': os.getenv('AWS_LAMBDA_INITIALIZATION_TYPE', 'unknown'),
+        'stages': {},
+    }
+    started = time.perf_counter()
+    for name in STAGE_NAMES:
+        if name not in wanted:
+            continue
+        stage_started = time.perf_counter()
+        entry = {'ok': True}
+        try:
+            actions[name]()
+        except Exception as e:
+            entry = {'ok': False, 'error': str(e)}
+            logger.warning(f"Warmup stage {name} failed: {e}")
+        entry['ms'] = round((time.perf_counter() - stage_started) * 1000, 1)
+        report['stages'][name] = entry
+        logger.info(f"Warmup {name}: {entry['ms']} ms{'' if entry['ok'] else ' (failed)'}")
+
+    unknown = [name for name in wanted if name not in actions]
+    if unknown:
+        logger.warning(f"Unknown warmup stages ignored: {', '.join(unknown)}")
+    report['total_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"Warmup complete: {json.dumps(report)}")
+    return report
+
+
+_STAGES: Dict[str, Callable[[], None]] = {
+    'config': _warm_config,
+    'mongo': _warm_mongo,
+    'async_mongo': _warm_async_mongo,
+    'user_agent': _warm_user_agent,
+    'services': _warm_services,
+    'async_services': _warm_async_services,
+    'password_hasher': _warm_password_hasher,
+}
+
+# Execution order ('app' is supplied by the caller)
+STAGE_NAMES = (
+    'config', 'app', 'mongo', 'async_mongo', 'user_agent', 'services', 'async_services',
+    'password_hasher',
+)